@@ -0,0 +1,363 @@
+"""
+============================================================
+  CANSAT CAELUM — Archivo columnar de la sesión
+  IES Diego Velázquez
+============================================================
+  Copia binaria por columnas de un CSV de telemetría, para
+  que las herramientas post-vuelo carguen sin volver a
+  parsear texto. Es una carpeta junto al CSV:
+
+      datos_radio.csv
+      datos_radio_columnas/
+          seg_000000.npz     ← cada CADA_FILAS filas (NumPy,
+          seg_000001.npz       comprimido, escritura atómica)
+          ...
+
+  Cada segmento guarda:
+    - columnas numéricas con tipo (float32; float64 para
+      lat/lon/timestamp; enteros para num_paquete y sats)
+    - `fase` y `equipo` codificadas como diccionario
+      (códigos uint8 + lista de valores distintos)
+    - estadísticas del segmento: mín./máx. de cada columna
+      numérica y las fases que contiene → al leer con
+      fases={...} se saltan los segmentos sin esas fases
+      sin descomprimirlos (p. ej. horas de 'espera')
+
+  Uso:
+      escritor = EscritorColumnar(archivo_columnar('datos_radio.csv'), CABECERA)
+      escritor.escribir(payload)        # dict, fila a fila
+      escritor.escribir_columnas(cols)  # o de golpe (parse_many)
+      escritor.cerrar()
+
+      cols = leer_columnas(ruta, columnas=['alt', 'pm2_5'], fases={'descenso'})
+      df   = leer_dataframe(ruta)       # pandas, fase como category
+
+      python archivo_columnar.py datos_SD_raw.csv   → convierte un CSV
+      python archivo_columnar.py datos_radio_columnas  → segmentos y estadísticas
+
+  Lo usan receptor_telemetria.py, extraer_ram.py,
+  limpiar_espera.py (escriben) y analizar_vuelo.py,
+  generar_kml.py (leen). Necesita NumPy.
+============================================================
+"""
+
+import glob
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from parser_telemetria import CAMPOS_NUMERICOS, ParserTelemetria
+
+VERSION    = 1
+CADA_FILAS = 5000            # filas por segmento
+SUFIJO     = '_columnas'
+
+# Tipo de cada columna numérica; el resto, float32 (precisión de sobra para
+# sensores, la mitad que float64). lat/lon necesitan float64: float32 solo
+# distingue ~0,4 m a 40° de latitud
+TIPOS = {'num_paquete': np.int32, 'sats': np.int16,
+         'timestamp': np.float64, 'lat': np.float64, 'lon': np.float64}
+TIPO_DEFECTO  = np.float32
+CATEGORICAS   = frozenset({'fase', 'equipo'})
+
+
+def archivo_columnar(ruta_csv):
+    """datos_radio.csv → datos_radio_columnas"""
+    return os.path.splitext(ruta_csv)[0] + SUFIJO
+
+
+def es_columnar(ruta):
+    return os.path.isdir(ruta) and bool(_segmentos(ruta))
+
+
+def _segmentos(ruta):
+    return sorted(glob.glob(os.path.join(ruta, 'seg_*.npz')))
+
+
+def _tipo(campo):
+    return TIPOS.get(campo, TIPO_DEFECTO)
+
+
+def _a_numero(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# ============================================================================
+#  ESCRITURA
+# ============================================================================
+class EscritorColumnar:
+    """
+    Acumula filas por columnas y vuelca un segmento .npz cada `cada_filas`.
+    Si la carpeta ya tiene segmentos (receptor relanzado) se añaden detrás;
+    para rehacer un archivo entero está convertir_csv(), que lo sustituye.
+    """
+    def __init__(self, ruta, cabecera, cada_filas=CADA_FILAS, numericos=CAMPOS_NUMERICOS):
+        self.ruta       = ruta
+        self.cabecera   = tuple(c.strip() for c in cabecera)
+        self.cada_filas = cada_filas
+        self._numericos = frozenset(numericos)
+        os.makedirs(ruta, exist_ok=True)
+
+        existentes = _segmentos(ruta)
+        self._siguiente = (int(os.path.basename(existentes[-1])[4:10]) + 1) if existentes else 0
+        self._filas = {c: [] for c in self.cabecera}
+        self._n     = 0
+
+        # Estadísticas
+        self.filas      = 0
+        self.segmentos  = 0
+        self.bytes      = 0
+        self.t_escritura = 0.0
+
+    def escribir(self, fila):
+        """Añade una fila (dict con los nombres de la cabecera)."""
+        for campo, valores in self._filas.items():
+            valores.append(fila.get(campo, ''))
+        self._n += 1
+        if self._n >= self.cada_filas:
+            self.volcar()
+
+    def escribir_columnas(self, columnas):
+        """Añade muchas filas de golpe: {campo: secuencia} (p. ej. de parse_many)."""
+        n = columnas.get('_filas', len(next(iter(columnas.values()), ())))
+        for campo, valores in self._filas.items():
+            valores.extend(columnas[campo] if campo in columnas else [''] * n)
+        self._n += n
+        while self._n >= self.cada_filas:
+            self.volcar(self.cada_filas)
+
+    def volcar(self, n=None):
+        """Escribe un segmento con las `n` primeras filas pendientes (todas por defecto)."""
+        n = self._n if n is None else n
+        if n == 0:
+            return
+        t0 = time.perf_counter()
+        arrays, minimos, maximos = {}, [], []
+        numericas = []
+        for campo, valores in self._filas.items():
+            trozo = valores[:n]
+            del valores[:n]
+            if campo in self._numericos:
+                try:
+                    col = np.asarray(trozo, dtype=np.float64)
+                except (TypeError, ValueError):
+                    col = np.fromiter(map(_a_numero, trozo), dtype=np.float64, count=n)
+                np.nan_to_num(col, copy=False)
+                arrays[campo] = col.astype(_tipo(campo))
+                numericas.append(campo)
+                minimos.append(col.min())
+                maximos.append(col.max())
+            elif campo in CATEGORICAS:
+                textos = np.asarray([str(v).strip() for v in trozo])
+                dic, codigos = np.unique(textos, return_inverse=True)
+                arrays[campo] = codigos.astype(np.uint8 if len(dic) <= 256 else np.uint32)
+                arrays[campo + '__dic'] = dic
+            else:
+                arrays[campo] = np.asarray([str(v) for v in trozo])
+        arrays['__version']   = np.array(VERSION)
+        arrays['__columnas']  = np.array(self.cabecera)
+        arrays['__numericas'] = np.array(numericas)
+        arrays['__min']       = np.array(minimos, dtype=np.float64)
+        arrays['__max']       = np.array(maximos, dtype=np.float64)
+        arrays['__filas']     = np.array(n)
+
+        ruta = os.path.join(self.ruta, f"seg_{self._siguiente:06d}.npz")
+        tmp  = ruta + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, ruta)
+
+        self._siguiente += 1
+        self._n         -= n
+        self.filas      += n
+        self.segmentos  += 1
+        self.bytes      += os.path.getsize(ruta)
+        self.t_escritura += time.perf_counter() - t0
+
+    def cerrar(self):
+        self.volcar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def resumen(self):
+        return (f"{self.filas} filas en {self.segmentos} segmentos ({self.bytes / 1024:.1f} KB)  "
+                f"escritura {1000 * self.t_escritura:.0f} ms")
+
+
+def convertir_csv(ruta_csv, destino=None, cada_filas=CADA_FILAS):
+    """
+    Crea el archivo columnar de un CSV existente. Devuelve la ruta de la carpeta.
+    Si ya había uno se sustituye (no se añade detrás): se escribe en una carpeta
+    hermana y se cambia por la vieja al terminar, así un corte a mitad no deja
+    el archivo anterior a medias.
+    """
+    destino = os.path.normpath(destino or archivo_columnar(ruta_csv))
+    with open(ruta_csv, 'r', encoding='utf-8') as f:
+        parser = ParserTelemetria.desde_cabecera(f.readline(), min_campos=1)
+        columnas = parser.parse_many(f.read().splitlines())
+    nuevo, viejo = destino + '.nuevo', destino + '.viejo'
+    for resto in (nuevo, viejo):
+        shutil.rmtree(resto, ignore_errors=True)
+    with EscritorColumnar(nuevo, parser.cabecera, cada_filas) as escritor:
+        escritor.escribir_columnas(columnas)
+    if os.path.exists(destino):
+        os.rename(destino, viejo)
+    os.rename(nuevo, destino)
+    shutil.rmtree(viejo, ignore_errors=True)
+    return destino
+
+
+# ============================================================================
+#  LECTURA
+# ============================================================================
+def estadisticas(ruta):
+    """Por segmento: filas, fases, mín./máx. de cada columna numérica (sin leer las columnas)."""
+    salida = []
+    for seg in _segmentos(ruta):
+        with np.load(seg, allow_pickle=False) as z:
+            info = {'segmento': os.path.basename(seg), 'filas': int(z['__filas']),
+                    'bytes': os.path.getsize(seg),
+                    'fases': z['fase__dic'].tolist() if 'fase__dic' in z.files else [],
+                    'rango': {c: (float(a), float(b)) for c, a, b in
+                              zip(z['__numericas'].tolist(), z['__min'], z['__max'])}}
+        salida.append(info)
+    return salida
+
+
+def _leer(ruta, columnas=None, fases=None):
+    """
+    Une los segmentos. Devuelve (partes, categorias): partes[campo] es la lista
+    de trozos por segmento; para columnas categóricas los trozos son códigos
+    sobre la lista global categorias[campo].
+    """
+    fases = None if fases is None else set(fases)
+    partes, categorias, orden = {}, {}, None
+    for seg in _segmentos(ruta):
+        with np.load(seg, allow_pickle=False) as z:
+            if orden is None:
+                orden = [c for c in z['__columnas'].tolist()
+                         if columnas is None or c in columnas]
+                partes = {c: [] for c in orden}
+                categorias = {c: [] for c in orden if c in CATEGORICAS}
+            mascara = None
+            if fases is not None and 'fase' in z.files:
+                dic = z['fase__dic']
+                validos = np.isin(dic, list(fases))
+                if not validos.any():
+                    continue                              # segmento entero fuera: ni se descomprime
+                if not validos.all():
+                    mascara = validos[z['fase']]
+            for campo in orden:
+                if campo not in z.files:
+                    continue
+                valores = z[campo]
+                if campo in categorias:
+                    # Códigos del segmento → códigos globales
+                    global_ = categorias[campo]
+                    mapa = np.array([_indice(global_, v) for v in z[campo + '__dic'].tolist()],
+                                    dtype=np.int32)
+                    valores = mapa[valores] if len(mapa) else valores.astype(np.int32)
+                partes[campo].append(valores if mascara is None else valores[mascara])
+    return partes, categorias
+
+
+def _indice(lista, valor):
+    try:
+        return lista.index(valor)
+    except ValueError:
+        lista.append(valor)
+        return len(lista) - 1
+
+
+def leer_columnas(ruta, columnas=None, fases=None):
+    """
+    {campo: numpy.ndarray} con las columnas pedidas (todas por defecto) y solo
+    las filas de `fases` si se da. Las categóricas vuelven como array de str.
+    """
+    partes, categorias = _leer(ruta, columnas, fases)
+    salida = {}
+    for campo, trozos in partes.items():
+        if not trozos:
+            salida[campo] = np.array([], dtype=_tipo(campo) if campo not in categorias else str)
+            continue
+        valores = np.concatenate(trozos)
+        if campo in categorias:
+            valores = np.asarray(categorias[campo])[valores]
+        salida[campo] = valores
+    return salida
+
+
+def leer_dataframe(ruta, columnas=None, fases=None):
+    """Como leer_columnas pero en un DataFrame de pandas, con fase/equipo como category."""
+    import pandas as pd
+    partes, categorias = _leer(ruta, columnas, fases)
+    datos = {}
+    for campo, trozos in partes.items():
+        valores = np.concatenate(trozos) if trozos else np.array([], dtype=np.int32)
+        if campo in categorias:
+            datos[campo] = pd.Categorical.from_codes(valores, categories=categorias[campo]) \
+                if categorias[campo] else pd.Categorical([])
+        else:
+            datos[campo] = valores
+    return pd.DataFrame(datos)
+
+
+# ============================================================================
+#  CLI
+# ============================================================================
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python archivo_columnar.py datos.csv          → crea datos_columnas/")
+        print("     python archivo_columnar.py datos_columnas     → muestra sus segmentos")
+        sys.exit(1)
+    ruta = sys.argv[1]
+
+    if es_columnar(ruta):
+        total_filas = total_bytes = 0
+        print(f"\n📦 {ruta}")
+        for info in estadisticas(ruta):
+            alt = info['rango'].get('alt', (0.0, 0.0))
+            print(f"   {info['segmento']}  {info['filas']:>6} filas  {info['bytes'] / 1024:>7.1f} KB  "
+                  f"alt {alt[0]:>7.1f}–{alt[1]:<7.1f}  {', '.join(info['fases'])}")
+            total_filas += info['filas']
+            total_bytes += info['bytes']
+        print(f"   TOTAL  {total_filas} filas  {total_bytes / 1024:.1f} KB\n")
+        return
+
+    if not os.path.isfile(ruta):
+        print(f"❌ No se encuentra: {ruta}")
+        sys.exit(1)
+    t0 = time.perf_counter()
+    destino = convertir_csv(ruta)
+    t_conv = time.perf_counter() - t0
+    tam_csv = os.path.getsize(ruta)
+    tam_col = sum(os.path.getsize(s) for s in _segmentos(destino))
+
+    t0 = time.perf_counter()
+    cols = leer_columnas(destino)
+    t_col = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    with open(ruta, 'r', encoding='utf-8') as f:
+        ParserTelemetria.desde_cabecera(f.readline(), min_campos=1).parse_many(f.read().splitlines())
+    t_csv = time.perf_counter() - t0
+
+    n = len(next(iter(cols.values()), ()))
+    print(f"\n📦 {destino}  ({n} filas, convertido en {t_conv:.2f} s)")
+    print(f"   Tamaño:  CSV {tam_csv / 1024:.1f} KB  →  columnar {tam_col / 1024:.1f} KB "
+          f"({tam_col / tam_csv:.0%})")
+    print(f"   Carga:   CSV {1000 * t_csv:.1f} ms  →  columnar {1000 * t_col:.1f} ms "
+          f"(×{t_csv / t_col:.1f})\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+============================================================
+  CANSAT CAELUM — Benchmark del parser de telemetría
+============================================================
+  Compara líneas/s de:
+    1. parsear_linea() original de receptor_telemetria.py
+       (copia de referencia más abajo)
+    2. ParserTelemetria.parsear()     — línea a línea
+    3. ParserTelemetria.parse_many()  — ruta masiva columnar
+
+  Los datos salen de data/simulacion/datos_simulacion.csv,
+  convertidos a formato radio (num_paquete, equipo, ...) y
+  replicados hasta N filas.
+
+  Uso:
+      python benchmark_parser.py                    → 1.000.000 filas
+      python benchmark_parser.py 5000000
+      python benchmark_parser.py 2000000 otro.csv
+============================================================
+"""
+
+import os
+import sys
+import time
+
+from parser_telemetria import ParserTelemetria
+
+RAIZ        = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+CSV_DEFECTO = os.path.join(RAIZ, 'data', 'simulacion', 'datos_simulacion.csv')
+N_DEFECTO   = 1_000_000
+
+# ── Referencia: parsear_linea() tal como estaba en receptor_telemetria.py ──
+CABECERA = [
+    'num_paquete', 'equipo',
+    'timestamp', 'datetime', 'lat', 'lon', 'alt', 'alt_mar', 'sats',
+    'temp_hs', 'hum_hs', 'temp_scd', 'hum_scd', 'temp_lps', 'presion',
+    'co2', 'pm1_0', 'pm2_5', 'pm10',
+    'accel_x', 'accel_y', 'accel_z', 'gyro_x', 'gyro_y', 'gyro_z', 'fase'
+]
+CAMPOS_FLOAT = {
+    'num_paquete', 'timestamp', 'lat', 'lon', 'alt', 'alt_mar', 'sats',
+    'temp_hs', 'hum_hs', 'temp_scd', 'hum_scd', 'temp_lps', 'presion',
+    'co2', 'pm1_0', 'pm2_5', 'pm10',
+    'accel_x', 'accel_y', 'accel_z', 'gyro_x', 'gyro_y', 'gyro_z'
+}
+
+def parsear_linea_original(linea):
+    partes = linea.strip().split(',')
+    if len(partes) < 25:
+        return None
+    if partes[0].strip().lower() in ('timestamp', 'num_paquete'):
+        return None
+    payload = {}
+    for i, campo in enumerate(CABECERA):
+        if i >= len(partes):
+            payload[campo] = 0.0 if campo in CAMPOS_FLOAT else ''
+            continue
+        valor = partes[i].strip()
+        if campo in CAMPOS_FLOAT:
+            try:
+                payload[campo] = float(valor)
+            except ValueError:
+                payload[campo] = 0.0
+        else:
+            payload[campo] = valor
+    return payload
+
+
+def generar_lineas(ruta_csv, n):
+    """Lee el CSV, lo pasa a formato radio si hace falta y lo replica hasta n líneas."""
+    with open(ruta_csv, 'r', encoding='utf-8') as f:
+        cabecera = f.readline().strip().split(',')
+        base = [l.rstrip('\n') for l in f if l.strip()]
+    # Todo menos num_paquete, que se renumera al replicar
+    if cabecera[0] != 'num_paquete':
+        restos = [f"CAELUM,{l}" for l in base]
+    else:
+        restos = [l.split(',', 1)[1] for l in base]
+    k = len(restos)
+    return [f"{i + 1},{restos[i % k]}" for i in range(n)]
+
+
+def medir(nombre, funcion, lineas):
+    t0 = time.perf_counter()
+    resultado = funcion(lineas)
+    dt = time.perf_counter() - t0
+    print(f"   {nombre:<34} {dt:>7.2f} s   {len(lineas) / dt:>12,.0f} líneas/s")
+    return resultado, dt
+
+
+def main():
+    n    = int(sys.argv[1]) if len(sys.argv) > 1 else N_DEFECTO
+    ruta = sys.argv[2] if len(sys.argv) > 2 else CSV_DEFECTO
+
+    print(f"\n📊 BENCHMARK PARSER — {n:,} líneas desde {os.path.basename(ruta)}\n")
+    lineas = generar_lineas(ruta, n)
+    parser = ParserTelemetria(CABECERA, CAMPOS_FLOAT)
+
+    # Comprobación de equivalencia con la función original
+    for linea in lineas[:1000] + ['timestamp,datetime', '1,CAELUM,x,,2', lineas[0] + ',extra']:
+        a, b = parsear_linea_original(linea), parser.parsear(linea)
+        assert a == b, f"Resultado distinto para: {linea!r}\n{a}\n{b}"
+
+    _, t_ref = medir("parsear_linea() original",
+                     lambda ls: [parsear_linea_original(l) for l in ls], lineas)
+    _, t_obj = medir("ParserTelemetria.parsear()",
+                     lambda ls: [parser.parsear(l) for l in ls], lineas)
+    cols, t_bulk = medir("ParserTelemetria.parse_many()", parser.parse_many, lineas)
+
+    assert cols['_filas'] == n
+    print(f"\n   Aceleración parsear():    ×{t_ref / t_obj:.2f}")
+    print(f"   Aceleración parse_many(): ×{t_ref / t_bulk:.2f}\n")
+
+
+if __name__ == "__main__":
+    main()
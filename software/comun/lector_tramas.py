@@ -0,0 +1,109 @@
+"""
+============================================================
+  CANSAT CAELUM — Lector de tramas por puerto serie
+  IES Diego Velázquez
+============================================================
+  Sustituye a ser.readline().decode('utf-8', errors='ignore'):
+
+    - Lee de una vez todo lo que haya en in_waiting sobre un
+      bytearray reutilizable (sin esperar a que llegue cada línea)
+    - Parte las tramas completas por el separador ('\\n') y
+      guarda el trozo incompleto para la siguiente lectura
+    - Cuenta las tramas corruptas (bytes no válidos, tramas
+      demasiado largas) en vez de esconderlas
+
+  Uso:
+      lector = LectorTramas(ser)
+      while True:
+          for linea in lector.leer():   # lista de str, puede ir vacía
+              ...
+      print(lector.resumen())
+
+  Si no hay nada en el puerto, leer() espera como mucho el
+  timeout del puerto (serial.Serial(..., timeout=...)).
+
+  Lo usan receptor_telemetria.py y extraer_ram.py
+============================================================
+"""
+
+TAM_LECTURA    = 4096    # bytes máximos por lectura
+TAM_MAX_TRAMA  = 1024    # una línea de telemetría ocupa ~200 bytes
+
+
+class LectorTramas:
+    """Lector de tramas terminadas en `separador` sobre un objeto tipo serial.Serial."""
+
+    def __init__(self, ser, separador=b'\n', tam_lectura=TAM_LECTURA,
+                 tam_max_trama=TAM_MAX_TRAMA, codificacion='utf-8'):
+        self.ser           = ser
+        self.separador     = separador
+        self.tam_max_trama = tam_max_trama
+        self.codificacion  = codificacion
+
+        self._bloque = bytearray(tam_lectura)        # destino reutilizable de cada lectura
+        self._vista  = memoryview(self._bloque)
+        self._buf    = bytearray()                   # bytes recibidos aún sin trama completa
+        self._descartar = False                      # tras tirar una trama larga: saltar hasta el separador
+
+        # Estadísticas
+        self.bytes       = 0
+        self.lecturas    = 0
+        self.tramas      = 0
+        self.malformadas = 0
+
+    def leer(self):
+        """Lee lo disponible y devuelve las tramas completas decodificadas (sin separador)."""
+        pedir = min(max(self.ser.in_waiting, 1), len(self._bloque))
+        n = self.ser.readinto(self._vista[:pedir])
+        if n:
+            self.bytes    += n
+            self.lecturas += 1
+            self._buf     += self._vista[:n]
+        return self._extraer()
+
+    def _extraer(self):
+        buf = self._buf
+        if self._descartar:
+            # Resto de una trama demasiado larga ya contada: se sincroniza en el siguiente separador
+            i = buf.find(self.separador)
+            if i < 0:
+                del buf[:]
+                return []
+            del buf[:i + len(self.separador)]
+            self._descartar = False
+        fin = buf.rfind(self.separador)
+        if fin < 0:
+            # Sin separador: si el trozo crece sin límite es basura
+            if len(buf) > self.tam_max_trama:
+                self.malformadas += 1
+                self._descartar = True
+                del buf[:]
+            return []
+
+        completas = buf[:fin]                        # única copia de las tramas completas
+        del buf[:fin + len(self.separador)]          # queda solo la cola incompleta
+
+        tramas = []
+        for crudo in completas.split(self.separador):
+            if crudo.endswith(b'\r'):
+                del crudo[-1:]
+            if not crudo:
+                continue
+            if len(crudo) > self.tam_max_trama:
+                self.malformadas += 1
+                continue
+            try:
+                tramas.append(crudo.decode(self.codificacion))
+            except UnicodeDecodeError:
+                self.malformadas += 1
+        self.tramas += len(tramas)
+        return tramas
+
+    @property
+    def pendiente(self):
+        """Bytes recibidos que aún no forman una trama completa."""
+        return len(self._buf)
+
+    def resumen(self):
+        return (f"{self.tramas} tramas  {self.bytes} bytes en {self.lecturas} lecturas  "
+                f"malformadas: {self.malformadas}")
@@ -0,0 +1,169 @@
+"""
+============================================================
+  CANSAT CAELUM — Parser de líneas de telemetría
+  IES Diego Velázquez
+============================================================
+  Convierte líneas CSV (radio, SD, RAM o simulación) en
+  diccionarios o en columnas. El parser se construye UNA vez
+  a partir de la cabecera: las tablas de índices y de
+  conversores quedan precalculadas y cada línea solo hace
+  split + conversión, sin buscar nombres en sets.
+
+  Uso:
+      parser = ParserTelemetria(CABECERA, CAMPOS_FLOAT)
+      payload = parser.parsear(linea)          # dict o None
+      columnas = parser.parse_many(lineas)     # dict de columnas
+
+      parser = ParserTelemetria.desde_cabecera(primera_linea)
+
+  Lo usan receptor_telemetria.py (estación de tierra) y las
+  herramientas post-vuelo. Benchmark: benchmark_parser.py
+============================================================
+"""
+
+from array import array
+from itertools import repeat
+from operator import itemgetter
+
+# Campos numéricos conocidos (mismos nombres que el CSV del Arduino)
+CAMPOS_NUMERICOS = frozenset({
+    'num_paquete', 'timestamp', 'lat', 'lon', 'alt', 'alt_mar', 'sats',
+    'temp_hs', 'hum_hs', 'temp_scd', 'hum_scd', 'temp_lps', 'presion',
+    'co2', 'pm1_0', 'pm2_5', 'pm10',
+    'accel_x', 'accel_y', 'accel_z', 'gyro_x', 'gyro_y', 'gyro_z'
+})
+
+# Primer campo de una línea de cabecera reenviada por el Arduino
+_NOMBRES_CABECERA = frozenset({'timestamp', 'num_paquete'})
+# Primeros caracteres con los que puede empezar una cabecera (ruta rápida)
+_INICIALES_CABECERA = frozenset(' \t' + ''.join(c + c.upper() for c in 'tn'))
+
+
+def _a_float(valor, relleno=0.0):
+    """float() tolerante: valores vacíos o corruptos pasan a `relleno` (0.0)."""
+    try:
+        return float(valor)
+    except ValueError:
+        return relleno
+
+
+def _columna_float(valores, relleno=0.0):
+    """Convierte una columna entera de texto a array('d') de una pasada."""
+    try:
+        return array('d', map(float, valores))
+    except ValueError:
+        return array('d', map(_a_float, valores, repeat(relleno)))
+
+
+class ParserTelemetria:
+    """
+    Parser compilado a partir de una cabecera.
+
+    Mantiene la semántica de parsear_linea() de la estación:
+      - menos de `min_campos` campos → línea inválida (None)
+      - línea de cabecera reenviada  → None
+      - campos que faltan al final   → 0.0 (numéricos) o '' (texto)
+      - números corruptos            → 0.0
+    """
+
+    def __init__(self, cabecera, campos_float=CAMPOS_NUMERICOS, min_campos=None):
+        self.cabecera   = tuple(c.strip() for c in cabecera)
+        self.n          = len(self.cabecera)
+        self.min_campos = self.n - 1 if min_campos is None else min_campos
+
+        self.idx_float    = tuple(i for i, c in enumerate(self.cabecera) if c in campos_float)
+        self.idx_texto    = tuple(i for i, c in enumerate(self.cabecera) if c not in campos_float)
+        self.campos_float = tuple(self.cabecera[i] for i in self.idx_float)
+        self.campos_texto = tuple(self.cabecera[i] for i in self.idx_texto)
+
+        # Orden de las claves del dict: primero numéricos, luego texto
+        self._claves  = self.campos_float + self.campos_texto
+        self._relleno = [''] * self.n
+        self._coger_float = self._coger(self.idx_float)
+        self._coger_texto = self._coger(self.idx_texto)
+
+    @staticmethod
+    def _coger(indices):
+        """itemgetter que siempre devuelve tupla (también con 0 o 1 índices)."""
+        if not indices:
+            return lambda partes: ()
+        if len(indices) == 1:
+            i = indices[0]
+            return lambda partes: (partes[i],)
+        return itemgetter(*indices)
+
+    @classmethod
+    def desde_cabecera(cls, linea_cabecera, campos_float=CAMPOS_NUMERICOS, min_campos=None):
+        """Construye el parser a partir de la línea de cabecera de un CSV."""
+        cabecera = [c.strip().lower() for c in linea_cabecera.strip().split(',')]
+        return cls(cabecera, campos_float, min_campos)
+
+    def _partes(self, linea):
+        """Split + validación. Devuelve la lista de n campos o None."""
+        partes = linea.split(',')
+        k = len(partes)
+        if k < self.min_campos:
+            return None
+        if partes[0].strip().lower() in _NOMBRES_CABECERA:
+            return None
+        if k < self.n:
+            partes += self._relleno[k:]
+        return partes
+
+    def parsear(self, linea):
+        """Convierte una línea en diccionario {campo: valor}. None si no es válida."""
+        partes = self._partes(linea)
+        if partes is None:
+            return None
+        numeros = self._coger_float(partes)
+        try:
+            numeros = list(map(float, numeros))
+        except ValueError:
+            numeros = list(map(_a_float, numeros))
+        textos = [t.strip() for t in self._coger_texto(partes)]
+        return dict(zip(self._claves, numeros + textos))
+
+    def parse_many(self, lineas, relleno=0.0):
+        """
+        Ruta masiva: convierte muchas líneas a columnas.
+        Devuelve {campo: array('d') | list[str]} más las claves especiales
+        '_filas' (líneas válidas) e '_invalidas'. Los números vacíos o
+        corruptos valen `relleno` (0.0 como parsear(); float('nan') para
+        poder descartar esas filas después).
+
+        Las líneas con el nº exacto de campos se unen en un solo texto y se
+        parten con UN split; cada columna es entonces un slice con paso n.
+        Si todas las líneas son correctas (lo normal) la comprobación se hace
+        entera en C con map(); si no, solo las líneas raras (cortas, largas o
+        cabecera) pasan por _partes().
+        """
+        n  = self.n
+        n1 = n - 1
+        lineas = lineas if isinstance(lineas, list) else list(lineas)
+        invalidas = 0
+
+        comas = set(map(str.count, lineas, repeat(',')))
+        if comas == {n1} and _INICIALES_CABECERA.isdisjoint(map(itemgetter(0), lineas)):
+            validas = lineas
+        else:
+            validas = []
+            for linea in lineas:
+                if linea.count(',') == n1 and linea[:1] not in _INICIALES_CABECERA:
+                    validas.append(linea)
+                    continue
+                partes = self._partes(linea)
+                if partes is None:
+                    invalidas += 1
+                else:
+                    validas.append(','.join(partes[:n]))
+
+        columnas = {}
+        plano = ','.join(validas).split(',') if validas else []
+        for i, campo in zip(self.idx_float, self.campos_float):
+            columnas[campo] = _columna_float(plano[i::n], relleno)
+        for i, campo in zip(self.idx_texto, self.campos_texto):
+            columnas[campo] = [t.strip() for t in plano[i::n]]
+
+        columnas['_filas'] = len(validas)
+        columnas['_invalidas'] = invalidas
+        return columnas
@@ -0,0 +1,257 @@
+"""
+============================================================
+  CANSAT CAELUM — Contador de pérdidas por num_paquete
+  IES Diego Velázquez
+============================================================
+  Sigue la continuidad de num_paquete paquete a paquete, con
+  coste O(1) por paquete, y cuenta por fase de vuelo:
+
+    - perdidos:    huecos en la numeración (5, 6, 9 → 2 perdidos)
+    - duplicados:  un num_paquete que ya había llegado
+    - reordenados: llega un paquete con número menor que el último;
+                   si se había dado por perdido, se descuenta de
+                   perdidos (un número que nunca fue hueco, como uno
+                   anterior al primero recibido, no toca perdidos)
+    - reinicios:   num_paquete vuelve a empezar (Arduino reiniciado)
+    - tasa de pérdida acumulada y de los últimos N_RECIENTES
+      paquetes esperados
+
+  Uso en vivo (receptor_telemetria.py):
+      contador = ContadorPerdidas()
+      contador.registrar(payload['num_paquete'], payload['fase'])
+      contador.linea()                  # resumen corto
+      contador.guardar_json(ruta)       # al cerrar
+
+  Uso offline sobre cualquier CSV con num_paquete:
+      python perdidas_paquetes.py datos_radio.csv
+      python perdidas_paquetes.py sesion1.csv sesion2.csv   → comparar
+============================================================
+"""
+
+import csv
+import json
+import os
+import sys
+from collections import deque
+
+N_RECIENTES = 100    # paquetes esperados para la tasa de pérdida reciente
+VENTANA     = 1024   # nº de paquetes hacia atrás en los que se reconoce un duplicado/reordenado
+SALTO_REINICIO = 1000   # si num_paquete retrocede más que esto, se da por reinicio
+
+
+class _Tasa:
+    """Pérdida de los últimos `n` paquetes esperados, con sumas incrementales."""
+
+    def __init__(self, n=N_RECIENTES):
+        self.n = n
+        self._eventos  = deque()   # (esperados, perdidos) de cada paquete recibido
+        self._esperados = 0
+        self._perdidos  = 0
+
+    def anotar(self, esperados, perdidos):
+        self._eventos.append((esperados, perdidos))
+        self._esperados += esperados
+        self._perdidos  += perdidos
+        while self._esperados - self._eventos[0][0] >= self.n:
+            e, p = self._eventos.popleft()
+            self._esperados -= e
+            self._perdidos  -= p
+
+    def corregir(self):
+        """Un paquete dado por perdido ha llegado tarde."""
+        if self._perdidos > 0:
+            self._perdidos -= 1
+
+    @property
+    def valor(self):
+        return self._perdidos / self._esperados if self._esperados else 0.0
+
+
+class _Fase:
+    __slots__ = ('recibidos', 'perdidos', 'duplicados', 'reordenados', 'tasa')
+
+    def __init__(self):
+        self.recibidos   = 0
+        self.perdidos    = 0
+        self.duplicados  = 0
+        self.reordenados = 0
+        self.tasa        = _Tasa()
+
+    @property
+    def tasa_total(self):
+        esperados = self.recibidos + self.perdidos
+        return self.perdidos / esperados if esperados else 0.0
+
+    def resumen(self):
+        return {'recibidos':   self.recibidos,
+                'perdidos':    self.perdidos,
+                'duplicados':  self.duplicados,
+                'reordenados': self.reordenados,
+                'perdida':     round(self.tasa_total, 4),
+                'perdida_reciente': round(self.tasa.valor, 4)}
+
+
+class ContadorPerdidas:
+    """Huecos, duplicados y reordenaciones de num_paquete, por fase y en total."""
+
+    def __init__(self, ventana=VENTANA, salto_reinicio=SALTO_REINICIO):
+        self.ventana        = ventana
+        self.salto_reinicio = salto_reinicio
+        self.total     = _Fase()
+        self.fases     = {}
+        self.reinicios = 0
+        self.hueco_max = 0
+        self.huecos    = 0          # nº de huecos (rachas de paquetes perdidos)
+        self._ultimo   = None
+        self._vistos   = set()      # num_paquete recibidos dentro de la ventana
+        self._orden    = deque()    # los mismos, por orden de llegada (para olvidar)
+        self._fase_de_hueco = {}    # num perdido dentro de la ventana → fase a la que se imputó
+
+    def _fase(self, fase):
+        f = self.fases.get(fase)
+        if f is None:
+            f = self.fases[fase] = _Fase()
+        return f
+
+    def _recordar(self, num):
+        self._vistos.add(num)
+        self._orden.append(num)
+        if len(self._orden) > self.ventana:
+            self._vistos.discard(self._orden.popleft())
+
+    def registrar(self, num, fase=''):
+        """Anota un paquete recibido. Devuelve 'ok', 'hueco', 'duplicado', 'reordenado' o 'reinicio'."""
+        num = int(num)
+        fase = (fase or '').strip().lower() or '—'
+        f = self._fase(fase)
+
+        if self._ultimo is None or num < self._ultimo - self.salto_reinicio:
+            if self._ultimo is not None:
+                self.reinicios += 1
+            self._vistos.clear()
+            self._orden.clear()
+            self._fase_de_hueco.clear()
+            self._ultimo = num
+            self._recordar(num)
+            for x in (self.total, f):
+                x.recibidos += 1
+                x.tasa.anotar(1, 0)
+            return 'ok' if self.reinicios == 0 else 'reinicio'
+
+        if num in self._vistos:
+            self.total.duplicados += 1
+            f.duplicados += 1
+            return 'duplicado'
+
+        if num <= self._ultimo:
+            # Llega tarde: ¿lo habíamos dado por perdido dentro de la ventana?
+            if num > self._ultimo - self.ventana:
+                self._recordar(num)
+                fase_hueco = self._fase_de_hueco.pop(num, None)
+                if fase_hueco is not None:
+                    fh = self._fase(fase_hueco)
+                    for x in (self.total, fh):
+                        x.perdidos -= 1
+                        x.tasa.corregir()
+                for x in (self.total, f):
+                    x.recibidos += 1
+                    x.reordenados += 1
+                    if fase_hueco is None:   # no se esperaba: cuenta como recibido de más
+                        x.tasa.anotar(1, 0)
+                return 'reordenado'
+            self.total.duplicados += 1   # demasiado antiguo para saberlo: se trata como copia
+            f.duplicados += 1
+            return 'duplicado'
+
+        perdidos = num - self._ultimo - 1
+        if perdidos:
+            self.huecos += 1
+            self.hueco_max = max(self.hueco_max, perdidos)
+            # Solo se recuerda la fase de los huecos que aún pueden rellenarse
+            for hueco in range(max(self._ultimo + 1, num - self.ventana), num):
+                self._fase_de_hueco[hueco] = fase
+        self._ultimo = num
+        self._recordar(num)
+        for x in (self.total, f):
+            x.recibidos += 1
+            x.perdidos  += perdidos
+            x.tasa.anotar(perdidos + 1, perdidos)
+        if len(self._fase_de_hueco) > 4 * self.ventana:
+            limite = num - self.ventana
+            self._fase_de_hueco = {k: v for k, v in self._fase_de_hueco.items() if k > limite}
+        return 'hueco' if perdidos else 'ok'
+
+    # ── Resultados ──────────────────────────────────────────────────
+    def resumen(self):
+        return {'total':     self.total.resumen(),
+                'huecos':    self.huecos,
+                'hueco_max': self.hueco_max,
+                'reinicios': self.reinicios,
+                'fases':     {fase: f.resumen() for fase, f in self.fases.items()}}
+
+    def linea(self):
+        t = self.total
+        return (f"{t.recibidos} recibidos  {t.perdidos} perdidos ({t.tasa_total:.1%}, "
+                f"últimos {N_RECIENTES}: {t.tasa.valor:.1%})  duplicados: {t.duplicados}  "
+                f"reordenados: {t.reordenados}  hueco máx.: {self.hueco_max}"
+                + (f"  reinicios: {self.reinicios}" if self.reinicios else ""))
+
+    def tabla(self):
+        """Líneas de texto con una fila por fase + total."""
+        filas = [f"   {'Fase':<12} {'recibidos':>9} {'perdidos':>9} {'pérdida':>8} "
+                 f"{'duplic.':>8} {'reord.':>7}"]
+        for fase, f in list(self.fases.items()) + [('TOTAL', self.total)]:
+            filas.append(f"   {fase:<12} {f.recibidos:>9} {f.perdidos:>9} {f.tasa_total:>8.1%} "
+                         f"{f.duplicados:>8} {f.reordenados:>7}")
+        return filas
+
+    def guardar_json(self, ruta):
+        tmp = ruta + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.resumen(), f, indent=2, ensure_ascii=False)
+        os.replace(tmp, ruta)
+
+
+def archivo_perdidas(ruta_csv):
+    """datos_radio.csv → datos_radio_perdidas.json"""
+    return os.path.splitext(ruta_csv)[0] + '_perdidas.json'
+
+
+def analizar_csv(ruta, contador=None):
+    """Pasa todas las filas de un CSV (con columna num_paquete) por un ContadorPerdidas."""
+    contador = contador or ContadorPerdidas()
+    with open(ruta, 'r', encoding='utf-8', newline='') as f:
+        lector = csv.DictReader(f)
+        campos = [c.strip() for c in (lector.fieldnames or [])]
+        if 'num_paquete' not in campos:
+            raise ValueError(f"{ruta} no tiene columna num_paquete")
+        lector.fieldnames = campos
+        for fila in lector:
+            try:
+                num = int(float(fila['num_paquete']))
+            except (TypeError, ValueError):
+                continue
+            contador.registrar(num, fila.get('fase') or '')
+    return contador
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python perdidas_paquetes.py datos_radio.csv [otra_sesion.csv ...]")
+        sys.exit(1)
+
+    for ruta in sys.argv[1:]:
+        try:
+            contador = analizar_csv(ruta)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            continue
+        print(f"\n📡 {ruta}")
+        print("\n".join(contador.tabla()))
+        print(f"   Huecos: {contador.huecos}  (máx. {contador.hueco_max} seguidos)"
+              + (f"  reinicios: {contador.reinicios}" if contador.reinicios else ""))
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+============================================================
+  CANSAT CAELUM — Pruebas del archivo columnar
+  IES Diego Velázquez
+============================================================
+    - ida y vuelta CSV → segmentos .npz → columnas: mismos
+      valores que parse_many() (float32 donde toca, lat/lon
+      y timestamp exactos)
+    - convertir_csv() dos veces sustituye el archivo, no
+      duplica filas ni deja carpetas .nuevo / .viejo
+    - EscritorColumnar sobre un archivo existente añade
+      detrás (receptor relanzado)
+    - filtro por fases y leer_dataframe()
+
+  Uso (necesita NumPy; leer_dataframe, pandas):
+      python -m pytest test_archivo_columnar.py
+      python test_archivo_columnar.py
+============================================================
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+    import archivo_columnar as ac
+except ImportError:   # sin NumPy no hay archivo columnar
+    np = None
+
+from parser_telemetria import ParserTelemetria
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+CSV  = os.path.join(RAIZ, 'data', 'simulacion', 'datos_simulacion.csv')
+
+
+@unittest.skipIf(np is None, "necesita NumPy")
+class PruebasArchivoColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp(prefix="columnar_")
+        self.csv = os.path.join(self.carpeta, 'datos_radio.csv')
+        shutil.copyfile(CSV, self.csv)
+        with open(CSV, 'r', encoding='utf-8') as f:
+            self.parser = ParserTelemetria.desde_cabecera(f.readline(), min_campos=1)
+            self.esperado = self.parser.parse_many(f.read().splitlines())
+        self.n = self.esperado['_filas']
+
+    def tearDown(self):
+        shutil.rmtree(self.carpeta, ignore_errors=True)
+
+    def comprobar_igual(self, cols, esperado, filas=None):
+        """Columnas leídas frente a las de parse_many (filas = índices a comparar)."""
+        for campo in self.parser.cabecera:
+            valores = esperado[campo] if filas is None else [esperado[campo][i] for i in filas]
+            if campo in ac.CATEGORICAS or campo not in ac.CAMPOS_NUMERICOS:
+                self.assertEqual(cols[campo].tolist(), list(valores), campo)
+            else:
+                tipo = ac._tipo(campo)
+                self.assertEqual(cols[campo].dtype, tipo, campo)
+                np.testing.assert_array_equal(cols[campo], np.asarray(valores).astype(tipo), campo)
+
+    # ── Pruebas ──
+    def test_ida_y_vuelta(self):
+        destino = ac.convertir_csv(self.csv, cada_filas=25)
+        self.assertEqual(destino, os.path.join(self.carpeta, 'datos_radio_columnas'))
+        self.assertTrue(ac.es_columnar(destino))
+        self.assertFalse(ac.es_columnar(self.csv))
+        segmentos = ac.estadisticas(destino)
+        self.assertEqual(len(segmentos), -(-self.n // 25))
+        self.assertEqual(sum(s['filas'] for s in segmentos), self.n)
+        self.comprobar_igual(ac.leer_columnas(destino), self.esperado)
+
+    def test_convertir_dos_veces_sustituye(self):
+        ac.convertir_csv(self.csv, cada_filas=25)
+        destino = ac.convertir_csv(self.csv, cada_filas=40)
+        self.assertEqual(len(ac.leer_columnas(destino, ['alt'])['alt']), self.n)
+        self.assertEqual(len(ac.estadisticas(destino)), -(-self.n // 40))
+        self.assertEqual(sorted(os.listdir(self.carpeta)), ['datos_radio.csv', 'datos_radio_columnas'])
+
+    def test_escritor_anade_detras(self):
+        destino = ac.archivo_columnar(self.csv)
+        mitad = self.n // 2
+        primera = {c: v[:mitad] for c, v in self.esperado.items() if not c.startswith('_')}
+        segunda = {c: v[mitad:] for c, v in self.esperado.items() if not c.startswith('_')}
+        with ac.EscritorColumnar(destino, self.parser.cabecera, cada_filas=30) as escritor:
+            escritor.escribir_columnas(primera)
+        with ac.EscritorColumnar(destino, self.parser.cabecera, cada_filas=30) as escritor:
+            for i in range(self.n - mitad):
+                escritor.escribir({c: v[i] for c, v in segunda.items()})
+        self.comprobar_igual(ac.leer_columnas(destino), self.esperado)
+
+    def test_fases_y_dataframe(self):
+        destino = ac.convertir_csv(self.csv, cada_filas=25)
+        fases = {'descenso'}
+        filas = [i for i, f in enumerate(self.esperado['fase']) if f in fases]
+        self.assertTrue(filas)
+        self.comprobar_igual(ac.leer_columnas(destino, fases=fases), self.esperado, filas)
+        try:
+            import pandas  # noqa: F401
+        except ImportError:
+            return
+        df = ac.leer_dataframe(destino, ['alt', 'fase'], fases=fases)
+        self.assertEqual(len(df), len(filas))
+        self.assertEqual(str(df['fase'].dtype), 'category')
+        self.assertEqual(set(df['fase']), fases)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2, argv=[sys.argv[0]] + sys.argv[1:])
@@ -0,0 +1,179 @@
+"""
+============================================================
+  CANSAT CAELUM — Pruebas de LectorTramas con puerto virtual
+  IES Diego Velázquez
+============================================================
+  Abre un par de pseudoterminales (pty) en modo raw: por el
+  extremo maestro se escriben bytes como lo haría la radio y
+  LectorTramas lee del esclavo con un serial.Serial normal.
+
+    - tramas partidas entre lecturas (y \\r\\n)
+    - cola incompleta al terminar la transmisión
+    - tramas corruptas o demasiado largas: se descartan y el
+      lector se sincroniza en el siguiente separador
+    - caudal a 115200 baudios (ritmo real de la radio) y a
+      toda velocidad
+
+  Uso (Linux / macOS — Windows no tiene pty):
+      python -m pytest test_lector_tramas.py
+      python test_lector_tramas.py
+============================================================
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+try:
+    import pty   # noqa: F401  (solo para saber si hay pty)
+    import tty
+    import serial
+except ImportError:   # Windows o sin pyserial
+    serial = None
+
+from lector_tramas import TAM_MAX_TRAMA, LectorTramas
+
+BAUDIOS = 115200
+RAIZ    = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+CSV     = os.path.join(RAIZ, 'data', 'simulacion', 'datos_simulacion.csv')
+
+
+def tramas_de_vuelo():
+    """Líneas reales del CSV de simulación (sin cabecera), como bytes."""
+    with open(CSV, 'rb') as f:
+        return [l.rstrip(b'\r\n') for l in f.read().splitlines()[1:] if l.strip()]
+
+
+@unittest.skipIf(serial is None or not hasattr(os, 'openpty'), "necesita pty y pyserial")
+class PruebasLectorPty(unittest.TestCase):
+
+    def setUp(self):
+        self.maestro, self.esclavo = os.openpty()
+        tty.setraw(self.esclavo)
+        self.ser = serial.Serial(os.ttyname(self.esclavo), BAUDIOS, timeout=0.05)
+        self.lector = LectorTramas(self.ser)
+
+    def tearDown(self):
+        self.ser.close()
+        os.close(self.maestro)
+        os.close(self.esclavo)
+
+    # ── Ayudas ──
+    def escribir(self, datos):
+        vista = memoryview(datos)
+        while vista:
+            vista = vista[os.write(self.maestro, vista):]
+
+    def escribir_en_hilo(self, bloques, baudios=None):
+        """Escribe los bloques desde otro hilo (el pty solo guarda ~4 KB), a `baudios` o sin pausa."""
+        def emitir():
+            t0, enviados = time.monotonic(), 0
+            for bloque in bloques:
+                if baudios:
+                    espera = t0 + enviados * 10 / baudios - time.monotonic()   # 8N1: 10 bits/byte
+                    if espera > 0:
+                        time.sleep(espera)
+                self.escribir(bloque)
+                enviados += len(bloque)
+        hilo = threading.Thread(target=emitir, daemon=True)
+        hilo.start()
+        return hilo
+
+    def leer_hasta(self, n, limite=5.0):
+        """Lee hasta tener n tramas (o agotar el límite)."""
+        tramas, fin = [], time.monotonic() + limite
+        while len(tramas) < n and time.monotonic() < fin:
+            tramas += self.lector.leer()
+        return tramas
+
+    def esperar_pendiente(self, n, limite=2.0):
+        fin = time.monotonic() + limite
+        while self.lector.pendiente != n and time.monotonic() < fin:
+            self.assertEqual(self.lector.leer(), [])
+        self.assertEqual(self.lector.pendiente, n)
+
+    def esperar_malformadas(self, n, limite=2.0):
+        """Lee (sin esperar tramas buenas) hasta contar n malformadas."""
+        tramas, fin = [], time.monotonic() + limite
+        while self.lector.malformadas < n and time.monotonic() < fin:
+            tramas += self.lector.leer()
+        self.assertEqual(self.lector.malformadas, n)
+        return tramas
+
+    # ── Pruebas ──
+    def test_trama_partida_entre_lecturas(self):
+        self.escribir(b'1,CAELUM,10')
+        self.esperar_pendiente(11)
+        self.escribir(b'.5,40.1\n2,CAE')
+        self.assertEqual(self.leer_hasta(1), ['1,CAELUM,10.5,40.1'])
+        self.esperar_pendiente(5)
+        self.escribir(b'LUM,11.0\r\n3,CAELUM,11.5\n')
+        self.assertEqual(self.leer_hasta(2), ['2,CAELUM,11.0', '3,CAELUM,11.5'])
+        self.assertEqual(self.lector.pendiente, 0)
+        self.assertEqual(self.lector.malformadas, 0)
+
+    def test_cola_incompleta_al_terminar(self):
+        vuelo = tramas_de_vuelo()[:3]
+        cola = vuelo[0][:40]   # la radio se corta a mitad de línea
+        self.escribir(b'\n'.join(vuelo) + b'\n' + cola)
+        self.assertEqual(self.leer_hasta(3), [t.decode() for t in vuelo])
+        self.esperar_pendiente(len(cola))
+        # Sin más datos: la cola se guarda, no sale como trama ni cuenta como corrupta
+        for _ in range(3):
+            self.assertEqual(self.lector.leer(), [])
+        self.assertEqual(self.lector.tramas, 3)
+        self.assertEqual(self.lector.malformadas, 0)
+        self.assertEqual(self.lector.pendiente, len(cola))
+
+    def test_corruptas_y_largas_se_descartan(self):
+        buena = tramas_de_vuelo()[0]
+        self.escribir(buena + b'\n' + b'\xff\xfe,basura\n')      # la segunda no es UTF-8
+        self.assertEqual(self.esperar_malformadas(1), [buena.decode()])
+
+        # Trama larga que llega en dos escrituras: la primera ya pasa del máximo
+        # sin separador y se tira; el resto hasta el '\n' tampoco debe salir
+        larga = b'9' * (3 * TAM_MAX_TRAMA)
+        self.escribir(larga[:TAM_MAX_TRAMA + 10])
+        self.assertEqual(self.esperar_malformadas(2), [])
+        self.assertEqual(self.lector.pendiente, 0)
+        self.escribir(larga[TAM_MAX_TRAMA + 10:] + b'\n' + buena + b'\n')
+        self.assertEqual(self.leer_hasta(1), [buena.decode()])
+
+        # Larga con su separador en la misma lectura
+        self.escribir(b'x' * (TAM_MAX_TRAMA + 1) + b'\n' + buena + b'\n')
+        self.assertEqual(self.leer_hasta(1), [buena.decode()])
+        self.assertEqual(self.lector.malformadas, 3)
+        self.assertEqual(self.lector.tramas, 3)
+        self.assertEqual(self.lector.pendiente, 0)
+
+    def test_caudal_a_115200(self):
+        vuelo = tramas_de_vuelo()
+        bloques = [t + b'\n' for t in vuelo]
+        hilo = self.escribir_en_hilo(bloques, baudios=BAUDIOS)
+        tramas = self.leer_hasta(len(bloques), limite=10)
+        hilo.join()
+        self.assertEqual(tramas, [t.decode() for t in vuelo])
+        # Va al día: nada por detrás de la radio al acabar de emitir
+        self.assertLess(self.ser.in_waiting, 256)
+        self.assertEqual(self.lector.malformadas, 0)
+
+    def test_caudal_maximo(self):
+        vuelo = tramas_de_vuelo()
+        repeticiones = 200
+        bloque = b''.join(t + b'\n' for t in vuelo)
+        t0 = time.perf_counter()
+        self.escribir_en_hilo([bloque] * repeticiones)
+        tramas = self.leer_hasta(len(vuelo) * repeticiones, limite=20)
+        dt = time.perf_counter() - t0
+        self.assertEqual(len(tramas), len(vuelo) * repeticiones)
+        bytes_s = len(bloque) * repeticiones / dt
+        # Al menos 10 veces lo que entrega una radio a 115200 baudios
+        self.assertGreater(bytes_s, 10 * BAUDIOS / 10, f"{bytes_s:.0f} B/s")
+        # Lectura en bloque: varias tramas por readinto
+        self.assertLess(self.lector.lecturas, self.lector.tramas)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2, argv=[sys.argv[0]] + sys.argv[1:])
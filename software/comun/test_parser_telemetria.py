@@ -0,0 +1,86 @@
+"""
+============================================================
+  CANSAT CAELUM — Pruebas de ParserTelemetria
+  IES Diego Velázquez
+============================================================
+  parse_many() (ruta masiva) tiene que dar exactamente lo
+  mismo que parsear() línea a línea:
+
+    - con el CSV de simulación (ruta rápida, todo en C)
+    - con líneas raras mezcladas: cabecera reenviada, cortas,
+      largas, números vacíos o corruptos
+    - relleno=nan marca los números que no se pudieron leer
+
+  Uso:
+      python -m pytest test_parser_telemetria.py
+      python test_parser_telemetria.py
+============================================================
+"""
+
+import math
+import os
+import sys
+import unittest
+
+from parser_telemetria import ParserTelemetria
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+CSV  = os.path.join(RAIZ, 'data', 'simulacion', 'datos_simulacion.csv')
+
+
+def leer_csv():
+    with open(CSV, 'r', encoding='utf-8') as f:
+        return f.readline(), f.read().splitlines()
+
+
+class PruebasParser(unittest.TestCase):
+
+    def comparar(self, parser, lineas):
+        """parse_many(lineas) frente a parsear() de cada línea válida."""
+        cols = parser.parse_many(lineas)
+        una_a_una = [d for d in map(parser.parsear, lineas) if d is not None]
+        self.assertEqual(cols['_filas'], len(una_a_una))
+        self.assertEqual(cols['_invalidas'], len(lineas) - len(una_a_una))
+        for campo in parser.cabecera:
+            self.assertEqual(list(cols[campo]), [d[campo] for d in una_a_una], campo)
+        return cols
+
+    def test_simulacion(self):
+        cabecera, lineas = leer_csv()
+        parser = ParserTelemetria.desde_cabecera(cabecera)
+        cols = self.comparar(parser, lineas)
+        self.assertEqual(cols['_filas'], len(lineas))
+        self.assertEqual(cols['_invalidas'], 0)
+
+    def test_lineas_raras(self):
+        cabecera, lineas = leer_csv()
+        parser = ParserTelemetria.desde_cabecera(cabecera)
+        buena = lineas[10]
+        partes = buena.split(',')
+        corrupta = ','.join(partes[:4] + ['4x0.1'] + partes[5:])
+        vacia    = ','.join(partes[:4] + [''] + partes[5:])
+        raras = [
+            cabecera.strip(),                    # cabecera reenviada por el Arduino
+            ','.join(partes[:-1]),               # falta el último campo → se rellena
+            ','.join(partes[:5]),                # demasiado corta → inválida
+            buena + ',extra,campos',             # campos de más → se ignoran
+            corrupta,
+            vacia,
+            '',
+        ]
+        self.comparar(parser, lineas[:10] + raras + lineas[10:20])
+
+    def test_relleno_nan(self):
+        parser = ParserTelemetria(['num_paquete', 'lat', 'lon', 'fase'])
+        cols = parser.parse_many(['1,40.4,-3.7,espera', '2,,-3.7,espera', '3,4x,-3.7,espera'],
+                                 relleno=float('nan'))
+        self.assertEqual(cols['lat'][0], 40.4)
+        self.assertTrue(math.isnan(cols['lat'][1]))
+        self.assertTrue(math.isnan(cols['lat'][2]))
+        self.assertEqual(list(cols['lon']), [-3.7] * 3)
+        # Por defecto, como parsear(): 0.0
+        self.assertEqual(list(parser.parse_many(['2,,-3.7,espera'])['lat']), [0.0])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2, argv=[sys.argv[0]] + sys.argv[1:])
@@ -0,0 +1,72 @@
+"""
+============================================================
+  CANSAT CAELUM — Pruebas de ContadorPerdidas
+  IES Diego Velázquez
+============================================================
+    - hueco y llegada tarde del paquete perdido (reordenado
+      que se descuenta de perdidos, en la fase del hueco)
+    - número anterior al primero recibido o fuera de orden
+      sin hueco: no toca perdidos, la pérdida nunca es < 0
+    - duplicados y reinicio del Arduino
+
+  Uso:
+      python -m pytest test_perdidas_paquetes.py
+      python test_perdidas_paquetes.py
+============================================================
+"""
+
+import sys
+import unittest
+
+from perdidas_paquetes import ContadorPerdidas
+
+
+class PruebasContadorPerdidas(unittest.TestCase):
+
+    def registrar(self, contador, *nums, fase='descenso'):
+        return [contador.registrar(n, fase) for n in nums]
+
+    def test_hueco_y_llegada_tarde(self):
+        c = ContadorPerdidas()
+        self.assertEqual(self.registrar(c, 5, 6, 9), ['ok', 'ok', 'hueco'])
+        self.assertEqual(c.total.perdidos, 2)
+        self.assertEqual((c.huecos, c.hueco_max), (1, 2))
+
+        # El 7 llega tarde (ya en otra fase): se descuenta en la fase del hueco
+        self.assertEqual(c.registrar(7, 'aterrizaje'), 'reordenado')
+        self.assertEqual(c.total.perdidos, 1)
+        self.assertEqual(c.fases['descenso'].perdidos, 1)
+        self.assertEqual(c.fases['aterrizaje'].reordenados, 1)
+        self.assertEqual(c.total.recibidos, 4)
+        self.assertAlmostEqual(c.total.tasa_total, 1 / 5)
+
+        # Repetido: ya no es hueco, es duplicado
+        self.assertEqual(c.registrar(7), 'duplicado')
+        self.assertEqual(c.total.perdidos, 1)
+        self.assertEqual(c.total.duplicados, 1)
+
+    def test_fuera_de_orden_sin_hueco(self):
+        c = ContadorPerdidas()
+        self.assertEqual(self.registrar(c, 50, 49, 51), ['ok', 'reordenado', 'ok'])
+        self.assertEqual(c.total.recibidos, 3)
+        self.assertEqual(c.total.perdidos, 0)
+        self.assertEqual(c.total.reordenados, 1)
+        self.assertEqual(c.total.tasa_total, 0.0)
+        self.assertEqual(c.total.tasa.valor, 0.0)
+
+        # Con un hueco abierto, un número que no era hueco tampoco lo cierra
+        self.registrar(c, 55, 48)
+        self.assertEqual(c.total.perdidos, 3)
+        self.assertGreaterEqual(c.total.tasa.valor, 0.0)
+
+    def test_reinicio(self):
+        c = ContadorPerdidas(salto_reinicio=100)
+        self.registrar(c, 500, 501)
+        self.assertEqual(c.registrar(1), 'reinicio')
+        self.assertEqual(c.registrar(2), 'ok')
+        self.assertEqual(c.reinicios, 1)
+        self.assertEqual(c.total.perdidos, 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2, argv=[sys.argv[0]] + sys.argv[1:])
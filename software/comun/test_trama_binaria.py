@@ -0,0 +1,134 @@
+"""
+============================================================
+  CANSAT CAELUM — Pruebas de la trama binaria de radio
+  IES Diego Velázquez
+============================================================
+    - ida y vuelta: codificar → decodificar da el mismo dict
+      que ParserTelemetria con la línea CSV equivalente
+    - saturación de valores fuera de rango
+    - CRC: un byte cambiado invalida la trama
+    - resincronización: basura, tramas rotas y cortadas entre
+      lecturas con LectorTramasBinarias y decodificar_columnas
+      (ruta struct y NumPy)
+
+  Uso:
+      python -m pytest test_trama_binaria.py
+      python test_trama_binaria.py
+============================================================
+"""
+
+import csv
+import os
+import sys
+import unittest
+
+from parser_telemetria import ParserTelemetria
+from trama_binaria import (CABECERA, SYNC, TAM_TRAMA, LectorTramasBinarias, _linea_radio,
+                           codificar, decodificar, decodificar_columnas, np)
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+CSV  = os.path.join(RAIZ, 'data', 'simulacion', 'datos_simulacion.csv')
+
+
+def filas_de_vuelo():
+    with open(CSV, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+class PuertoFalso:
+    """Lo mínimo de serial.Serial que usa LectorTramas: in_waiting y readinto, por bloques."""
+
+    def __init__(self, bloques):
+        self.bloques = list(bloques)
+
+    @property
+    def in_waiting(self):
+        return len(self.bloques[0]) if self.bloques else 0
+
+    def readinto(self, destino):
+        if not self.bloques:
+            return 0
+        bloque = self.bloques.pop(0)
+        destino[:len(bloque)] = bloque
+        return len(bloque)
+
+
+class PruebasTramaBinaria(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.filas  = filas_de_vuelo()
+        cls.tramas = [codificar(f, num_paquete=i + 1)[0] for i, f in enumerate(cls.filas)]
+
+    def test_ida_y_vuelta_igual_que_el_parser_csv(self):
+        parser = ParserTelemetria(CABECERA)
+        for i, (fila, trama) in enumerate(zip(self.filas, self.tramas)):
+            self.assertEqual(len(trama), TAM_TRAMA)
+            esperado = parser.parsear(_linea_radio(fila, i).decode().strip())
+            self.assertEqual(decodificar(trama), esperado)
+
+    def test_saturados(self):
+        payload = {'num_paquete': 1, 'alt': 1e6, 'temp_hs': -500, 'lat': 40.4, 'fase': 'descenso'}
+        trama, saturados = codificar(payload)
+        self.assertEqual(saturados, 2)
+        d = decodificar(trama)
+        self.assertEqual(d['alt'], (2**15 - 1) / 10)
+        self.assertEqual(d['temp_hs'], -2**15 / 100)
+        self.assertEqual(d['lat'], 40.4)
+        self.assertEqual(d['fase'], 'descenso')
+        # Fase desconocida y datetime GPS
+        d = decodificar(codificar({'fase': 'otra', 'datetime': 'UTC_12:34:56'})[0])
+        self.assertEqual((d['fase'], d['datetime']), ('desconocida', 'UTC_12:34:56'))
+
+    def test_crc(self):
+        trama = self.tramas[0]
+        for i in range(2, TAM_TRAMA):   # cualquier byte tras la sincronía, CRC incluido
+            rota = bytearray(trama)
+            rota[i] ^= 0x01
+            self.assertIsNone(decodificar(bytes(rota)), f"byte {i}")
+        self.assertIsNone(decodificar(trama[:-1]))
+
+    def flujo_sucio(self):
+        """Basura + tramas buenas + una con CRC mal + una con SYNC en los datos → (bytes, buenas)."""
+        buenas = self.tramas[:6]
+        rota = bytearray(self.tramas[6])
+        rota[20] ^= 0xFF
+        datos = (b'\x00basura' + SYNC[:1] + buenas[0] + buenas[1] + bytes(rota) + buenas[2]
+                 + SYNC + b'\x01' + buenas[3] + buenas[4] + b'\xca' + buenas[5])
+        return datos, buenas
+
+    def test_lector_se_resincroniza(self):
+        datos, buenas = self.flujo_sucio()
+        # Cortes en sitios incómodos: a mitad de SYNC, de cabecera y de CRC
+        cortes = [3, 9, 10, 50, 111, TAM_TRAMA * 3 + 1, len(datos) - 3, len(datos)]
+        bloques = [datos[a:b] for a, b in zip([0] + cortes, cortes)]
+        lector = LectorTramasBinarias(PuertoFalso(bloques))
+        recibidas = []
+        for _ in range(len(bloques)):
+            recibidas += lector.leer()
+        self.assertEqual(recibidas, buenas)
+        self.assertEqual(lector.tramas, len(buenas))
+        self.assertGreaterEqual(lector.malformadas, 1)
+        self.assertEqual(lector.pendiente, 0)
+
+        # Trama cortada al final: se guarda hasta que llega el resto
+        lector = LectorTramasBinarias(PuertoFalso([buenas[0][:30], buenas[0][30:]]))
+        self.assertEqual(lector.leer(), [])
+        self.assertEqual(lector.pendiente, 30)
+        self.assertEqual(lector.leer(), [buenas[0]])
+
+    def test_columnas_struct_y_numpy(self):
+        datos, buenas = self.flujo_sucio()
+        esperado = [decodificar(t) for t in buenas]
+        rutas = [False] + ([True] if np is not None else [])
+        for usar_numpy in rutas:
+            cols = decodificar_columnas(datos, usar_numpy=usar_numpy)
+            self.assertEqual(cols['_filas'], len(buenas))
+            self.assertGreaterEqual(cols['_invalidas'], 1)
+            for campo in CABECERA:
+                self.assertEqual([float(v) if not isinstance(v, str) else v for v in cols[campo]],
+                                 [d[campo] for d in esperado], f"{campo} numpy={usar_numpy}")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2, argv=[sys.argv[0]] + sys.argv[1:])
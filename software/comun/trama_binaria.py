@@ -0,0 +1,340 @@
+"""
+============================================================
+  CANSAT CAELUM — Trama binaria de telemetría
+  IES Diego Velázquez
+============================================================
+  Alternativa compacta a la línea CSV del APC220. A 9600
+  baudios caben ~960 bytes/s: una línea CSV ocupa ~155 bytes,
+  una trama binaria TAM_TRAMA (70) → unas 2,2× más muestras/s.
+
+  FORMATO (little-endian):
+      0xCA 0xE1         palabra de sincronía
+      versión   u8      VERSION
+      longitud  u8      bytes de datos (TAM_DATOS)
+      datos             campos de CAMPOS, enteros escalados
+      crc16     u16     CRC-CCITT (0x1021, inicial 0xFFFF)
+                        de versión + longitud + datos
+
+  Cada campo viaja como entero: valor × escala (lat/lon × 1e6,
+  temperaturas × 100, presión × 10...). Los valores fuera de
+  rango se saturan. `datetime` va como u32: 0 = sin fix,
+  1..86400 = segundos del día + 1 ("UTC_hh:mm:ss" del GPS),
+  mayor = segundos Unix (fecha ISO de los simuladores).
+  `equipo` no se transmite (el receptor lo conoce).
+
+  Uso:
+      trama, saturados = codificar(payload)     # bytes, nº de campos saturados
+      payload = decodificar(trama)              # dict como ParserTelemetria
+      columnas = decodificar_columnas(datos)    # masivo (NumPy si está)
+
+      lector = LectorTramasBinarias(ser)        # igual que LectorTramas
+      for trama in lector.leer(): ...
+
+      python trama_binaria.py [datos.csv] [baudios]
+          → tamaño CSV vs binario, muestras/s por el enlace y
+            velocidad de decodificación struct / NumPy
+
+  Lo usan receptor_telemetria.py (FORMATO_RADIO = "binario")
+  y los simuladores (escriben también datos_simulacion.bin)
+============================================================
+"""
+
+import calendar
+import csv
+import os
+import struct
+import sys
+import time
+from binascii import crc_hqx
+from datetime import datetime, timezone
+
+from lector_tramas import LectorTramas
+
+try:
+    import numpy as np
+except ImportError:   # la ruta struct funciona sin NumPy
+    np = None
+
+SYNC    = b'\xca\xe1'
+VERSION = 1
+EQUIPO  = 'CAELUM'
+
+# (campo, formato struct, escala)
+CAMPOS = (
+    ('num_paquete', 'I', 1),
+    ('timestamp',   'I', 1),
+    ('datetime',    'I', None),     # codificación especial, ver arriba
+    ('lat',         'i', 1_000_000),
+    ('lon',         'i', 1_000_000),
+    ('alt',         'h', 10),
+    ('alt_mar',     'H', 10),
+    ('sats',        'B', 1),
+    ('temp_hs',     'h', 100),
+    ('hum_hs',      'H', 100),
+    ('temp_scd',    'h', 100),
+    ('hum_scd',     'H', 100),
+    ('temp_lps',    'h', 100),
+    ('presion',     'H', 10),
+    ('co2',         'H', 1),
+    ('pm1_0',       'H', 10),
+    ('pm2_5',       'H', 10),
+    ('pm10',        'H', 10),
+    ('accel_x',     'i', 100),
+    ('accel_y',     'i', 100),
+    ('accel_z',     'i', 100),
+    ('gyro_x',      'h', 10),
+    ('gyro_y',      'h', 10),
+    ('gyro_z',      'h', 10),
+    ('fase',        'B', None),     # índice en FASES
+)
+
+FASES = ('espera', 'caida_libre', 'apertura', 'descenso', 'tierra')
+_FASE_DESCONOCIDA = 255
+_INDICE_FASE = {f: i for i, f in enumerate(FASES)}
+
+# Orden de las claves del dict, igual que ParserTelemetria: números y luego texto
+CABECERA = ('num_paquete', 'equipo') + tuple(c for c, _, _ in CAMPOS if c != 'num_paquete')
+_TEXTO   = ('equipo', 'datetime', 'fase')
+
+_DATOS     = struct.Struct('<' + ''.join(f for _, f, _ in CAMPOS))
+_CABEZA    = struct.Struct('<2sBB')
+_CRC       = struct.Struct('<H')
+TAM_DATOS  = _DATOS.size
+TAM_TRAMA  = _CABEZA.size + TAM_DATOS + _CRC.size
+_VERSION_LEN = bytes((VERSION, TAM_DATOS))
+
+_LIMITES = {'b': (-2**7, 2**7 - 1), 'B': (0, 2**8 - 1), 'h': (-2**15, 2**15 - 1),
+            'H': (0, 2**16 - 1), 'i': (-2**31, 2**31 - 1), 'I': (0, 2**32 - 1)}
+_NUMERICOS = tuple((i, c, e, *_LIMITES[f]) for i, (c, f, e) in enumerate(CAMPOS) if e is not None)
+_I_DATETIME = [c for c, _, _ in CAMPOS].index('datetime')
+_I_FASE     = [c for c, _, _ in CAMPOS].index('fase')
+
+
+# ============================================================================
+#  CODIFICADOR (referencia — el Arduino debe producir los mismos bytes)
+# ============================================================================
+def _codificar_datetime(texto):
+    texto = str(texto or '').strip()
+    if not texto or texto == '0':
+        return 0
+    if texto.upper().startswith('UTC_'):
+        hh, mm, ss = (int(x) for x in texto[4:].split(':'))
+        return hh * 3600 + mm * 60 + ss + 1
+    dt = datetime.fromisoformat(texto)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return calendar.timegm(dt.timetuple())
+
+
+def codificar(payload, num_paquete=None):
+    """dict (nombres del CSV) → bytes de una trama. Devuelve (trama, nº de campos saturados)."""
+    valores = [0] * len(CAMPOS)
+    saturados = 0
+    for i, campo, escala, minimo, maximo in _NUMERICOS:
+        v = payload.get(campo)
+        if campo == 'num_paquete' and v is None and num_paquete is not None:
+            v = num_paquete
+        try:
+            n = round(float(v) * escala)
+        except (TypeError, ValueError):
+            n = 0
+        if n < minimo or n > maximo:
+            n = minimo if n < minimo else maximo
+            saturados += 1
+        valores[i] = n
+    valores[_I_DATETIME] = _codificar_datetime(payload.get('datetime'))
+    valores[_I_FASE] = _INDICE_FASE.get(str(payload.get('fase', '')).strip().lower(),
+                                        _FASE_DESCONOCIDA)
+    datos = _VERSION_LEN + _DATOS.pack(*valores)
+    return SYNC + datos + _CRC.pack(crc_hqx(datos, 0xFFFF)), saturados
+
+
+def escribir_tramas(filas, ruta):
+    """Codifica una lista de dicts en un fichero .bin (tramas seguidas). Devuelve bytes escritos."""
+    total = 0
+    with open(ruta, 'wb') as f:
+        for i, fila in enumerate(filas):
+            trama, _ = codificar(fila, num_paquete=i + 1)
+            total += f.write(trama)
+    return total
+
+
+# ============================================================================
+#  DECODIFICADOR
+# ============================================================================
+def _datetime_texto(n):
+    if n == 0:
+        return '0'
+    if n <= 86400:
+        n -= 1
+        return f"UTC_{n // 3600:02d}:{n // 60 % 60:02d}:{n % 60:02d}"
+    return datetime.fromtimestamp(n, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def _fase_texto(n):
+    return FASES[n] if n < len(FASES) else 'desconocida'
+
+
+def valida(trama):
+    """True si `trama` (bytes de una trama completa) tiene sincronía, versión y CRC correctos."""
+    return (len(trama) == TAM_TRAMA and trama[:2] == SYNC and trama[2:4] == _VERSION_LEN
+            and _CRC.unpack_from(trama, TAM_TRAMA - 2)[0]
+            == crc_hqx(memoryview(trama)[2:TAM_TRAMA - 2], 0xFFFF))
+
+
+def decodificar(trama, equipo=EQUIPO):
+    """
+    Bytes de una trama → dict con los mismos campos y tipos que
+    ParserTelemetria.parsear() (números float, texto str). None si no es válida.
+    """
+    if not valida(trama):
+        return None
+    valores = _DATOS.unpack_from(trama, _CABEZA.size)
+    payload = {}
+    for i, campo, escala, _, _ in _NUMERICOS:
+        payload[campo] = valores[i] / escala
+    payload['equipo']   = equipo
+    payload['datetime'] = _datetime_texto(valores[_I_DATETIME])
+    payload['fase']     = _fase_texto(valores[_I_FASE])
+    return payload
+
+
+def buscar_tramas(datos, inicio=0):
+    """
+    Recorre `datos` buscando tramas válidas.
+    Devuelve (posiciones de las tramas, nº de tramas con CRC/versión mal,
+    posición desde la que queda una trama incompleta).
+    """
+    posiciones, malas = [], 0
+    pos, fin = inicio, len(datos)
+    vista = memoryview(datos)
+    while True:
+        i = datos.find(SYNC, pos)
+        if i < 0:
+            # Puede quedar medio SYNC al final
+            return posiciones, malas, max(pos, fin - 1) if datos[-1:] == SYNC[:1] else fin
+        if i + TAM_TRAMA > fin:
+            return posiciones, malas, i
+        if (datos[i + 2:i + 4] == _VERSION_LEN and
+                _CRC.unpack_from(datos, i + TAM_TRAMA - 2)[0]
+                == crc_hqx(vista[i + 2:i + TAM_TRAMA - 2], 0xFFFF)):
+            posiciones.append(i)
+            pos = i + TAM_TRAMA
+        else:
+            malas += 1
+            pos = i + 1
+
+
+def decodificar_columnas(datos, equipo=EQUIPO, usar_numpy=True):
+    """
+    Ruta masiva: todas las tramas válidas de `datos` (bytes) → columnas.
+    {campo: numpy.ndarray float64 (o array('d') sin NumPy) | list[str]}
+    más '_filas' y '_invalidas', como ParserTelemetria.parse_many().
+    """
+    posiciones, malas, _ = buscar_tramas(datos)
+    n = len(posiciones)
+    columnas = {'_filas': n, '_invalidas': malas}
+
+    if usar_numpy and np is not None:
+        bruto = np.frombuffer(datos, dtype=np.uint8)
+        if n and posiciones[-1] == (n - 1) * TAM_TRAMA:
+            filas = bruto[:n * TAM_TRAMA].reshape(n, TAM_TRAMA)        # flujo limpio: sin copias
+        else:
+            filas = bruto[np.asarray(posiciones)[:, None] + np.arange(TAM_TRAMA)]
+        tipo = np.dtype([(c, '<' + f) for c, f, _ in CAMPOS])
+        registros = np.ascontiguousarray(filas[:, _CABEZA.size:_CABEZA.size + TAM_DATOS]).view(tipo)[:, 0]
+        for _, campo, escala, _, _ in _NUMERICOS:
+            columnas[campo] = registros[campo] / float(escala)
+        enteros_dt, enteros_fase = registros['datetime'].tolist(), registros['fase'].tolist()
+    else:
+        from array import array
+        desempaquetar = _DATOS.unpack_from
+        filas = [desempaquetar(datos, p + _CABEZA.size) for p in posiciones]
+        for i, campo, escala, _, _ in _NUMERICOS:
+            columnas[campo] = array('d', [f[i] / escala for f in filas])
+        enteros_dt = [f[_I_DATETIME] for f in filas]
+        enteros_fase = [f[_I_FASE] for f in filas]
+
+    columnas['equipo']   = [equipo] * n
+    columnas['datetime'] = list(map(_datetime_texto, enteros_dt))
+    columnas['fase']     = list(map(_fase_texto, enteros_fase))
+    return columnas
+
+
+class LectorTramasBinarias(LectorTramas):
+    """
+    Como LectorTramas, pero leer() devuelve tramas binarias completas (bytes)
+    con CRC correcto. Las tramas con CRC o versión incorrectos cuentan como
+    malformadas y se vuelve a buscar la sincronía en el byte siguiente.
+    """
+    def __init__(self, ser, tam_lectura=4096):
+        super().__init__(ser, separador=SYNC, tam_lectura=tam_lectura, tam_max_trama=TAM_TRAMA)
+        self.bytes_basura = 0   # bytes saltados buscando la sincronía
+
+    def _extraer(self):
+        buf = self._buf
+        posiciones, malas, resto = buscar_tramas(buf)
+        tramas = [bytes(buf[p:p + TAM_TRAMA]) for p in posiciones]
+        self.bytes_basura += resto - len(tramas) * TAM_TRAMA
+        self.malformadas  += malas
+        self.tramas       += len(tramas)
+        del buf[:resto]
+        return tramas
+
+
+# ============================================================================
+#  COMPARATIVA CSV vs BINARIO
+# ============================================================================
+def _linea_radio(fila, i):
+    """Línea CSV tal como la envía el Arduino por el APC220 (con \\r\\n)."""
+    campos = [str(i + 1), EQUIPO] + [str(fila.get(c, '')) for c in CABECERA[2:]]
+    return (','.join(campos) + '\r\n').encode('utf-8')
+
+
+def main():
+    raiz = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+    ruta = sys.argv[1] if len(sys.argv) > 1 else \
+        os.path.join(raiz, 'data', 'simulacion', 'datos_simulacion.csv')
+    baudios = int(sys.argv[2]) if len(sys.argv) > 2 else 9600
+    bytes_s = baudios / 10   # 8N1: 10 bits por byte
+
+    with open(ruta, 'r', encoding='utf-8') as f:
+        filas = list(csv.DictReader(f))
+
+    lineas = [_linea_radio(fila, i) for i, fila in enumerate(filas)]
+    tramas = [codificar(fila, num_paquete=i + 1)[0] for i, fila in enumerate(filas)]
+    media_csv = sum(map(len, lineas)) / len(lineas)
+
+    # Comprobación de ida y vuelta frente al parser CSV
+    from parser_telemetria import ParserTelemetria
+    parser = ParserTelemetria(CABECERA)
+    for linea, trama in zip(lineas, tramas):
+        esperado = parser.parsear(linea.decode().strip())
+        obtenido = decodificar(trama)
+        assert obtenido == esperado, f"Ida y vuelta distinta:\n{esperado}\n{obtenido}"
+
+    print(f"\n📡 ENLACE A {baudios} BAUDIOS ({bytes_s:.0f} bytes/s) — {os.path.basename(ruta)}\n")
+    print(f"   Línea CSV:       {media_csv:6.1f} bytes  →  {bytes_s / media_csv:5.2f} muestras/s")
+    print(f"   Trama binaria:   {TAM_TRAMA:6d} bytes  →  {bytes_s / TAM_TRAMA:5.2f} muestras/s")
+    print(f"   Ganancia:        ×{media_csv / TAM_TRAMA:.2f} muestras/s por el mismo enlace")
+    print(f"   Ida y vuelta:    {len(filas)} filas idénticas a ParserTelemetria ✓\n")
+
+    n = 200_000
+    datos = b''.join(tramas[i % len(tramas)] for i in range(n))
+    for nombre, usar_numpy in (("struct", False), ("NumPy", True)):
+        if usar_numpy and np is None:
+            continue
+        t0 = time.perf_counter()
+        cols = decodificar_columnas(datos, usar_numpy=usar_numpy)
+        dt = time.perf_counter() - t0
+        assert cols['_filas'] == n
+        print(f"   decodificar_columnas ({nombre:<6}) {n / dt:>12,.0f} tramas/s")
+    t0 = time.perf_counter()
+    for trama in tramas * (20_000 // len(tramas)):
+        decodificar(trama)
+    dt = time.perf_counter() - t0
+    print(f"   decodificar() trama a trama   {20_000 // len(tramas) * len(tramas) / dt:>12,.0f} tramas/s\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,6 +34,7 @@ SALIDAS:
 
 import pandas as pd
 import matplotlib
+matplotlib.use('Agg')   # solo se guardan PNG: sin ventanas, y seguro en los procesos de las gráficas
 matplotlib.rcParams.update({
     'font.size':       11,
     'axes.titlesize':  12,
@@ -49,14 +50,28 @@ import matplotlib.gridspec as gridspec
 from matplotlib.colors import Normalize
 from matplotlib.cm import ScalarMappable
 import folium
+import importlib.util
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Archivo columnar de la sesión (software/comun): se carga sin parsear texto
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comun'))
+import archivo_columnar
+from archivo_columnar import es_columnar, leer_dataframe
+from cache_analisis import CacheResultados, clave, entorno, firma, huella_entrada, version_codigo
 
 # ──────────────────────────────────────────────────────────────
 #  CONFIGURACIÓN
 # ──────────────────────────────────────────────────────────────
 INPUT_FILE  = None                 # Pasar como argumento: python analizar_vuelo.py datos_SD.csv
+                                   # (o la carpeta columnar: datos_SD_columnas)
 OUTPUT_DIR  = 'analisis_vuelo'     # Carpeta donde se guardan las salidas
+PROCESOS    = None                 # Procesos para gráficas, mapa e informe (None = nº de CPUs, 1 = en serie)
+USAR_CACHE  = True                 # Reutilizar datos limpios y salidas de análisis anteriores (--no-cache lo desactiva)
+CACHE_DIR   = os.path.join(OUTPUT_DIR, '.cache')
+CACHE_MAX_MB = 500                 # Al pasar de aquí se borran las entradas menos usadas
 
 # Umbrales físicos para detección de inversiones térmicas
 UMBRAL_INVERSION_TEMP  =  0.5   # °C — si la temperatura SUBE más de esto al subir altitud → inversión
@@ -64,24 +79,68 @@ UMBRAL_PM25_CAPA       = 15.0   # µg/m³ — PM2.5 por encima de esto en una ca
 UMBRAL_CO2_VARIACION   = 30.0   # ppm — por encima de esto posible ruido de sensor (precisión SCD40 = ±10 ppm)
 DELTA_T_ALARMA         =  3.0   # °C — diferencia entre sensores de temperatura que indica error
 DELTA_HR_ALARMA        =  8.0   # % — diferencia de HR entre HS300x y SCD40 que indica error
+BIN_ALTITUD            = 50     # m — grosor de cada capa del perfil de inversiones
 
 # Límites OMS para PM2.5 (µg/m³)
 OMS_PM25_BUENO    = 12
 OMS_PM25_MODERADO = 35
 OMS_PM25_MALO     = 55
 
+# Columnas que usan gráficas, mapa e informe, y su tipo al leer (el resto no se lee).
+# Sensores en float32: la mitad de memoria y de sobra para su resolución.
+# Timestamp y GPS en float64 (float32 perdería ~0,5 m en lat/lon).
+TIPOS_COLUMNAS = {
+    'timestamp': 'float64', 'lat': 'float64', 'lon': 'float64',
+    'alt': 'float32', 'alt_mar': 'float32',
+    'temp_hs': 'float32', 'hum_hs': 'float32', 'temp_scd': 'float32', 'hum_scd': 'float32',
+    'temp_lps': 'float32', 'presion': 'float32', 'co2': 'float32',
+    'pm1_0': 'float32', 'pm2_5': 'float32', 'pm10': 'float32',
+    'accel_x': 'float32', 'accel_y': 'float32', 'accel_z': 'float32',
+    'fase': 'category',
+}
+# Un cero en estas columnas = sensor sin dato → NaN (matplotlib dibuja huecos en vez de ceros)
+COLS_CERO_NAN = ['pm1_0', 'pm2_5', 'pm10', 'co2',
+                 'temp_scd', 'hum_scd', 'temp_lps',
+                 'accel_x', 'accel_y', 'accel_z',
+                 'temp_hs', 'hum_hs',    # HS300x — referencia, si es cero también es error
+                 'presion']              # presión cero = sensor LPS no disponible
+HAY_PYARROW = importlib.util.find_spec('pyarrow') is not None   # motor de read_csv más rápido (opcional)
+
 # ──────────────────────────────────────────────────────────────
 #  CARGA Y LIMPIEZA DE DATOS
 # ──────────────────────────────────────────────────────────────
+def leer_csv(filepath):
+    """
+    Lee solo las columnas de TIPOS_COLUMNAS, ya con su tipo (sin inferirlo ni
+    convertir después). Usa el motor pyarrow si está instalado.
+    """
+    cabecera = pd.read_csv(filepath, nrows=0).columns
+    reales = {c.strip().lower(): c for c in cabecera}
+    tipos = {reales[c]: t for c, t in TIPOS_COLUMNAS.items() if c in reales}
+    motor = 'pyarrow' if HAY_PYARROW else 'c'
+    try:
+        df = pd.read_csv(filepath, usecols=list(tipos), dtype=tipos, engine=motor)
+    except ValueError:
+        # Algún valor no numérico (línea corrupta): se lee como texto y se convierte a NaN
+        df = pd.read_csv(filepath, usecols=list(tipos), dtype=str, engine=motor)
+        for col, tipo in tipos.items():
+            df[col] = df[col].astype(tipo) if tipo == 'category' else \
+                pd.to_numeric(df[col], errors='coerce').astype(tipo)
+    df.columns = df.columns.str.strip().str.lower()
+    return df, len(cabecera)
+
 def cargar_datos(filepath):
-    """Carga el CSV, limpia datos inválidos y detecta sensores disponibles."""
+    """Carga el CSV (o su archivo columnar), limpia datos inválidos y detecta sensores disponibles."""
     print(f"📂 Cargando: {filepath}")
-    df = pd.read_csv(filepath)
-
-    # Normalizar nombres de columna (minúsculas, sin espacios)
-    df.columns = df.columns.str.strip().str.lower()
+    if es_columnar(filepath):
+        df = leer_dataframe(filepath, columnas=list(TIPOS_COLUMNAS))
+        df.columns = df.columns.str.strip().str.lower()
+        df = df.astype({c: t for c, t in TIPOS_COLUMNAS.items() if c in df.columns and df[c].dtype != t})
+        n_columnas = len(df.columns)
+    else:
+        df, n_columnas = leer_csv(filepath)
 
-    print(f"   {len(df)} filas, {len(df.columns)} columnas")
+    print(f"   {len(df)} filas, {len(df.columns)} de {n_columnas} columnas (solo las que se usan)")
 
     # ── Detectar sensores con datos válidos (>10% de filas con valor != 0) ──
     sensores = {
@@ -109,42 +168,29 @@ def cargar_datos(filepath):
         print(f"     {sensor:<10} {estado}")
     print()
 
-    # ── Convertir ceros a NaN en columnas de sensores opcionales ──
-    # Así matplotlib dibuja huecos en vez de líneas en cero
-    cols_nan = ['pm1_0', 'pm2_5', 'pm10', 'co2',
-                'temp_scd', 'hum_scd', 'temp_lps',
-                'accel_x', 'accel_y', 'accel_z']
-    for col in cols_nan:
-        if col in df.columns:
-            df[col] = df[col].replace(0, np.nan)
+    # ── Una sola pasada vectorizada: ceros → NaN, filtro de altitud, GPS y orden ──
+    cols_nan = [c for c in COLS_CERO_NAN if c in df.columns]
+    bloque = df[cols_nan].to_numpy()
+    bloque[bloque == 0] = np.nan
+    df[cols_nan] = bloque
 
-    # HS300x — temperatura de referencia, si es cero también es error
-    for col in ['temp_hs', 'hum_hs']:
-        if col in df.columns:
-            df[col] = df[col].replace(0, np.nan)
-
-    # Presión cero = sensor LPS no disponible
-    if 'presion' in df.columns:
-        df['presion'] = df['presion'].replace(0, np.nan)
+    # Altitudes negativas extremas = artefactos de calibración
+    validas = np.flatnonzero(df['alt'].to_numpy() > -50)
+    orden = validas[np.argsort(df['timestamp'].to_numpy()[validas], kind='stable')]
+    df = df.take(orden).reset_index(drop=True)
 
     # ── GPS ──
-    tiene_gps = (df['lat'] != 0) & (df['lon'] != 0)
-    n_sin_gps = (~tiene_gps).sum()
+    tiene_gps = (df['lat'].to_numpy() != 0) & (df['lon'].to_numpy() != 0)
+    n_sin_gps = int((~tiene_gps).sum())
     if n_sin_gps > 0:
         print(f"   ⚠️  {n_sin_gps} filas sin fix GPS (no se incluyen en el mapa)")
 
-    # ── Filtrar altitudes negativas extremas (artefactos de calibración) ──
-    df = df[df['alt'] > -50].copy()
-
-    # ── Ordenar por timestamp ──
-    df = df.sort_values('timestamp').reset_index(drop=True)
-
-    return df, df[tiene_gps].copy(), disponible
+    return df, df[tiene_gps].reset_index(drop=True), disponible
 
 # ──────────────────────────────────────────────────────────────
 #  DETECCIÓN DE INVERSIONES TÉRMICAS
 # ──────────────────────────────────────────────────────────────
-def detectar_inversiones(df, bin_size=50):
+def detectar_inversiones(df, bin_size=BIN_ALTITUD):
     """
     Agrupa datos por bins de altitud y busca zonas donde
     la temperatura sube con la altitud (inversión térmica)
@@ -500,11 +546,13 @@ def generar_mapa(df_gps, perfil, outdir):
         print("   ⚠️  Sin datos GPS — mapa omitido")
         return
 
-    def color_pm25(pm):
-        if pm < OMS_PM25_BUENO:    return '#00AA00'
-        if pm < OMS_PM25_MODERADO: return '#FFAA00'
-        if pm < OMS_PM25_MALO:     return '#FF6600'
-        return '#DD0000'
+    colores_pm25 = ['#00AA00', '#FFAA00', '#FF6600', '#DD0000']   # bueno, moderado, malo, muy malo
+    filas = df_gps.reset_index(drop=True)
+    n     = len(filas)
+    pm    = filas['pm2_5'].to_numpy(dtype=float) if 'pm2_5' in filas.columns else np.zeros(n)
+    # Clase OMS de cada punto (NaN cae en "muy malo", igual que las comparaciones de antes)
+    clase = np.digitize(pm, [OMS_PM25_BUENO, OMS_PM25_MODERADO, OMS_PM25_MALO])
+    coords = np.round(filas[['lat', 'lon']].to_numpy(dtype=float), 6)
 
     centro = [df_gps['lat'].mean(), df_gps['lon'].mean()]
 
@@ -516,37 +564,53 @@ def generar_mapa(df_gps, perfil, outdir):
         attr='Esri World Imagery'
     )
 
-    # Trayectoria como segmentos coloreados por PM2.5
-    # Cada segmento entre dos puntos consecutivos adopta el color del PM2.5 del punto inicial
-    filas = df_gps.reset_index(drop=True)
-    for i in range(len(filas) - 1):
-        p1  = [filas.loc[i,   'lat'], filas.loc[i,   'lon']]
-        p2  = [filas.loc[i+1, 'lat'], filas.loc[i+1, 'lon']]
-        pm  = filas.loc[i, 'pm2_5'] if 'pm2_5' in filas.columns else 0
-        folium.PolyLine(
-            [p1, p2],
-            color=color_pm25(pm),
-            weight=4,
-            opacity=0.85
-        ).add_to(mapa)
-
-    # Puntos cada 5 muestras con popup de datos (no saturar el mapa)
-    for i, row in filas.iterrows():
-        if i % 5 != 0:
+    # Trayectoria coloreada por PM2.5: cada segmento adopta el color del punto inicial.
+    # Los segmentos seguidos de la misma clase forman un tramo, y todos los tramos de
+    # una clase van en una sola polilínea múltiple (como mucho 4 capas, no una por par).
+    if n > 1:
+        clase_seg = clase[:-1]
+        cortes  = np.flatnonzero(np.diff(clase_seg)) + 1
+        inicios = np.concatenate(([0], cortes))
+        finales = np.concatenate((cortes, [n - 1]))   # el tramo s..e usa los puntos s..e
+        for c, color in enumerate(colores_pm25):
+            tramos = [coords[s:e + 1].tolist()
+                      for s, e in zip(inicios, finales) if clase_seg[s] == c]
+            if tramos:
+                folium.PolyLine(tramos, color=color, weight=4, opacity=0.85).add_to(mapa)
+
+    # Puntos cada 5 muestras con popup de datos (no saturar el mapa): una capa
+    # GeoJSON por clase, con los textos del popup ya formateados en bloque
+    muestra = filas.iloc[::5]
+    def columna(col, formato, defecto=0):
+        valores = muestra[col].to_numpy(dtype=float) if col in muestra.columns else np.full(len(muestra), defecto)
+        return np.char.mod(formato, valores)
+    fase = muestra['fase'].astype(str).to_numpy() if 'fase' in muestra.columns else np.full(len(muestra), '—')
+    popups = {
+        'alt':  columna('alt',     '%.0f m'),
+        'pm25': columna('pm2_5',   '%.1f µg/m³'),
+        'pm10': columna('pm10',    '%.1f µg/m³'),
+        'co2':  columna('co2',     '%.0f ppm'),
+        'temp': columna('temp_hs', '%.1f °C'),
+        'fase': fase,
+    }
+    clase_m, coords_m = clase[::5], coords[::5]
+    for c, color in enumerate(colores_pm25):
+        idx = np.flatnonzero(clase_m == c)
+        if len(idx) == 0:
             continue
-        popup = (
-            f"<b>Altitud:</b> {row['alt']:.0f} m<br>"
-            f"<b>PM2.5:</b> {row.get('pm2_5', 0):.1f} µg/m³<br>"
-            f"<b>PM10:</b> {row.get('pm10', 0):.1f} µg/m³<br>"
-            f"<b>CO₂:</b> {row.get('co2', 0):.0f} ppm<br>"
-            f"<b>Temp:</b> {row.get('temp_hs', 0):.1f} °C<br>"
-            f"<b>Fase:</b> {row.get('fase', '—')}"
-        )
-        folium.CircleMarker(
-            location=[row['lat'], row['lon']],
-            radius=4, color='white', weight=0.5,
-            fill=True, fill_color=color_pm25(row.get('pm2_5', 0)), fill_opacity=0.9,
-            popup=folium.Popup(popup, max_width=200)
+        puntos = {'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'id': int(i),
+             'geometry': {'type': 'Point', 'coordinates': [coords_m[i, 1], coords_m[i, 0]]},
+             'properties': {k: str(v[i]) for k, v in popups.items()}}
+            for i in idx.tolist()]}
+        folium.GeoJson(
+            puntos,
+            marker=folium.CircleMarker(radius=4, color='white', weight=0.5,
+                                       fill=True, fill_color=color, fill_opacity=0.9),
+            popup=folium.GeoJsonPopup(fields=list(popups),
+                                      aliases=['Altitud', 'PM2.5', 'PM10', 'CO₂', 'Temp', 'Fase'],
+                                      localize=False, max_width=200),
+            control=False,
         ).add_to(mapa)
 
     # Marcadores de fases clave
@@ -675,16 +739,85 @@ def generar_informe(df, perfil, outdir):
     print(f"   ✅ Guardado: {ruta}")
     print('\n' + '\n'.join(lineas))
 
+# ──────────────────────────────────────────────────────────────
+#  EJECUCIÓN DE LAS ETAPAS (en paralelo)
+# ──────────────────────────────────────────────────────────────
+# Una vez cargados df y perfil, cada salida es independiente de las demás.
+# Los datos se copian UNA vez a cada proceso (initializer) y cada etapa solo
+# recibe los nombres de lo que necesita.
+_DATOS = {}
+
+def _iniciar_proceso(datos):
+    _DATOS.clear()
+    _DATOS.update(datos)
+
+def ejecutar_etapa(nombre, func, claves, outdir):
+    """Ejecuta una etapa y captura errores sin detener el resto → (nombre, error, segundos)."""
+    t0 = time.perf_counter()
+    try:
+        func(*(_DATOS[c] for c in claves), outdir)
+        error = None
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        print(f"   ⚠️  {nombre} omitido: {error}")
+    return nombre, error, time.perf_counter() - t0
+
+def ejecutar_etapas(etapas, datos, outdir, procesos=PROCESOS):
+    """Lanza [(nombre, func, claves)] en un pool de procesos y devuelve los resultados en orden."""
+    procesos = min(procesos or os.cpu_count() or 1, len(etapas))
+    if procesos <= 1:
+        _iniciar_proceso(datos)
+        return [ejecutar_etapa(nombre, func, claves, outdir) for nombre, func, claves in etapas]
+    resultados = []
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso,
+                             initargs=(datos,)) as pool:
+        futuros = [(nombre, pool.submit(ejecutar_etapa, nombre, func, claves, outdir))
+                   for nombre, func, claves in etapas]
+        for nombre, futuro in futuros:
+            try:
+                resultados.append(futuro.result())
+            except Exception as e:   # el proceso murió (memoria, señal...)
+                resultados.append((nombre, f"proceso caído: {e}", 0.0))
+    return resultados
+
+# ──────────────────────────────────────────────────────────────
+#  CACHÉ DE RESULTADOS
+# ──────────────────────────────────────────────────────────────
+def cargar_datos_cache(cache, clave_datos, filepath):
+    """cargar_datos() pasando por la caché (si cache es None, lee siempre el fichero)."""
+    guardado = cache.cargar(clave_datos) if cache else None
+    if guardado is not None:
+        df, df_gps, disponible = guardado
+        print(f"📦 Datos limpios desde caché: {len(df)} filas")
+        return df, df_gps, disponible
+    df, df_gps, disponible = cargar_datos(filepath)
+    if cache:
+        cache.guardar(clave_datos, (df, df_gps, disponible))
+        cache.escribir_meta(clave_datos, {'disponible': {k: bool(v) for k, v in disponible.items()},
+                                           'filas': len(df)})
+    return df, df_gps, disponible
+
+def detectar_inversiones_cache(cache, clave_perfil, df):
+    perfil = cache.cargar(clave_perfil) if cache else None
+    if perfil is None:
+        perfil = detectar_inversiones(df, BIN_ALTITUD)
+        if cache:
+            cache.guardar(clave_perfil, perfil)
+    return perfil
+
 # ──────────────────────────────────────────────────────────────
 #  MAIN
 # ──────────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    # Permitir pasar el CSV como argumento: python analizar_vuelo.py mi_vuelo.csv
-    if len(sys.argv) > 1:
-        INPUT_FILE = sys.argv[1]
+    # Permitir pasar el CSV como argumento: python analizar_vuelo.py mi_vuelo.csv [--no-cache]
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if '--no-cache' in sys.argv:
+        USAR_CACHE = False
+    if argumentos:
+        INPUT_FILE = argumentos[0]
     else:
         print("❌ Debes indicar el archivo CSV a analizar.")
-        print("   Uso: python analizar_vuelo.py <archivo.csv>")
+        print("   Uso: python analizar_vuelo.py <archivo.csv> [--no-cache]")
         print("   Ejemplos:")
         print("     python analizar_vuelo.py datos_SD.csv")
         print("     python analizar_vuelo.py datos_RAM.csv")
@@ -702,36 +835,90 @@ if __name__ == "__main__":
     print(f"   Archivo: {INPUT_FILE}")
     print(f"   Salidas: {OUTPUT_DIR}/\n")
 
-    df, df_gps, disponible = cargar_datos(INPUT_FILE)
-    perfil = detectar_inversiones(df)
-
-    resultados = []
-
-    def ejecutar(nombre, func, *args):
-        """Ejecuta una función de análisis y captura errores sin detener el resto."""
-        try:
-            func(*args)
-            resultados.append(f"   ✅ {nombre}")
-        except Exception as e:
-            resultados.append(f"   ⚠️  {nombre} — omitido ({e})")
-            print(f"   ⚠️  {nombre} omitido: {e}")
-
-    ejecutar("graf_1_perfil_vertical.png",     graf_perfil_vertical,   df, perfil, OUTPUT_DIR)
-    ejecutar("graf_2_inversiones_termicas.png", graf_inversiones,       df, perfil, OUTPUT_DIR)
-    ejecutar("graf_3_validacion_cruzada.png",   graf_validacion_cruzada,df, OUTPUT_DIR)
-    ejecutar("graf_4_mision_primaria.png",      graf_mision_primaria,   df, df_gps, OUTPUT_DIR)
-
+    t_inicio = time.perf_counter()
+
+    # Claves de caché: cada resultado depende de la huella del fichero, de la firma
+    # de la función que lo produce (código + umbrales que lee) y de las librerías
+    cache = CacheResultados(CACHE_DIR, CACHE_MAX_MB) if USAR_CACHE else None
+    claves = {'df': None, 'df_gps': None, 'perfil': None}
+    libs = None
+    disponible = None
+    if cache:
+        libs = entorno('numpy', 'pandas', 'matplotlib', 'folium')
+        claves['df'] = claves['df_gps'] = clave('datos', huella_entrada(INPUT_FILE), firma(cargar_datos),
+                                                version_codigo(archivo_columnar.__file__), libs)
+        claves['perfil'] = clave('perfil', claves['df'], BIN_ALTITUD, firma(detectar_inversiones))
+        meta = cache.leer_meta(claves['df'])
+        disponible = meta['disponible'] if meta else None
+
+    datos = {}
+    if disponible is None:   # sin caché, o fichero nuevo: hay que cargar para saber qué sensores hay
+        datos['df'], datos['df_gps'], disponible = cargar_datos_cache(cache, claves['df'], INPUT_FILE)
+    t_carga = time.perf_counter() - t_inicio
+
+    etapas = [
+        ("graf_1_perfil_vertical.png",      graf_perfil_vertical,    ('df', 'perfil')),
+        ("graf_2_inversiones_termicas.png", graf_inversiones,        ('df', 'perfil')),
+        ("graf_3_validacion_cruzada.png",   graf_validacion_cruzada, ('df',)),
+        ("graf_4_mision_primaria.png",      graf_mision_primaria,    ('df', 'df_gps')),
+    ]
+    omitidas = []
     if disponible.get('gps'):
-        ejecutar("mapa_vuelo.html",             generar_mapa,           df_gps, perfil, OUTPUT_DIR)
+        etapas.append(("mapa_vuelo.html",   generar_mapa,            ('df_gps', 'perfil')))
     else:
         print("   ⚠️  mapa_vuelo.html — omitido (sin datos GPS)")
-        resultados.append("   ⚠️  mapa_vuelo.html — omitido (sin datos GPS)")
-
-    ejecutar("informe_vuelo.txt",               generar_informe,        df, perfil, OUTPUT_DIR)
+        omitidas.append("   ⚠️  mapa_vuelo.html — omitido (sin datos GPS)")
+    etapas.append(("informe_vuelo.txt",     generar_informe,         ('df', 'perfil')))
+
+    # Salidas ya hechas con las mismas entradas: se copian de la caché
+    claves_etapa = {nombre: clave('salida', nombre, [claves[c] for c in cl], firma(func), libs)
+                    for nombre, func, cl in etapas} if cache else {}
+    desde_cache = {nombre for nombre, _, _ in etapas
+                   if cache and cache.recuperar(claves_etapa[nombre], nombre, OUTPUT_DIR)}
+    pendientes = [e for e in etapas if e[0] not in desde_cache]
+
+    # Solo se cargan los datos (y el perfil) que necesitan las salidas pendientes
+    necesarios = {c for _, _, cl in pendientes for c in cl}
+    if necesarios and 'df' not in datos:
+        datos['df'], datos['df_gps'], disponible = cargar_datos_cache(cache, claves['df'], INPUT_FILE)
+        t_carga = time.perf_counter() - t_inicio
+    if 'perfil' in necesarios:
+        datos['perfil'] = detectar_inversiones_cache(cache, claves['perfil'], datos['df'])
+    t_previo = time.perf_counter() - t_inicio
+
+    resultados = ejecutar_etapas(pendientes, datos, OUTPUT_DIR, PROCESOS) if pendientes else []
+    t_total = time.perf_counter() - t_inicio
+    if cache:
+        for nombre, error, _ in resultados:
+            if error is None:
+                cache.almacenar(claves_etapa[nombre], nombre, OUTPUT_DIR)
+        borradas = cache.recortar()
+    por_nombre = {r[0]: r for r in resultados}
+
+    # El informe sale por consola al generarlo; si viene de la caché se muestra igual
+    if "informe_vuelo.txt" in desde_cache:
+        with open(os.path.join(OUTPUT_DIR, "informe_vuelo.txt"), encoding='utf-8') as f:
+            print('\n' + f.read())
 
     print("\n✅ ANÁLISIS COMPLETADO")
     print(f"   Archivo: {INPUT_FILE}")
     print(f"   Salidas: {OUTPUT_DIR}/")
     print()
-    for r in resultados:
+    for nombre, _, _ in etapas:
+        if nombre in desde_cache:
+            print(f"   ♻️  {nombre:<34}   caché")
+            continue
+        _, error, segundos = por_nombre[nombre]
+        if error is None:
+            print(f"   ✅ {nombre:<34} {segundos:6.2f} s")
+        else:
+            print(f"   ⚠️  {nombre} — omitido ({error})")
+    for r in omitidas:
         print(r)
+    suma = sum(r[2] for r in resultados)
+    print(f"\n⏱️  Carga {t_carga:.2f} s + inversiones {t_previo - t_carga:.2f} s  |  "
+          f"etapas {suma:.2f} s sumadas en {t_total - t_previo:.2f} s de reloj  |  total {t_total:.2f} s")
+    if cache:
+        print(f"📦 Caché: {len(desde_cache)}/{len(etapas)} salidas reutilizadas, "
+              f"{cache.tamano_mb():.1f} MB en {CACHE_DIR}/"
+              + (f" ({borradas} entradas antiguas borradas)" if borradas else ""))
@@ -0,0 +1,179 @@
+"""
+============================================================
+  CANSAT CAELUM — Benchmark de carga de datos post-vuelo
+============================================================
+  Compara tiempo y pico de memoria de:
+    1. cargar_datos() original de analizar_vuelo.py
+       (copia de referencia más abajo: read_csv sin tipos y
+       varias pasadas replace / máscara / filtro / orden)
+    2. cargar_datos() actual: solo las columnas usadas, tipos
+       declarados (float32, fase category), motor pyarrow si
+       está instalado y limpieza en una pasada
+
+  Cada medida se hace en un proceso aparte. El pico de memoria
+  es el de la carga sobre lo que ya ocupaba el proceso (en Linux
+  se reinicia VmHWM justo antes; en macOS, ru_maxrss; en Windows,
+  peak_wset de psutil o, sin psutil, tracemalloc, que solo ve la
+  memoria reservada desde Python y alarga el tiempo). Los logs salen
+  de data/simulacion/datos_simulacion.csv replicado hasta N
+  filas con timestamps crecientes.
+
+  Uso:
+      python benchmark_carga.py                      → 10⁵ y 10⁶ filas
+      python benchmark_carga.py 100000,1000000,10000000
+============================================================
+"""
+
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+RAIZ        = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+CSV_DEFECTO = os.path.join(RAIZ, 'data', 'simulacion', 'datos_simulacion.csv')
+N_DEFECTO   = (100_000, 1_000_000)
+BLOQUE      = 200_000   # filas por escritura al generar el CSV
+
+
+# ── Referencia: cargar_datos() tal como estaba en analizar_vuelo.py (sin prints) ──
+def cargar_datos_original(filepath):
+    df = pd.read_csv(filepath)
+    df.columns = df.columns.str.strip().str.lower()
+    cols_nan = ['pm1_0', 'pm2_5', 'pm10', 'co2',
+                'temp_scd', 'hum_scd', 'temp_lps',
+                'accel_x', 'accel_y', 'accel_z']
+    for col in cols_nan:
+        if col in df.columns:
+            df[col] = df[col].replace(0, np.nan)
+    for col in ['temp_hs', 'hum_hs']:
+        if col in df.columns:
+            df[col] = df[col].replace(0, np.nan)
+    if 'presion' in df.columns:
+        df['presion'] = df['presion'].replace(0, np.nan)
+    tiene_gps = (df['lat'] != 0) & (df['lon'] != 0)
+    df = df[df['alt'] > -50].copy()
+    df = df.sort_values('timestamp').reset_index(drop=True)
+    return df, df[tiene_gps].copy(), {}
+
+
+def generar_csv(ruta_base, n, destino):
+    """Replica el CSV base hasta n filas; cada vuelta desplaza el timestamp."""
+    base = pd.read_csv(ruta_base)
+    k = len(base)
+    paso = float(base['timestamp'].max() - base['timestamp'].min()) + 1.0
+    with open(destino, 'w', encoding='utf-8', newline='') as f:
+        for inicio in range(0, n, BLOQUE):
+            idx = np.arange(inicio, min(n, inicio + BLOQUE))
+            bloque = base.iloc[idx % k].reset_index(drop=True)
+            bloque['timestamp'] = bloque['timestamp'].to_numpy() + (idx // k) * paso
+            bloque.to_csv(f, index=False, header=(inicio == 0))
+
+
+def medir_en_proceso(modo, ruta):
+    """
+    Lanza este mismo script con --medir y devuelve {segundos, pico_mb, filas, memoria_df_mb},
+    o None si el proceso murió (normalmente el sistema lo mata por falta de memoria).
+    """
+    r = subprocess.run([sys.executable, os.path.abspath(__file__), '--medir', modo, ruta],
+                       capture_output=True, text=True)
+    if r.returncode != 0:
+        return None
+    return json.loads(r.stdout.strip().splitlines()[-1])
+
+
+def _memoria_kb(campo):
+    """VmRSS / VmHWM de /proc/self/status en KB (None fuera de Linux)."""
+    try:
+        with open('/proc/self/status') as f:
+            for linea in f:
+                if linea.startswith(campo + ':'):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reiniciar_pico():
+    """En Linux, VmHWM vuelve a la memoria actual: así las importaciones no cuentan."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _medidor_pico():
+    """(bytes antes de la carga, función que da el pico en bytes) según la plataforma."""
+    if _reiniciar_pico():
+        return _memoria_kb('VmRSS') * 1024, lambda: _memoria_kb('VmHWM') * 1024
+    if sys.platform != 'win32':
+        import resource   # no existe en Windows
+        escala = 1 if sys.platform == 'darwin' else 1024   # macOS da bytes; Linux, KB
+        pico = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * escala
+        return pico(), pico
+    try:
+        import psutil
+        proceso = psutil.Process()
+        pico = lambda: proceso.memory_info().peak_wset
+        return pico(), pico
+    except ImportError:
+        import tracemalloc
+        tracemalloc.start()
+        return 0, lambda: tracemalloc.get_traced_memory()[1]
+
+
+def medir(modo, ruta):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import analizar_vuelo
+    cargar = cargar_datos_original if modo == 'original' else analizar_vuelo.cargar_datos
+    antes, leer_pico = _medidor_pico()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        df, df_gps, _ = cargar(ruta)
+    dt = time.perf_counter() - t0
+    print(json.dumps({'segundos': dt, 'pico_mb': (leer_pico() - antes) / 1e6, 'filas': len(df),
+                      'memoria_df_mb': df.memory_usage(deep=True).sum() / 1e6}))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--medir':
+        medir(sys.argv[2], sys.argv[3])
+        return
+    tamanos = [int(x) for x in sys.argv[1].split(',')] if len(sys.argv) > 1 else N_DEFECTO
+
+    import analizar_vuelo
+    motor = 'pyarrow' if analizar_vuelo.HAY_PYARROW else 'c (pyarrow no instalado)'
+    print(f"\n📊 BENCHMARK CARGA POST-VUELO — motor read_csv: {motor}\n")
+    print(f"   {'filas':>11}  {'CSV':>8}  {'cargador':<9} {'tiempo':>8}  {'pico RAM':>9}  {'DataFrame':>9}")
+    with tempfile.TemporaryDirectory() as carpeta:
+        for n in tamanos:
+            ruta = os.path.join(carpeta, f'vuelo_{n}.csv')
+            generar_csv(CSV_DEFECTO, n, ruta)
+            tam = os.path.getsize(ruta) / 1e6
+            res = {modo: medir_en_proceso(modo, ruta) for modo in ('original', 'actual')}
+            for modo, r in res.items():
+                if r is None:
+                    print(f"   {n:>11,}  {tam:>6.0f}MB  {modo:<9} ❌ proceso terminado (¿sin memoria?)")
+                else:
+                    print(f"   {n:>11,}  {tam:>6.0f}MB  {modo:<9} {r['segundos']:>7.2f}s  "
+                          f"{r['pico_mb']:>7.0f}MB  {r['memoria_df_mb']:>7.0f}MB")
+            o, a = res['original'], res['actual']
+            if o is not None and a is not None:
+                assert o['filas'] == a['filas']
+                print(f"   {'':>11}  {'':>8}  → ×{o['segundos'] / a['segundos']:.2f} más rápido, "
+                      f"pico ×{o['pico_mb'] / max(a['pico_mb'], 1e-9):.2f} menor, "
+                      f"DataFrame ×{o['memoria_df_mb'] / a['memoria_df_mb']:.2f} menor")
+            print()
+            os.remove(ruta)
+
+
+if __name__ == "__main__":
+    main()
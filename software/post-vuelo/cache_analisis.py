@@ -0,0 +1,225 @@
+"""
+============================================================
+  CANSAT CAELUM — Caché de resultados del análisis post-vuelo
+============================================================
+  Guarda por contenido lo que produce analizar_vuelo.py para
+  no repetirlo al volver a analizar el mismo fichero:
+    - los datos limpios (df, df_gps, sensores disponibles)
+    - el perfil de inversiones
+    - cada salida (PNG, HTML, TXT)
+
+  Cada entrada se nombra con una clave SHA-1 de todo lo que la
+  determina: huella del fichero de entrada, firma de la etapa
+  (su código y el de las funciones del módulo a las que llama,
+  más el valor de los umbrales y constantes que lee) y versiones
+  de las librerías. Si algo cambia, la clave cambia y solo se
+  repiten las etapas afectadas; las entradas viejas se quedan
+  hasta que el recorte por tamaño las borra (las menos usadas
+  primero).
+
+  Estructura en disco (carpeta plana):
+      <clave>.pkl              → objeto (datos limpios, perfil)
+      <clave>.json             → metadatos pequeños (sensores, nº filas)
+      <clave>--<salida>        → copia de una salida
+============================================================
+"""
+
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import sys
+
+BLOQUE_HUELLA = 1 << 20   # bytes por lectura al calcular huellas
+VERSION_CACHE = 1         # subir si cambia el formato de lo guardado
+TIPOS_VALOR   = (bool, int, float, str, tuple, list, dict, type(None))   # constantes que entran en la firma
+
+
+def huella_entrada(ruta):
+    """SHA-1 del contenido: de un fichero, o de todos los de una carpeta (archivo columnar)."""
+    h = hashlib.sha1()
+    if os.path.isdir(ruta):
+        ficheros = sorted(os.path.join(base, f) for base, _, fs in os.walk(ruta) for f in fs)
+    else:
+        ficheros = [ruta]
+    for fichero in ficheros:
+        h.update(os.path.relpath(fichero, ruta).encode('utf-8'))
+        with open(fichero, 'rb') as f:
+            for bloque in iter(lambda: f.read(BLOQUE_HUELLA), b''):
+                h.update(bloque)
+    return h.hexdigest()
+
+
+def version_codigo(*rutas):
+    """SHA-1 de ficheros de código enteros (módulos auxiliares como archivo_columnar)."""
+    h = hashlib.sha1()
+    for ruta in rutas:
+        with open(ruta, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+def entorno(*modulos):
+    """Versiones de Python y de las librerías que dibujan o calculan: otra versión, otra salida."""
+    return {'cache': VERSION_CACHE, 'python': sys.version.split()[0],
+            **{m: getattr(sys.modules.get(m), '__version__', None) for m in modulos}}
+
+
+def _alcance(func):
+    """
+    Funciones del mismo módulo que alcanza func (ella incluida) y nombres
+    globales que leen todas ellas, contando las funciones internas.
+    """
+    funciones, nombres, pendientes = set(), set(), [func]
+    while pendientes:
+        f = pendientes.pop()
+        if f in funciones:
+            continue
+        funciones.add(f)
+        codigos, propios = [f.__code__], set()
+        while codigos:
+            codigo = codigos.pop()
+            propios.update(codigo.co_names)
+            codigos.extend(c for c in codigo.co_consts if hasattr(c, 'co_names'))
+        nombres |= propios
+        for nombre in propios:
+            otra = f.__globals__.get(nombre)
+            if inspect.isfunction(otra) and otra.__module__ == func.__module__:
+                pendientes.append(otra)
+    return funciones, nombres
+
+
+def firma(func):
+    """
+    Lo que determina el resultado de func además de sus argumentos: el código
+    fuente de las funciones que alcanza y el valor de las constantes globales
+    que leen (umbrales, tipos de columnas...). Cambiar un umbral solo invalida
+    las etapas que lo usan.
+    """
+    funciones, nombres = _alcance(func)
+    h = hashlib.sha1()
+    for f in sorted(funciones, key=lambda f: f.__qualname__):
+        h.update(inspect.getsource(f).encode('utf-8'))
+    g = func.__globals__
+    valores = {n: g[n] for n in sorted(nombres) if n in g and isinstance(g[n], TIPOS_VALOR)}
+    return {'codigo': h.hexdigest()[:12], 'valores': valores}
+
+
+def clave(*partes):
+    """Clave SHA-1 de cualquier combinación de valores serializables en JSON."""
+    texto = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+class CacheResultados:
+    """
+    Carpeta de entradas direccionadas por clave, con tamaño máximo. Leer una
+    entrada le renueva la fecha de modificación, que es lo que usa recortar()
+    para borrar primero las que llevan más tiempo sin usarse.
+    """
+    def __init__(self, carpeta, max_mb):
+        self.carpeta = carpeta
+        self.max_bytes = int(max_mb * 1e6)
+        os.makedirs(carpeta, exist_ok=True)
+
+    def _ruta(self, clave, sufijo):
+        return os.path.join(self.carpeta, clave + sufijo)
+
+    def _usar(self, ruta):
+        """Marca la entrada como recién usada. False si no existe."""
+        try:
+            os.utime(ruta)
+        except OSError:
+            return False
+        return True
+
+    def _escribir(self, ruta, escribir):
+        """Escritura atómica: un corte a mitad no deja una entrada rota."""
+        tmp = f"{ruta}.{os.getpid()}.tmp"
+        try:
+            escribir(tmp)
+            os.replace(tmp, ruta)
+        except OSError:
+            pass   # disco lleno o sin permiso: la caché es opcional
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    # ── Objetos (pickle) ──
+    def cargar(self, clave):
+        ruta = self._ruta(clave, '.pkl')
+        if not self._usar(ruta):
+            return None
+        try:
+            with open(ruta, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None   # entrada de otra versión de pandas/numpy o truncada: se rehace
+
+    def guardar(self, clave, objeto):
+        def escribir(tmp):
+            with open(tmp, 'wb') as f:
+                pickle.dump(objeto, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._escribir(self._ruta(clave, '.pkl'), escribir)
+
+    # ── Metadatos (JSON) ──
+    def leer_meta(self, clave):
+        try:
+            with open(self._ruta(clave, '.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def escribir_meta(self, clave, datos):
+        def escribir(tmp):
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(datos, f, ensure_ascii=False)
+        self._escribir(self._ruta(clave, '.json'), escribir)
+
+    # ── Salidas (ficheros) ──
+    def recuperar(self, clave, nombre, outdir):
+        """Copia la salida guardada a outdir. True si estaba."""
+        ruta = self._ruta(clave, '--' + nombre)
+        if not self._usar(ruta):
+            return False
+        try:
+            shutil.copyfile(ruta, os.path.join(outdir, nombre))
+        except OSError:
+            return False
+        return True
+
+    def almacenar(self, clave, nombre, outdir):
+        origen = os.path.join(outdir, nombre)
+        if os.path.exists(origen):
+            self._escribir(self._ruta(clave, '--' + nombre),
+                           lambda tmp: shutil.copyfile(origen, tmp))
+
+    # ── Tamaño ──
+    def recortar(self):
+        """Borra las entradas menos usadas hasta quedar por debajo de max_mb. Devuelve cuántas."""
+        entradas = []
+        for ruta in glob.glob(os.path.join(self.carpeta, '*')):
+            try:
+                st = os.stat(ruta)
+            except OSError:
+                continue
+            entradas.append((st.st_mtime, st.st_size, ruta))
+        total = sum(e[1] for e in entradas)
+        borradas = 0
+        for _, tam, ruta in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            total -= tam
+            borradas += 1
+        return borradas
+
+    def tamano_mb(self):
+        return sum(os.path.getsize(r) for r in glob.glob(os.path.join(self.carpeta, '*'))
+                   if os.path.isfile(r)) / 1e6
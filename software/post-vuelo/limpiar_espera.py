@@ -8,6 +8,9 @@ listo para usar con analizar_vuelo.py, generar_kml.py y caelum_playback.py.
 Uso:
     python limpiar_espera.py datos_SD_raw.csv     → genera datos_SD.csv
     python limpiar_espera.py datos_radio.csv      → genera datos_radio_limpio.csv
+    python limpiar_espera.py datos_SD_raw.csv --columnas
+                                                  → además datos_SD_columnas/ (archivo
+                                                    columnar, ver software/comun)
 
 El fichero original nunca se modifica.
 """
@@ -25,14 +28,16 @@ FASES_ELIMINAR = {"espera"}
 #  MAIN
 # ──────────────────────────────────────────────────────────────
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python limpiar_espera.py <fichero.csv>")
+    columnas = "--columnas" in sys.argv[1:]
+    argumentos = [a for a in sys.argv[1:] if a != "--columnas"]
+    if not argumentos:
+        print("Uso: python limpiar_espera.py <fichero.csv> [--columnas]")
         print("")
         print("  python limpiar_espera.py datos_SD.csv")
         print("  python limpiar_espera.py datos_radio.csv")
         sys.exit(1)
 
-    input_file = sys.argv[1]
+    input_file = argumentos[0]
 
     if not os.path.exists(input_file):
         print(f"Error: no se encuentra el fichero '{input_file}'")
@@ -105,5 +110,14 @@ def main():
         tam_limpio   = os.path.getsize(output_file) / 1024
         print(f"  Original: {tam_original:.1f} KB  →  Limpio: {tam_limpio:.1f} KB")
 
+        if columnas:
+            # Archivo columnar compartido con la estación de tierra (software/comun)
+            sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "comun"))
+            from archivo_columnar import archivo_columnar, convertir_csv
+            destino = convertir_csv(output_file, archivo_columnar(output_file))
+            tam_columnas = sum(os.path.getsize(os.path.join(destino, s))
+                               for s in os.listdir(destino)) / 1024
+            print(f"  Columnar: {destino} ({tam_columnas:.1f} KB)")
+
 if __name__ == "__main__":
     main()
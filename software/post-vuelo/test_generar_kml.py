@@ -0,0 +1,93 @@
+"""
+============================================================
+  CANSAT CAELUM — Pruebas de cargar_datos() de generar_kml.py
+============================================================
+  Las filas con un valor vacío o corrupto (lat, lon, alt,
+  pm2_5, co2, temp_hs) se descartan como con el csv.DictReader
+  de antes, en vez de dibujarse con ese valor a 0 (una lat
+  vacía ponía el punto en el ecuador).
+
+  Uso:
+      python -m pytest test_generar_kml.py
+      python test_generar_kml.py
+============================================================
+"""
+
+import csv
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+RAIZ    = os.path.join(CARPETA, '..', '..')
+CSV     = os.path.join(RAIZ, 'data', 'simulacion', 'datos_simulacion.csv')
+
+_spec = importlib.util.spec_from_file_location('generar_kml', os.path.join(CARPETA, '🐍_generar_kml.py'))
+generar_kml = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(generar_kml)
+
+
+def cargar_como_antes(ruta):
+    """Regla de la versión con csv.DictReader: (lat, lon, alt, pm2_5) de las filas que pasan."""
+    filas = []
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for fila in csv.DictReader(f):
+            try:
+                lat, lon = float(fila.get('lat', 0)), float(fila.get('lon', 0))
+                valores = (lat, lon, float(fila.get('alt', 0)), float(fila.get('pm2_5', 0)))
+                float(fila.get('co2', 0)), float(fila.get('temp_hs', 0))
+            except (ValueError, TypeError):
+                continue
+            if lat == 0.0 and lon == 0.0:
+                continue
+            filas.append(valores)
+    return filas
+
+
+class PruebasCargarDatos(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp(prefix="generar_kml_")
+
+    def tearDown(self):
+        shutil.rmtree(self.carpeta, ignore_errors=True)
+
+    def escribir_csv(self, lineas):
+        ruta = os.path.join(self.carpeta, 'vuelo.csv')
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lineas) + '\n')
+        return ruta
+
+    def test_fila_con_lat_corrupta_se_descarta(self):
+        ruta = self.escribir_csv([
+            'timestamp,lat,lon,alt,pm2_5,co2,temp_hs,fase',
+            '1,40.40,-3.70,100,10,420,15,ascenso',
+            '2,,-3.70,110,11,421,15,ascenso',          # lat vacía
+            '3,40.4x,-3.70,120,12,422,15,ascenso',     # lat corrupta
+            '4,40.41,-3.71,130,abc,423,15,ascenso',    # pm2_5 corrupto
+            '5,0,0,140,14,424,15,ascenso',             # sin fix
+            '6,40.42,-3.72,150,15,425,14,descenso',
+        ])
+        filas = generar_kml.cargar_datos(ruta)
+        self.assertEqual([(f['_lat'], f['_lon'], f['_alt']) for f in filas],
+                         [(40.40, -3.70, 100.0), (40.42, -3.72, 150.0)])
+        self.assertEqual([f['_fase'] for f in filas], ['ascenso', 'descenso'])
+        self.assertEqual(len(filas), len(cargar_como_antes(ruta)))
+
+    def test_columna_que_falta_vale_cero(self):
+        ruta = self.escribir_csv(['timestamp,lat,lon,alt', '1,40.4,-3.7,100'])
+        filas = generar_kml.cargar_datos(ruta)
+        self.assertEqual(len(filas), 1)
+        self.assertEqual((filas[0]['_pm25'], filas[0]['_co2'], filas[0]['_fase']), (0.0, 0.0, ''))
+
+    def test_igual_que_antes_con_la_simulacion(self):
+        filas = generar_kml.cargar_datos(CSV)
+        self.assertEqual([(f['_lat'], f['_lon'], f['_alt'], f['_pm25']) for f in filas],
+                         cargar_como_antes(CSV))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2, argv=[sys.argv[0]] + sys.argv[1:])
@@ -28,12 +28,17 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "pyserial"])
     import serial
 
+# Lector de tramas compartido con la estación de tierra (software/comun)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comun'))
+from lector_tramas import LectorTramas
+
 # ── CONFIGURACIÓN ──────────────────────────────────────────
 PUERTO   = 'COM3'    # ⚠️ Cambiar si el Arduino está en otro puerto
 BAUDRATE = 115200    # Debe coincidir con el Arduino
-TIMEOUT  = 10        # Segundos esperando respuesta del Arduino
+TIMEOUT  = 10        # Segundos sin recibir nada antes de dar la transmisión por terminada
 
 OUTPUT_FILE = 'datos_RAM.csv'
+GUARDAR_COLUMNAS = True   # además, datos_RAM_columnas/ para analizar_vuelo y generar_kml
 # ───────────────────────────────────────────────────────────
 
 
@@ -78,51 +83,64 @@ def extraer_ram():
     print("📤 Enviando comando CSV_RAM...")
     ser.write(b'CSV_RAM\n')
 
-    # Leer respuesta
+    # Leer respuesta — todo lo que haya en el buffer de una vez (LectorTramas)
+    lector = LectorTramas(ser)
     lineas = []
     cabecera_encontrada = False
     fin_encontrado = False
+    ultimo_dato = time.monotonic()
 
     print("📥 Recibiendo datos...\n")
 
-    while True:
+    while not fin_encontrado:
         try:
-            linea = ser.readline().decode('utf-8', errors='ignore').strip()
+            recibidas = lector.leer()
         except serial.SerialException as e:
             print(f"⚠️  Error leyendo puerto: {e}")
             break
 
-        if not linea:
-            continue
-
-        # Detectar inicio del CSV
-        if 'inicio' in linea.lower() or linea.lower().startswith('---'):
-            print(f"   {linea}")
-            continue
-
-        # Detectar fin del CSV
-        if 'fin' in linea.lower() or 'end' in linea.lower():
-            print(f"\n   {linea}")
-            fin_encontrado = True
-            break
-
-        # Detectar cabecera (primera línea con nombres de columnas)
-        if not cabecera_encontrada and 'timestamp' in linea.lower():
-            cabecera_encontrada = True
-            lineas.append(linea)
-            print(f"   📋 Cabecera: {linea[:60]}...")
+        if not recibidas:
+            if time.monotonic() - ultimo_dato > TIMEOUT:
+                break   # el Arduino dejó de enviar sin marcador de FIN
             continue
-
-        # Datos
-        if cabecera_encontrada and linea:
-            lineas.append(linea)
-            # Mostrar progreso cada 10 filas
-            n = len(lineas) - 1  # sin contar cabecera
-            if n % 10 == 0:
-                print(f"   [{n:>4} muestras recibidas]")
+        ultimo_dato = time.monotonic()
+
+        for linea in recibidas:
+            linea = linea.strip()
+            if not linea:
+                continue
+
+            # Detectar inicio del CSV
+            if 'inicio' in linea.lower() or linea.lower().startswith('---'):
+                print(f"   {linea}")
+                continue
+
+            # Detectar fin del CSV
+            if 'fin' in linea.lower() or 'end' in linea.lower():
+                print(f"\n   {linea}")
+                fin_encontrado = True
+                break
+
+            # Detectar cabecera (primera línea con nombres de columnas)
+            if not cabecera_encontrada and 'timestamp' in linea.lower():
+                cabecera_encontrada = True
+                lineas.append(linea)
+                print(f"   📋 Cabecera: {linea[:60]}...")
+                continue
+
+            # Datos
+            if cabecera_encontrada:
+                lineas.append(linea)
+                # Mostrar progreso cada 10 filas
+                n = len(lineas) - 1  # sin contar cabecera
+                if n % 10 == 0:
+                    print(f"   [{n:>4} muestras recibidas]")
 
     ser.close()
 
+    if lector.malformadas:
+        print(f"\n⚠️  {lector.malformadas} líneas corruptas descartadas ({lector.resumen()})")
+
     # Verificar que recibimos algo útil
     if not cabecera_encontrada:
         print("\n❌ No se recibió la cabecera CSV.")
@@ -148,6 +166,12 @@ def extraer_ram():
     print(f"{'═'*55}")
     print(f"   Muestras guardadas: {n_muestras}")
     print(f"   Archivo:            {OUTPUT_FILE}")
+    if GUARDAR_COLUMNAS:
+        try:
+            from archivo_columnar import archivo_columnar, convertir_csv   # necesita NumPy
+            print(f"   Columnar:           {convertir_csv(OUTPUT_FILE, archivo_columnar(OUTPUT_FILE))}")
+        except ImportError as e:
+            print(f"   ⚠️  Sin archivo columnar ({e}): solo se guarda el CSV")
     print(f"\n   Siguiente paso:")
     print(f"   python analizar_vuelo.py {OUTPUT_FILE}")
     print()
@@ -14,6 +14,7 @@
       python generar_kml.py datos_radio.csv
       python generar_kml.py datos_RAM.csv
       python generar_kml.py datos_simulacion.csv
+      python generar_kml.py datos_radio_columnas    (archivo columnar)
 
   Genera:
       analisis_vuelo/trayectoria_vuelo.kml
@@ -22,7 +23,12 @@
 
 import sys
 import os
-import csv
+from array import array
+from math import isnan, nan
+
+# Parser compartido con la estación de tierra (software/comun)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comun'))
+from parser_telemetria import ParserTelemetria
 
 # ── CONFIGURACIÓN ──────────────────────────────────────────
 OUTPUT_DIR  = 'analisis_vuelo'
@@ -45,27 +51,39 @@ def color_pm25(valor):
     return 'ff0000aa'
 
 def cargar_datos(filepath):
-    """Carga el CSV y devuelve lista de filas con GPS válido."""
+    """
+    Carga el CSV (o su archivo columnar) y devuelve lista de filas con GPS válido.
+    Como con csv.DictReader, se descarta la fila si alguno de sus valores está
+    vacío o no es un número (llegan como NaN); una columna que no existe vale 0.
+    """
+    if os.path.isdir(filepath):
+        # Archivo columnar: solo entonces hace falta NumPy (el CSV va sin dependencias)
+        from archivo_columnar import leer_columnas
+        # Pasando por texto, los float32 vuelven con las mismas cifras que en el CSV
+        # (975.3 y no 975.2999877929688 en el KML)
+        cols = {campo: (valores.tolist() if campo == 'fase' else list(map(float, valores.astype(str))))
+                for campo, valores in leer_columnas(
+                    filepath, ['lat', 'lon', 'alt', 'pm2_5', 'co2', 'temp_hs', 'fase']).items()}
+        cols['_filas'] = len(cols.get('lat', ()))
+    else:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            parser = ParserTelemetria.desde_cabecera(f.readline())
+            cols   = parser.parse_many(f.read().splitlines(), relleno=nan)
+
+    n     = cols['_filas']
+    ceros = array('d', [0.0]) * n
+    col   = lambda nombre: cols.get(nombre, ceros)
+
     filas = []
-    with open(filepath, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for fila in reader:
-            try:
-                lat  = float(fila.get('lat', 0))
-                lon  = float(fila.get('lon', 0))
-                alt  = float(fila.get('alt', 0))
-                if lat == 0.0 and lon == 0.0:
-                    continue  # Sin fix GPS
-                fila['_lat']  = lat
-                fila['_lon']  = lon
-                fila['_alt']  = alt
-                fila['_pm25'] = float(fila.get('pm2_5', 0))
-                fila['_co2']  = float(fila.get('co2', 0))
-                fila['_temp'] = float(fila.get('temp_hs', 0))
-                fila['_fase'] = fila.get('fase', '').strip()
-                filas.append(fila)
-            except (ValueError, TypeError):
-                continue
+    for lat, lon, alt, pm25, co2, temp, fase in zip(
+            col('lat'), col('lon'), col('alt'), col('pm2_5'),
+            col('co2'), col('temp_hs'), cols.get('fase', [''] * n)):
+        if lat == 0.0 and lon == 0.0:
+            continue  # Sin fix GPS
+        if any(map(isnan, (lat, lon, alt, pm25, co2, temp))):
+            continue  # Valor vacío o corrupto
+        filas.append({'_lat': lat, '_lon': lon, '_alt': alt, '_pm25': pm25,
+                      '_co2': co2, '_temp': temp, '_fase': fase})
     return filas
 
 def generar_kml(filas, output_path):
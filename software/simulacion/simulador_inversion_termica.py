@@ -25,6 +25,12 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import math
+import os
+import sys
+
+# Codificador de tramas binarias de radio (software/comun/trama_binaria.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comun'))
+from trama_binaria import escribir_tramas
 
 # ──────────────────────────────────────────────────────────────
 #  CONFIGURACIÓN DEL VUELO
@@ -48,6 +54,7 @@ INTERVALO_MUESTREO = 1  # s
 
 FECHA_LANZAMIENTO = datetime(2026, 3, 17, 11, 30, 0)
 OUTPUT_FILE = 'datos_simulacion.csv'
+OUTPUT_BIN  = 'datos_simulacion.bin'   # mismas filas como tramas binarias de radio
 
 # ──────────────────────────────────────────────────────────────
 #  CONDICIONES METEOROLÓGICAS
@@ -334,6 +341,7 @@ def simular_vuelo():
     # ── Guardar CSV ──
     df = pd.DataFrame(datos)
     df.to_csv(OUTPUT_FILE, index=False)
+    bytes_bin = escribir_tramas(df.to_dict('records'), OUTPUT_BIN)
 
     # ── Resumen ──
     print("\n" + "═" * 60)
@@ -361,6 +369,7 @@ def simular_vuelo():
 
     print(f"\n📁 CSV generado: {OUTPUT_FILE}")
     print(f"   {len(df)} registros · 25 columnas")
+    print(f"📡 Tramas binarias: {OUTPUT_BIN} ({bytes_bin} bytes, {bytes_bin / os.path.getsize(OUTPUT_FILE):.0%} del CSV)")
     print(f"\n💡 Siguiente paso:")
     print(f"   python analizar_vuelo.py {OUTPUT_FILE}  # Debe detectar inversión en 200-350 m")
     print("\n" + "═" * 60)
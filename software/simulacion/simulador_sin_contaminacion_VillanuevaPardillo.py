@@ -19,6 +19,12 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import math
+import os
+import sys
+
+# Codificador de tramas binarias de radio (software/comun/trama_binaria.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comun'))
+from trama_binaria import escribir_tramas
 
 # ──────────────────────────────────────────────────────────────
 # CONFIGURACIÓN DEL VUELO
@@ -39,6 +45,7 @@ INTERVALO_MUESTREO = 1
 
 FECHA_LANZAMIENTO = datetime(2026, 3, 18, 10, 0, 0)
 OUTPUT_FILE = 'datos_simulacion.csv'
+OUTPUT_BIN  = 'datos_simulacion.bin'   # mismas filas como tramas binarias de radio
 
 # ──────────────────────────────────────────────────────────────
 # CONDICIONES METEOROLÓGICAS
@@ -176,10 +183,12 @@ def simular_vuelo():
 
     df = pd.DataFrame(datos)
     df.to_csv(OUTPUT_FILE, index=False)
+    bytes_bin = escribir_tramas(df.to_dict('records'), OUTPUT_BIN)
 
     print(f"\n✅ Simulación completada")
     print(f"📁 Archivo: {OUTPUT_FILE}")
     print(f"📊 Registros: {len(df)}")
+    print(f"📡 Tramas binarias: {OUTPUT_BIN} ({bytes_bin} bytes, {bytes_bin / os.path.getsize(OUTPUT_FILE):.0%} del CSV)")
 
     return df
 
@@ -0,0 +1,329 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# PROGRAMA: Banco de pruebas del receptor con puerto serie virtual
+# OBJETIVO: Probar receptor_telemetria.py sin Arduino ni APC220. Se abre un par de
+#           pseudoterminales (pty): por un extremo este script "emite" un CSV de vuelo
+#           como lo haría la radio y por el otro el receptor lo lee como un COM normal.
+#
+#   - El ritmo sigue los timestamps del CSV divididos por la VELOCIDAD (1×, 10×, 100×),
+#     con reloj monotónico: si una escritura se retrasa, las siguientes recuperan
+#     (sin deriva acumulada)
+#   - Si el CSV es corto se repite en bucle, con num_paquete y timestamp crecientes
+#   - Fallos de radio opcionales: CORRUPCION (un byte cambiado) y PERDIDA (línea que no
+#     se envía), por fracción de líneas
+#   - Con FORMATO_RADIO = "binario" en el receptor se emiten tramas binarias
+#
+# MODO BANCO (por defecto): para cada velocidad arranca el receptor real en este mismo
+#   proceso (Firebase → emulador_firebase.py, salidas en una carpeta temporal) y
+#   comprueba si se mantiene al día: todas las líneas contabilizadas (paquete, corrupta
+#   o inválida), ninguna descartada por cola llena y latencia serie → CSV pequeña.
+#   También muestra cuántos baudios haría falta para ese ritmo.
+#
+# MODO PTY: solo abre el pty y emite, para lanzar a mano el receptor (o el dashboard)
+#   con PUERTO_SERIAL = el nombre que se muestra.
+#
+# USO (Linux / macOS — Windows no tiene pty):
+#   python banco_serie.py                            → 1,10,100× · 20 s cada una · sin fallos
+#   python banco_serie.py 1,10,100 20 0.01 0.02      → velocidades, segundos, corrupción, pérdida
+#   python banco_serie.py --pty 10                   → emitir a 10× por un pty y esperar
+#   Cualquier CSV: BANCO_CSV=datos_SD_raw.csv python banco_serie.py
+# ===========================================================================================
+
+import _thread
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+
+import receptor_telemetria as receptor
+from emulador_firebase import EmuladorFirebase
+from trama_binaria import codificar   # receptor_telemetria ya añadió software/comun
+
+# === CONFIGURACIÓN POR DEFECTO ===
+RAIZ        = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')
+CSV_DEFECTO = os.environ.get('BANCO_CSV') or \
+              os.path.join(RAIZ, 'data', 'simulacion', 'datos_simulacion.csv')
+VELOCIDADES = (1, 10, 100)
+SEGUNDOS    = 20        # duración de la emisión en cada velocidad
+CORRUPCION  = 0.0       # fracción de líneas con un byte cambiado
+PERDIDA     = 0.0       # fracción de líneas que no se envían
+MARGEN      = 2.0       # segundos tras la última línea antes de parar el receptor
+LATENCIA_FB = 0.03      # latencia del emulador de Firebase
+P99_MAX_CSV = 1.0       # s — por encima, el receptor no va al día
+SEMILLA     = 1
+
+
+def percentil(datos, p):
+    if not datos:
+        return 0.0
+    datos = sorted(datos)
+    return datos[min(len(datos) - 1, int(p / 100 * len(datos)))]
+
+
+# ============================================================================
+#  EMISIÓN
+# ============================================================================
+def cargar_vuelo(ruta=CSV_DEFECTO):
+    """
+    Filas del CSV y sus instantes relativos en segundos. Los timestamps del
+    Arduino van en ms y los de la simulación en s: si el paso típico es
+    mayor que 20 se toman como ms.
+    """
+    with open(ruta, 'r', encoding='utf-8', newline='') as f:
+        lector = csv.DictReader(f)
+        lector.fieldnames = [c.strip().lower() for c in lector.fieldnames]
+        filas = list(lector)
+    ts = [float(f.get('timestamp') or 0) for f in filas]
+    pasos = sorted(b - a for a, b in zip(ts, ts[1:]) if b > a)
+    paso = pasos[len(pasos) // 2] if pasos else 1.0
+    escala = 1000.0 if paso > 20 else 1.0
+    tiempos = [(t - ts[0]) / escala for t in ts]
+    return filas, tiempos, paso / escala
+
+
+def programar(filas, tiempos, paso, velocidad, segundos):
+    """
+    (instante de envío, num_paquete, fila) para `segundos` de emisión a `velocidad`,
+    repitiendo el vuelo en bucle si hace falta. El timestamp de cada vuelta se
+    desplaza para que (num_paquete, timestamp) no se repita.
+    """
+    duracion = tiempos[-1] + paso
+    plan, vuelta, num = [], 0, 0
+    while True:
+        for fila, t in zip(filas, tiempos):
+            t_envio = (vuelta * duracion + t) / velocidad
+            if t_envio >= segundos:
+                return plan
+            num += 1
+            fila = dict(fila)
+            fila['timestamp'] = f"{vuelta * duracion + t:g}"
+            plan.append((t_envio, num, fila))
+        vuelta += 1
+
+
+def a_bytes(num, fila, binario):
+    if binario:
+        return codificar(fila, num_paquete=num)[0]
+    campos = [str(num), 'CAELUM'] + [str(fila.get(c, '')) for c in receptor.CABECERA[2:]]
+    return (','.join(campos) + '\r\n').encode('utf-8')
+
+
+def corromper(datos, rng):
+    """Cambia un byte (nunca por un fin de línea, para no partir la línea en dos)."""
+    datos = bytearray(datos)
+    i = rng.randrange(len(datos) - 2)
+    datos[i] = rng.choice([b for b in range(256) if b not in (10, 13, datos[i])])
+    return bytes(datos)
+
+
+class Emisor:
+    """Escribe el plan en el extremo maestro del pty al ritmo programado."""
+
+    def __init__(self, fd, plan, binario=False, corrupcion=CORRUPCION, perdida=PERDIDA,
+                 semilla=SEMILLA):
+        self.fd         = fd
+        self.plan       = plan
+        self.binario    = binario
+        self.corrupcion = corrupcion
+        self.perdida    = perdida
+        self._rng       = random.Random(semilla)
+        self.enviadas   = 0
+        self.corruptas  = 0
+        self.perdidas   = 0
+        self.bytes      = 0
+        self.retrasos   = []   # s de retraso de cada escritura respecto a su hora
+        self.duracion   = 0.0
+        self._hilo      = threading.Thread(target=self._bucle, name="emisor", daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+        return self
+
+    def esperar(self):
+        self._hilo.join()
+
+    @property
+    def activo(self):
+        return self._hilo.is_alive()
+
+    def _bucle(self):
+        t0 = time.monotonic()
+        for t_envio, num, fila in self.plan:
+            espera = t0 + t_envio - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            if self._rng.random() < self.perdida:
+                self.perdidas += 1
+                continue
+            datos = a_bytes(num, fila, self.binario)
+            if self._rng.random() < self.corrupcion:
+                datos = corromper(datos, self._rng)
+                self.corruptas += 1
+            self.retrasos.append(time.monotonic() - t0 - t_envio)
+            vista = memoryview(datos)
+            while vista:   # el pty puede aceptar menos bytes si el lector va lento
+                n = os.write(self.fd, vista)
+                vista = vista[n:]
+            self.enviadas += 1
+            self.bytes    += len(datos)
+        self.duracion = time.monotonic() - t0
+
+
+def abrir_pty():
+    """(fd maestro, nombre del esclavo) en modo raw: los bytes pasan tal cual."""
+    import tty
+    maestro, esclavo = os.openpty()
+    tty.setraw(esclavo)
+    return maestro, esclavo, os.ttyname(esclavo)
+
+
+# ============================================================================
+#  BANCO
+# ============================================================================
+def probar(velocidad, segundos, corrupcion, perdida, vuelo, emu, carpeta):
+    """Una pasada del receptor real a `velocidad`. Devuelve el dict de resultados."""
+    filas, tiempos, paso = vuelo
+    plan = programar(filas, tiempos, paso, velocidad, segundos)
+    maestro, esclavo, nombre = abrir_pty()
+
+    prefijo = os.path.join(carpeta, f"v{velocidad:g}")
+    receptor.PUERTOS_SERIAL   = [nombre]
+    receptor.FIREBASE_URL     = emu.url
+    receptor.ARCHIVO_CSV      = prefijo + "_radio.csv"
+    receptor.ARCHIVO_METRICAS = prefijo + "_metricas.json"
+    receptor.ARCHIVO_REENVIO  = prefijo + "_reenvio.jsonl"
+    receptor.METRICAS_PUERTO  = None
+    receptor.DIRECTO_PUERTO   = None
+    receptor.GUARDAR_COLUMNAS = False
+
+    emisor = Emisor(maestro, plan, receptor.FORMATO_RADIO == "binario", corrupcion, perdida)
+
+    def parar():
+        time.sleep(0.5)            # que el receptor abra el puerto antes de emitir
+        emisor.iniciar()
+        emisor.esperar()
+        time.sleep(MARGEN)
+        _thread.interrupt_main()
+
+    threading.Thread(target=parar, daemon=True).start()
+    salida = io.StringIO()
+    t0 = time.monotonic()
+    try:
+        with redirect_stdout(salida):   # el log por paquete se genera igual, pero no se pinta
+            receptor.ejecutar()
+    except KeyboardInterrupt:           # si el aviso llega fuera del bucle del receptor
+        pass
+    t_total = time.monotonic() - t0
+    os.close(maestro)
+    os.close(esclavo)
+
+    with open(receptor.ARCHIVO_METRICAS, 'r', encoding='utf-8') as f:
+        metricas = json.load(f)
+    valores, latencias = metricas['valores'], metricas['latencias']
+    muestras    = valores.get('muestras_total') or 0
+    malformadas = valores.get('tramas_malformadas_total') or 0
+    invalidas   = valores.get('lineas_invalidas_total') or 0
+    descartadas = valores.get('lineas_descartadas_total') or 0
+    contadas    = muestras + malformadas + invalidas
+    p99_csv     = latencias['rx_csv']['p99_ms'] / 1000
+    ritmo       = emisor.bytes / emisor.duracion if emisor.duracion else 0.0
+    return {
+        'velocidad':   velocidad,
+        'lineas':      len(plan),
+        'enviadas':    emisor.enviadas,
+        'perdidas':    emisor.perdidas,
+        'corruptas':   emisor.corruptas,
+        'muestras':    muestras,
+        'malformadas': malformadas,
+        'invalidas':   invalidas,
+        'descartadas': descartadas,
+        'faltan':      emisor.enviadas - contadas,
+        'lineas_s':    emisor.enviadas / emisor.duracion if emisor.duracion else 0.0,
+        'baudios':     ritmo * 10,       # 8N1
+        'emisor_p99':  percentil(emisor.retrasos, 99),
+        'latencias':   latencias,
+        'al_dia':      contadas >= emisor.enviadas and descartadas == 0 and p99_csv <= P99_MAX_CSV,
+        'firebase':    valores.get('firebase_enviados_total') or 0,
+        't_total':     t_total,
+        'log':         salida.getvalue(),
+    }
+
+
+def banco(velocidades=VELOCIDADES, segundos=SEGUNDOS, corrupcion=CORRUPCION, perdida=PERDIDA,
+          ruta=CSV_DEFECTO):
+    vuelo = cargar_vuelo(ruta)
+    emu = EmuladorFirebase(latencia=LATENCIA_FB).iniciar()
+    print(f"\n{'═'*86}")
+    print(f"   🧪 BANCO DEL RECEPTOR — pty + emulador Firebase ({LATENCIA_FB * 1000:.0f} ms)")
+    print(f"   {os.path.basename(ruta)}  ·  {len(vuelo[0])} filas cada {vuelo[2]:g} s  ·  "
+          f"{segundos} s por velocidad  ·  formato {receptor.FORMATO_RADIO}")
+    print(f"   corrupción {corrupcion:.1%}  ·  pérdida {perdida:.1%}  ·  "
+          f"radio real: {receptor.BAUDRATE} baudios")
+    print(f"{'═'*86}")
+    print(f"   {'vel.':>5} {'líneas/s':>9} {'baudios':>8} {'enviadas':>9} {'paquetes':>9} "
+          f"{'corrup.':>8} {'faltan':>7} {'parseo p99':>11} {'CSV p99':>8} {'FB p99':>8}")
+
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix="banco_serie_") as carpeta:
+        for v in velocidades:
+            r = probar(v, segundos, corrupcion, perdida, vuelo, emu, carpeta)
+            resultados.append(r)
+            lat = r['latencias']
+            print(f"   {v:>4g}× {r['lineas_s']:>9.1f} {r['baudios']:>8.0f} {r['enviadas']:>9} "
+                  f"{r['muestras']:>9} {r['malformadas'] + r['invalidas']:>8} {r['faltan']:>7} "
+                  f"{lat['rx_parseo']['p99_ms']:>8.1f} ms {lat['rx_csv']['p99_ms']:>5.0f} ms "
+                  f"{lat['rx_firebase']['p99_ms']:>5.0f} ms  "
+                  + ("✅" if r['al_dia'] else "❌ no va al día")
+                  + ("  ⚠️ más que la radio" if r['baudios'] > receptor.BAUDRATE else ""))
+            if r['descartadas']:
+                print(f"         └ {r['descartadas']} líneas descartadas por cola de parseo llena")
+            if r['emisor_p99'] > 0.05:
+                print(f"         └ el propio emisor fue con retraso (p99 {r['emisor_p99'] * 1000:.0f} ms)")
+    print(f"{'═'*86}")
+    print(f"   enviadas = líneas escritas en el pty (sin las perdidas a propósito)")
+    print(f"   corrup. = corruptas + inválidas detectadas por el receptor; faltan = sin contabilizar")
+    print(f"   Emulador: {emu.resumen()}")
+    print(f"{'═'*86}\n")
+    emu.detener()
+    return resultados
+
+
+def solo_pty(velocidad, ruta=CSV_DEFECTO):
+    """Emite el vuelo en bucle por un pty hasta Ctrl+C."""
+    filas, tiempos, paso = cargar_vuelo(ruta)
+    maestro, esclavo, nombre = abrir_pty()
+    print(f"\n🔌 Puerto virtual: {nombre}")
+    print(f"   Poner PUERTO_SERIAL = '{nombre}' en receptor_telemetria.py y arrancarlo.")
+    print(f"   Emitiendo {os.path.basename(ruta)} a {velocidad:g}× en bucle (Ctrl+C para parar)\n")
+    plan = programar(filas, tiempos, paso, velocidad, 24 * 3600)   # un día de emisión
+    emisor = Emisor(maestro, plan, receptor.FORMATO_RADIO == "binario").iniciar()
+    try:
+        while emisor.activo:
+            time.sleep(1)
+            print(f"\r   {emisor.enviadas} líneas enviadas", end="", flush=True)
+    except KeyboardInterrupt:
+        print()
+    os.close(maestro)
+    os.close(esclavo)
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == "--pty":
+        solo_pty(float(args[1]) if len(args) > 1 else 1.0)
+        return
+    velocidades = tuple(float(v) for v in args[0].split(',')) if len(args) > 0 else VELOCIDADES
+    segundos    = float(args[1]) if len(args) > 1 else SEGUNDOS
+    corrupcion  = float(args[2]) if len(args) > 2 else CORRUPCION
+    perdida     = float(args[3]) if len(args) > 3 else PERDIDA
+    banco(velocidades, segundos, corrupcion, perdida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# PROGRAMA: Benchmark de subida a Firebase contra el emulador local
+# OBJETIVO: Medir, sin tocar la base de datos real, cuántos paquetes/s sube cada
+#           herramienta y con qué latencia (p50 / p99) llega cada paquete.
+#
+#   receptor  → receptor_telemetria.py: parsear_linea + SubidorLotes (sin bloquear)
+#   playback  → caelum_playback.py:     construir_payload + SubidorLotes (bloqueando, en tubería)
+#   limpiar   → 🐍_limpiar_firebase.py: construir_payload + un PUT por paquete
+#   purga     → purga_firebase.py:      borrado de todo lo subido (claves/s)
+#
+# Latencia de extremo a extremo = desde que la herramienta entrega el paquete
+# hasta que el emulador lo escribe en su árbol (mismo reloj, mismo proceso).
+# Los datos son data/simulacion/datos_simulacion.csv replicados hasta N filas,
+# con timestamps únicos para que no se pisen las claves.
+#
+# USO:
+#   python benchmark_firebase.py                   → 5000 paquetes, 30 ms, 0 % errores
+#   python benchmark_firebase.py 20000 0.05 0.02   → N, latencia (s), tasa de error
+# ===========================================================================================
+
+import csv
+import importlib
+import os
+import sys
+import time
+
+from emulador_firebase import EmuladorFirebase
+from cliente_firebase import ClienteFirebase
+from subida_lotes import SubidorLotes
+from purga_firebase import purgar
+import receptor_telemetria as receptor
+import caelum_playback as playback
+
+limpiar = importlib.import_module('🐍_limpiar_firebase')
+
+# === CONFIGURACIÓN POR DEFECTO ===
+RAIZ        = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')
+CSV_DEFECTO = os.path.join(RAIZ, 'data', 'simulacion', 'datos_simulacion.csv')
+N_DEFECTO   = 5000
+LATENCIA    = 0.03    # segundos — RTT típico a europe-west1
+TASA_ERROR  = 0.0
+MAX_PUT     = 500     # limpiar hace un PUT por paquete: se limita para no tardar minutos
+TS_BASE     = 1_700_000_000
+
+
+def cargar_filas(n, ruta=CSV_DEFECTO):
+    """Filas (dict) de la simulación replicadas hasta n, con timestamp único."""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        base = list(csv.DictReader(f))
+    filas = []
+    for i in range(n):
+        fila = dict(base[i % len(base)])
+        fila['timestamp'] = str(TS_BASE + i)
+        filas.append(fila)
+    return filas
+
+
+def a_linea_radio(i, fila):
+    """Fila de simulación → línea tal como llega por el APC220 (25+ campos)."""
+    return ','.join([str(i + 1), 'CAELUM'] + [fila[c] for c in receptor.CABECERA[2:]])
+
+
+def percentil(datos, p):
+    if not datos:
+        return 0.0
+    return datos[min(len(datos) - 1, int(p / 100 * len(datos)))]
+
+
+# ── Herramientas ────────────────────────────────────────────────────
+# Cada una sube las filas a `ruta` y devuelve {clave: instante de entrega}
+
+def subir_receptor(cliente, ruta, filas):
+    lineas = [a_linea_radio(i, fila) for i, fila in enumerate(filas)]
+    subidor = SubidorLotes(cliente, ruta, receptor.MAX_LOTE, receptor.MAX_LATENCIA,
+                           receptor.TAM_COLA).iniciar()
+    entregas = {}
+    for linea in lineas:
+        payload = receptor.parsear_linea(linea)
+        clave = str(int(payload['timestamp']))
+        entregas[clave] = time.perf_counter()
+        subidor.ofrecer(payload, clave)   # cola llena → descartado (cuenta como perdido)
+    subidor.detener()
+    return entregas, subidor.resumen()
+
+
+def subir_playback(cliente, ruta, filas):
+    subidor = SubidorLotes(cliente, ruta, timeout=10, en_vuelo=playback.EN_VUELO).iniciar()
+    entregas = {}
+    for i, fila in enumerate(filas):
+        payload = playback.construir_payload(fila)
+        clave = str(int(payload.get('timestamp', i)))
+        entregas[clave] = time.perf_counter()
+        subidor.ofrecer(payload, clave=clave, bloquear=True)
+    subidor.detener()
+    return entregas, subidor.resumen()
+
+
+def subir_limpiar(cliente, ruta, filas):
+    entregas = {}
+    for i, fila in enumerate(filas[:MAX_PUT]):
+        payload = limpiar.construir_payload(fila)
+        clave = str(int(payload.get('timestamp', i)))
+        entregas[clave] = time.perf_counter()
+        try:
+            cliente.put(f"{ruta}/{clave}", payload)
+        except Exception:
+            pass
+    return entregas, f"{len(entregas)} PUT secuenciales"
+
+
+HERRAMIENTAS = [
+    ('receptor', subir_receptor),
+    ('playback', subir_playback),
+    ('limpiar',  subir_limpiar),
+]
+
+
+def medir(emu, nombre, funcion, filas):
+    ruta = f"/cansat/benchmark_{nombre}"
+    emu.llegadas.clear()
+    cliente = ClienteFirebase(emu.url)
+    t0 = time.perf_counter()
+    entregas, detalle = funcion(cliente, ruta, filas)
+
+    latencias, ultima = [], t0
+    for clave, t in entregas.items():
+        llegada = emu.llegadas.get(f"{ruta}/{clave}")
+        if llegada is not None:
+            latencias.append(llegada - t)
+            ultima = max(ultima, llegada)
+    latencias.sort()
+    segundos = ultima - t0
+    cliente.cerrar()
+    return {
+        'herramienta': nombre,
+        'paquetes':    len(latencias),
+        'perdidos':    len(entregas) - len(latencias),
+        'ritmo':       len(latencias) / segundos if segundos else 0.0,
+        'p50':         percentil(latencias, 50),
+        'p99':         percentil(latencias, 99),
+        'peticiones':  cliente.peticiones,
+        'detalle':     detalle,
+    }
+
+
+def medir_purga(emu):
+    cliente = ClienteFirebase(emu.url)
+    resultados = []
+    for nombre, _ in HERRAMIENTAS:
+        ruta = f"/cansat/benchmark_{nombre}"
+        r = purgar(cliente, ruta, mostrar=False)
+        resultados.append((ruta, r))
+    p50, p99 = cliente.percentil(50), cliente.percentil(99)
+    cliente.cerrar()
+    return resultados, p50, p99
+
+
+def main():
+    n          = int(sys.argv[1]) if len(sys.argv) > 1 else N_DEFECTO
+    latencia   = float(sys.argv[2]) if len(sys.argv) > 2 else LATENCIA
+    tasa_error = float(sys.argv[3]) if len(sys.argv) > 3 else TASA_ERROR
+
+    filas = cargar_filas(n)
+    emu = EmuladorFirebase(latencia=latencia, tasa_error=tasa_error, registrar=True).iniciar()
+
+    print(f"\n{'═'*72}")
+    print(f"   ⏱️  BENCHMARK SUBIDA FIREBASE — emulador {emu.url}")
+    print(f"   {n} paquetes  ·  latencia {latencia * 1000:.0f} ms  ·  errores {tasa_error:.0%}")
+    print(f"{'═'*72}")
+    print(f"   {'Herramienta':<10} {'paquetes':>9} {'perdidos':>9} {'paq/s':>9} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'HTTP':>6}")
+
+    for nombre, funcion in HERRAMIENTAS:
+        r = medir(emu, nombre, funcion, filas)
+        print(f"   {r['herramienta']:<10} {r['paquetes']:>9} {r['perdidos']:>9} "
+              f"{r['ritmo']:>9.0f} {1000 * r['p50']:>8.0f} {1000 * r['p99']:>8.0f} "
+              f"{r['peticiones']:>6}")
+        print(f"      └ {r['detalle']}")
+
+    resultados, p50, p99 = medir_purga(emu)
+    for ruta, r in resultados:
+        print(f"   🗑️  purga {ruta:<28} {r['borradas']:>6}/{r['claves']:<6} claves  "
+              f"{r['ritmo']:>8.0f} claves/s  ({r['peticiones']} PATCH)")
+    print(f"      └ latencia por petición p50 {1000 * p50:.0f} ms  p99 {1000 * p99:.0f} ms")
+
+    print(f"{'═'*72}")
+    print(f"   Emulador: {emu.resumen()}")
+    print(f"{'═'*72}\n")
+    emu.detener()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,17 +18,72 @@
 # NOTA: Los campos se envían a Firebase con los mismos nombres que en el CSV.
 #       El dashboard los lee directamente sin renombrar.
 #
-# ENTORNO: Google Colab o PC local
+# SUBIDA: por lotes (PATCH multi-ruta, ver subida_lotes.py). Con VELOCIDAD
+#         alta cada lote lleva varias filas → muchas menos peticiones, y hay
+#         hasta EN_VUELO peticiones en curso a la vez sin que el dashboard
+#         vea nunca un timestamp anterior pasar por delante de uno nuevo.
+#
+# RITMO:   cada fila sale en su instante del vuelo (diferencias de `timestamp`)
+#          dividido por VELOCIDAD, medido con el reloj monotónico desde la
+#          primera fila. Si una fila sale tarde, las siguientes no esperan
+#          hasta recuperar el horario: el retraso no se acumula. Al final se
+#          muestra el ritmo conseguido frente al objetivo y los percentiles
+#          del retraso.
+#
+# LECTURA: en streaming. Las filas se leen del CSV según se envían (memoria
+#          constante aunque sea un datos_SD_raw.csv de horas) y el total para
+#          el progreso sale del índice de filas, que se crea en un hilo aparte
+#          la primera vez (<csv>.indice.json); hasta que está, sale "?".
+#          La huella del CSV para el punto de control también se calcula en
+#          ese hilo (salvo con --resume / --seek, que la necesitan antes).
+#
+# REANUDAR: cada GUARDAR_CADA s se guarda la última fila confirmada por Firebase
+#          en playback_punto_control.json (indice_playback.py). Si se corta:
+#            python caelum_playback.py --resume          → sigue sin limpiar Firebase
+#            python caelum_playback.py --seek ts=120     → empieza en ese timestamp
+#            python caelum_playback.py --seek alt=500    → ...al bajar por 500 m
+#          (en Colab: REANUDAR / BUSCAR en la configuración)
+#
+# ENTORNO: Google Colab o PC local. Necesita a su lado los módulos de MODULOS
+#          (en Colab, subirlos junto a este fichero); si falta alguno se
+#          dice cuál y se para antes de tocar Firebase.
 # ===========================================================================================
 
-import requests
 import time
 import csv
+import io
 import os
+import sys
+from itertools import chain, islice
+
+MODULOS = ('subida_lotes', 'purga_firebase', 'cliente_firebase', 'metricas', 'indice_playback')
+
+try:
+    from subida_lotes import SubidorLotes
+    from purga_firebase import purgar
+    from cliente_firebase import ClienteFirebase
+    from metricas import HistogramaLatencia
+    from indice_playback import IndiceFilas, PuntoControl, huella_fichero
+except ImportError as e:
+    if e.name not in MODULOS:
+        raise
+    print(f"❌ Falta {e.name}.py. caelum_playback.py necesita en la misma carpeta:")
+    print("   " + ", ".join(m + ".py" for m in MODULOS))
+    print("   (en Colab, súbelos junto a caelum_playback.py; están en software/vuelo/panel_web/)")
+    sys.exit(1)
 
 # === CONFIGURACIÓN ===
 FIREBASE_URL = "https://cansat-66d98-default-rtdb.europe-west1.firebasedatabase.app"
-VELOCIDAD    = 1.0   # segundos entre envíos (1.0 = tiempo real)
+VELOCIDAD    = 1.0   # factor sobre el tiempo real del vuelo (0.5 = la mitad, 100 = cien veces más rápido)
+PASO_DEFECTO = 1.0   # s de vuelo entre filas sin timestamp válido (o que va hacia atrás)
+MAX_HUECO    = 30.0  # s de vuelo máximos entre dos filas (reinicios del Arduino, cortes del log)
+MUESTRA_ESCALA = 50  # filas iniciales con las que se decide si el timestamp va en ms o en s
+N_RETRASOS   = 100_000   # retrasos recientes para los percentiles (memoria acotada)
+IMPRIMIR_CADA = 0.25     # s mínimos entre líneas de progreso (y en cada cambio de fase)
+EN_VUELO     = 4     # peticiones PATCH simultáneas como máximo
+GUARDAR_CADA = 2.0   # s entre escrituras del punto de control
+REANUDAR     = False # True = como --resume
+BUSCAR       = None  # "ts=120" o "alt=500" = como --seek
 
 # Campos numéricos del CSV — se convierten a float al enviar
 CAMPOS_NUMERICOS = {
@@ -51,23 +106,131 @@ def detectar_fichero():
     else:
         return None, None
 
-def limpiar_firebase(ruta):
-    """Borra datos anteriores por lotes para evitar el límite de tamaño de Firebase."""
+def limpiar_firebase(cliente, ruta):
+    """Borra datos anteriores: PATCH a null por bloques en paralelo (purga_firebase.py)."""
     try:
-        r = requests.get(f"{FIREBASE_URL}{ruta}.json?shallow=true", timeout=10)
-        claves = r.json()
-        if not claves:
-            print(f"🗑️  {ruta} ya estaba vacío")
-        else:
-            print(f"🗑️  Borrando {len(claves)} entradas en {ruta}...")
-            for i, clave in enumerate(claves):
-                requests.delete(f"{FIREBASE_URL}{ruta}/{clave}.json", timeout=10)
-                if i % 20 == 0 and i > 0:
-                    print(f"   {i}/{len(claves)} borradas...")
-            print(f"🗑️  Limpieza completada ({len(claves)} entradas borradas)")
+        purgar(cliente, ruta)
     except Exception as e:
         print(f"⚠️  No se pudo limpiar Firebase: {e}")
 
+def leer_filas(archivo, byte=None, saltar=0):
+    """
+    Recorre el CSV fila a fila (dicts) sin cargarlo en memoria. Con `byte`
+    empieza en ese punto del fichero (inicio de una fila, ver indice_playback.py)
+    y descarta las `saltar` primeras filas.
+    """
+    with open(archivo, 'rb') as f:
+        columnas = next(csv.reader(io.TextIOWrapper(f, encoding='utf-8', newline='')), [])
+    with open(archivo, 'rb') as f:
+        if byte is None:
+            f.readline()   # cabecera
+        else:
+            f.seek(byte)
+        texto = io.TextIOWrapper(f, encoding='utf-8', newline='')
+        yield from islice(csv.DictReader(texto, fieldnames=columnas), saltar, None)
+
+def leer_timestamp(fila):
+    try:
+        return float(fila.get('timestamp'))
+    except (ValueError, TypeError):
+        return None
+
+def leer_alt(fila):
+    try:
+        return float(fila.get('alt'))
+    except (ValueError, TypeError):
+        return None
+
+def interpretar_busqueda(texto):
+    """'ts=120' → ('ts', 120.0); 'alt=500' → ('alt', 500.0); otra cosa → ValueError."""
+    criterio, _, valor = texto.partition('=')
+    criterio = criterio.strip().lower()
+    if criterio not in ('ts', 'alt'):
+        raise ValueError(f"búsqueda no válida: {texto!r} (usa ts=<timestamp> o alt=<metros>)")
+    return criterio, float(valor)
+
+def buscar_fila(archivo, indice, criterio, valor):
+    """
+    Fila (desde 0) donde empezar: la primera con timestamp ≥ valor, o la
+    primera a altitud ≤ valor después del apogeo (la bajada). None si no hay.
+    """
+    if criterio == 'ts':
+        byte, fila0 = indice.bloque_de_timestamp(valor)
+        for n, fila in enumerate(leer_filas(archivo, byte), fila0):
+            ts = leer_timestamp(fila)
+            if ts is not None and ts >= valor:
+                return n
+        return None
+    byte, fila0 = indice.bloque_de_apogeo()
+    filas = leer_filas(archivo, byte)
+    bloque = list(islice(filas, indice.cada))
+    alts = [leer_alt(f) for f in bloque]
+    apogeo = max(range(len(alts)), key=lambda k: -1e9 if alts[k] is None else alts[k], default=0)
+    for n, fila in enumerate(chain(bloque[apogeo:], filas), fila0 + apogeo):
+        alt = leer_alt(fila)
+        if alt is not None and alt <= valor:
+            return n
+    return None
+
+def detectar_escala(filas):
+    """
+    Divisor que pasa el timestamp a segundos. Los del Arduino van en ms y los
+    de la simulación en s: si el paso típico es mayor que 20 se toman como ms.
+    """
+    ts = [t for t in map(leer_timestamp, filas) if t is not None]
+    pasos = sorted(b - a for a, b in zip(ts, ts[1:]) if b > a)
+    paso = pasos[len(pasos) // 2] if pasos else 1.0
+    return 1000.0 if paso > 20 else 1.0
+
+class Planificador:
+    """
+    Marca el ritmo del playback con el reloj monotónico. Cada fila tiene un
+    instante objetivo absoluto (t0 + tiempo de vuelo / velocidad), así que un
+    retraso puntual se recupera en las filas siguientes en vez de sumarse.
+    """
+    def __init__(self, velocidad=VELOCIDAD, escala=1.0):
+        self.velocidad = velocidad
+        self.escala    = escala
+        self.t_vuelo   = 0.0    # s de vuelo desde la primera fila
+        self.filas     = 0
+        self.retrasos  = HistogramaLatencia(ventana=N_RETRASOS)
+        self._t0       = None
+        self._ts_previo = None
+        self._t_ultima  = None
+
+    def esperar(self, ts):
+        """Duerme hasta el instante de la fila con timestamp `ts` (None = sin timestamp)."""
+        if self._t0 is None:
+            self._t0 = time.monotonic()
+        else:
+            paso = PASO_DEFECTO
+            if ts is not None and self._ts_previo is not None and ts >= self._ts_previo:
+                paso = min((ts - self._ts_previo) / self.escala, MAX_HUECO)
+            self.t_vuelo += paso
+        if ts is not None:
+            self._ts_previo = ts
+        objetivo = self._t0 + self.t_vuelo / self.velocidad
+        espera = objetivo - time.monotonic()
+        if espera > 0:
+            time.sleep(espera)
+
+    def enviada(self):
+        """Anota la fila como enviada y su retraso respecto al objetivo."""
+        self._t_ultima = time.monotonic()
+        objetivo = self._t0 + self.t_vuelo / self.velocidad
+        self.retrasos.observar(max(0.0, self._t_ultima - objetivo))
+        self.filas += 1
+
+    def resumen(self):
+        if self.filas < 2:
+            return f"{self.filas} filas"
+        real     = (self.filas - 1) / max(self._t_ultima - self._t0, 1e-9)
+        objetivo = (self.filas - 1) / max(self.t_vuelo / self.velocidad, 1e-9)
+        p = self.retrasos.percentiles()
+        return (f"{real:.1f} filas/s (objetivo {objetivo:.1f}, {real / objetivo:.0%})  "
+                f"retraso p50 {p[0.5] * 1000:.0f} ms  p90 {p[0.9] * 1000:.0f} ms  "
+                f"p99 {p[0.99] * 1000:.0f} ms  máx {self.retrasos.maximo * 1000:.0f} ms")
+
 def construir_payload(fila):
     """
     Construye el payload para Firebase con los mismos nombres que el CSV.
@@ -85,14 +248,51 @@ def construir_payload(fila):
             payload[campo] = str(valor).strip()
     return payload
 
-def ejecutar_mision():
+def ejecutar_mision(reanudar=REANUDAR, buscar=BUSCAR):
     archivo, ruta = detectar_fichero()
+    punto = PuntoControl.cargar() if reanudar else None
+    if reanudar and punto is None:
+        print("❌ No hay punto de control del que reanudar.")
+        return
+    if reanudar and buscar:
+        print("❌ --resume y --seek no se pueden usar a la vez.")
+        return
+    if punto is not None and os.path.exists(punto.archivo):
+        archivo, ruta = punto.archivo, punto.ruta
 
     if not archivo:
         print("❌ No se detectó ningún archivo CSV.")
         print("   Sube 'datos_SD.csv', 'datos_radio.csv' o 'datos_simulacion.csv'")
         return
 
+    try:
+        busqueda = interpretar_busqueda(buscar) if buscar else None
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    # La huella (SHA-1 de todo el CSV) solo se calcula aquí si hace falta para validar
+    # el punto de control o el índice; si no, la calcula el hilo del índice
+    huella = huella_fichero(archivo) if punto is not None or busqueda is not None else None
+    if punto is not None and punto.huella != huella:
+        print(f"❌ {archivo} ha cambiado desde el punto de control ({punto.archivo}); no se puede reanudar.")
+        return
+
+    # El índice se espera solo si hace falta para saltar; si no, va en segundo plano
+    indice = IndiceFilas(archivo, huella)
+    inicio = 0
+    if punto is not None:
+        inicio = punto.fila + 1
+    elif busqueda is not None:
+        inicio = buscar_fila(archivo, indice.construir(), *busqueda)
+        if inicio is None:
+            print(f"❌ Ninguna fila cumple {buscar} en {archivo}.")
+            return
+    if inicio:
+        indice.esperar()
+    else:
+        indice.iniciar()
+
     modo = ruta.split('/')[-1].upper()
     print(f"\n{'═'*55}")
     print(f"   🚀 CANSAT CAELUM — PLAYBACK v2")
@@ -100,49 +300,107 @@ def ejecutar_mision():
     print(f"   Modo:    {modo}")
     print(f"   Archivo: {archivo}")
     print(f"   Ruta FB: {ruta}")
-    print(f"   Vel.:    {VELOCIDAD}s por muestra")
+    print(f"   Vel.:    {VELOCIDAD:g}× el tiempo real del vuelo")
+    if punto is not None:
+        print(f"   Inicio:  fila {inicio + 1} (reanudando, último timestamp confirmado {punto.timestamp})")
+    elif busqueda is not None:
+        print(f"   Inicio:  fila {inicio + 1} ({buscar})")
     print(f"{'═'*55}\n")
 
-    limpiar_firebase(ruta)
+    cliente = ClienteFirebase(FIREBASE_URL, timeout=10)
+    if punto is None:
+        limpiar_firebase(cliente, ruta)
+        punto = PuntoControl(archivo, huella, ruta, VELOCIDAD, fila=inicio - 1)
+    else:
+        print("♻️  Reanudando: no se limpia Firebase.")
+
+    print(f"📂 Leyendo {archivo} en streaming. Iniciando envío...\n")
 
-    with open(archivo, 'r', encoding='utf-8') as f:
-        lector = csv.DictReader(f)
-        filas  = list(lector)
+    subidor = SubidorLotes(cliente, ruta, timeout=10, en_vuelo=EN_VUELO,
+                           al_confirmar=punto.al_confirmar).iniciar()
+    punto.subidor = subidor
 
-    total = len(filas)
-    print(f"📂 {total} filas cargadas. Iniciando envío...\n")
+    byte, fila_bloque = indice.bloque_de_fila(inicio) if inicio else (None, 0)
+    filas    = leer_filas(archivo, byte, inicio - fila_bloque)
+    primeras = list(islice(filas, MUESTRA_ESCALA))
+    plan     = Planificador(VELOCIDAD, detectar_escala(primeras))
+    t_print, fase_previa = 0.0, None
+    t_punto = time.monotonic()
 
-    for i, fila in enumerate(filas):
-        payload = construir_payload(fila)
+    interrumpido = False
+    try:
+        for i, fila in enumerate(chain(primeras, filas), inicio):
+            payload = construir_payload(fila)
+            plan.esperar(leer_timestamp(fila))
 
-        try:
-            # PUT con timestamp como clave → sobrescribe el último dato (el dashboard
-            # usa limitToLast(1), así que siempre muestra el dato más reciente)
-            ts  = int(payload.get('timestamp', i))
-            url = f"{FIREBASE_URL}{ruta}/{ts}.json"
-            r   = requests.put(url, json=payload, timeout=10)
+            # Clave = timestamp → el dashboard usa limitToLast(1), así que
+            # siempre muestra el dato más reciente
+            punto.anotar(i, payload.get('timestamp'))
+            subidor.ofrecer(payload, clave=str(int(payload.get('timestamp', i))),
+                            bloquear=True, marca=i)
+            plan.enviada()
 
-            alt  = payload.get('alt',  0)
+            ahora = time.monotonic()
+            if ahora - t_punto >= GUARDAR_CADA:
+                punto.huella = punto.huella or indice.huella   # None hasta que el hilo la calcule
+                punto.guardar()
+                t_punto = ahora
+
+            # A mucha velocidad una línea por fila satura la consola (Colab)
             fase = payload.get('fase', '—')
+            if ahora - t_print < IMPRIMIR_CADA and fase == fase_previa:
+                continue
+            t_print, fase_previa = ahora, fase
+
+            alt  = payload.get('alt',  0)
             co2  = payload.get('co2',  0)
             pm25 = payload.get('pm2_5', 0)
             t_hs = payload.get('temp_hs', 0)
             t_sc = payload.get('temp_scd', 0)
 
-            status = "✅" if r.status_code == 200 else f"⚠️ {r.status_code}"
-            print(f"[{i+1:>3}/{total}] {status}  Alt={alt:>6.1f}m  "
+            status = "📤" if subidor.errores == 0 else f"⚠️ {subidor.errores} err"
+            print(f"[{i+1:>3}/{indice.texto()}] {status}  Alt={alt:>6.1f}m  "
                   f"Fase={fase:<12}  CO₂={co2:>4.0f}ppm  "
                   f"PM2.5={pm25:>5.1f}  T_HS={t_hs:.1f}°C  T_SCD={t_sc:.1f}°C")
+    except KeyboardInterrupt:
+        interrumpido = True
+        print("\n⏸️  Interrumpido: subiendo lo que ya estaba en cola...")
 
-        except Exception as e:
-            print(f"[{i+1:>3}/{total}] ⚠️  Error de conexión: {e}")
+    subidor.detener(espera=15 if interrumpido else None)
+    if subidor.ultimo_error is not None:
+        print(f"⚠️  Último error de conexión: {subidor.ultimo_error}")
 
-        time.sleep(VELOCIDAD)
+    # Completo y sin errores → no queda nada que reanudar
+    if interrumpido or subidor.errores:
+        punto.huella = punto.huella or indice.esperar().huella
+        punto.guardar(forzar=True)
+        print(f"💾 Punto de control: fila {punto.fila + 1} confirmada (timestamp {punto.timestamp}) "
+              f"→ python caelum_playback.py --resume")
+    else:
+        punto.borrar()
 
     print(f"\n{'═'*55}")
-    print(f"   ✅ PLAYBACK COMPLETADO — {total} muestras enviadas")
+    titulo = "⏸️  PLAYBACK INTERRUMPIDO" if interrumpido else "✅ PLAYBACK COMPLETADO"
+    print(f"   {titulo} — {subidor.enviados}/{plan.filas} muestras enviadas"
+          + (f" (desde la fila {inicio + 1})" if inicio else ""))
+    print(f"   Ritmo:  {plan.resumen()}")
+    print(f"   Subida: {subidor.resumen()}")
+    print(f"   Sostenido: {subidor.ritmo():.1f} filas/s confirmadas por Firebase")
+    print(f"   HTTP:   {cliente.resumen()}")
     print(f"   Ruta Firebase: {ruta}")
     print(f"{'═'*55}\n")
 
+def main():
+    args = sys.argv[1:]
+    reanudar = REANUDAR or "--resume" in args
+    buscar = BUSCAR
+    if "--seek" in args:
+        k = args.index("--seek")
+        if k + 1 >= len(args):
+            print("Uso: python caelum_playback.py [--resume | --seek ts=<timestamp> | --seek alt=<metros>]")
+            sys.exit(1)
+        buscar = args[k + 1]
+    ejecutar_mision(reanudar, buscar)
+
 if __name__ == "__main__":
-    ejecutar_mision()
+    main()
@@ -0,0 +1,127 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# MÓDULO:   Cliente HTTP de Firebase con conexiones reutilizadas
+# OBJETIVO: Que TODO el tráfico con Firebase pase por una única requests.Session
+#           con pool de conexiones keep-alive. Así cada petición cuesta un RTT y
+#           no una conexión TCP + handshake TLS nuevos.
+#
+#   - Pool de TAM_POOL conexiones (una por hilo que hable con Firebase)
+#   - Reintentos con espera exponencial + jitter ante 5xx, timeouts y cortes
+#   - Latencia de cada petición medida (media, p50, p99, máx.)
+#
+# Usado por receptor_telemetria.py, caelum_playback.py, 🐍_limpiar_firebase.py
+# y los módulos subida_lotes.py, cola_reenvio.py y purga_firebase.py
+# ===========================================================================================
+
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# === CONFIGURACIÓN POR DEFECTO ===
+TAM_POOL     = 8      # conexiones keep-alive simultáneas
+REINTENTOS   = 3      # reintentos tras el primer intento fallido
+ESPERA_BASE  = 0.25   # segundos — espera del primer reintento (se dobla en cada uno)
+ESPERA_MAX   = 5.0    # segundos — tope de la espera entre reintentos
+TIMEOUT      = 8      # segundos por intento
+N_LATENCIAS  = 2000   # latencias recientes guardadas para los percentiles
+
+
+class ClienteFirebase:
+    """
+    Cliente REST de Firebase Realtime Database sobre una requests.Session.
+    Las rutas son relativas a url_base y sin '.json': cliente.patch('/cansat/telemetria', {...})
+    """
+    def __init__(self, url_base, tam_pool=TAM_POOL, reintentos=REINTENTOS,
+                 espera_base=ESPERA_BASE, espera_max=ESPERA_MAX, timeout=TIMEOUT):
+        self.url_base    = url_base.rstrip('/')
+        self.reintentos  = reintentos
+        self.espera_base = espera_base
+        self.espera_max  = espera_max
+        self.timeout     = timeout
+
+        self.sesion = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=tam_pool, max_retries=0)
+        self.sesion.mount('https://', adaptador)
+        self.sesion.mount('http://', adaptador)
+
+        # Estadísticas
+        self._lock        = threading.Lock()
+        self.peticiones   = 0   # peticiones completadas (con o sin éxito)
+        self.reintentadas = 0   # intentos repetidos
+        self.fallidas     = 0   # peticiones que agotaron los reintentos
+        self._latencias   = deque(maxlen=N_LATENCIAS)
+
+    def url(self, ruta):
+        return f"{self.url_base}{ruta}.json"
+
+    def _espera(self, intento):
+        """Retroceso exponencial con jitter completo: U(0, min(máx, base·2^n))."""
+        return random.uniform(0, min(self.espera_max, self.espera_base * 2 ** intento))
+
+    def peticion(self, metodo, ruta, json=None, params=None, timeout=None):
+        """
+        Hace la petición reintentando ante 5xx, timeouts y errores de conexión.
+        Devuelve la última respuesta (aunque sea 5xx) o lanza la última excepción.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        intento = 0
+        while True:
+            t0 = time.perf_counter()
+            try:
+                r = self.sesion.request(metodo, self.url(ruta), json=json,
+                                        params=params, timeout=timeout)
+                error = None
+            except (requests.Timeout, requests.ConnectionError) as e:
+                r, error = None, e
+            dt = time.perf_counter() - t0
+
+            reintentable = error is not None or r.status_code >= 500
+            if not reintentable or intento >= self.reintentos:
+                with self._lock:
+                    self.peticiones += 1
+                    self._latencias.append(dt)
+                    if reintentable:
+                        self.fallidas += 1
+                if error is not None:
+                    raise error
+                return r
+
+            with self._lock:
+                self.reintentadas += 1
+            time.sleep(self._espera(intento))
+            intento += 1
+
+    def get(self, ruta, **kw):
+        return self.peticion('GET', ruta, **kw)
+
+    def put(self, ruta, datos, **kw):
+        return self.peticion('PUT', ruta, json=datos, **kw)
+
+    def patch(self, ruta, datos, **kw):
+        return self.peticion('PATCH', ruta, json=datos, **kw)
+
+    def delete(self, ruta, **kw):
+        return self.peticion('DELETE', ruta, **kw)
+
+    def percentil(self, p):
+        """Percentil p (0–100) de la latencia del último intento, en segundos."""
+        with self._lock:
+            datos = sorted(self._latencias)
+        if not datos:
+            return 0.0
+        return datos[min(len(datos) - 1, int(p / 100 * len(datos)))]
+
+    def resumen(self):
+        with self._lock:
+            datos = list(self._latencias)
+        media = 1000 * sum(datos) / len(datos) if datos else 0.0
+        return (f"{self.peticiones} peticiones  reintentos: {self.reintentadas}  "
+                f"fallidas: {self.fallidas}  latencia media {media:.0f} ms  "
+                f"p50 {1000 * self.percentil(50):.0f} ms  p99 {1000 * self.percentil(99):.0f} ms")
+
+    def cerrar(self):
+        self.sesion.close()
@@ -0,0 +1,226 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# MÓDULO:   Cola de reenvío en disco (spool) para cortes de Firebase
+# OBJETIVO: Que ningún paquete se pierda si Firebase no responde. Los lotes que
+#           fallan se añaden a un fichero (solo se escribe al final) y un hilo
+#           aparte los reenvía EN ORDEN, por lotes, cuando vuelve la conexión.
+#
+# FICHEROS:
+#   reenvio_<ruta>.jsonl      → una línea JSON por paquete: {"k": clave, "v": payload}
+#   reenvio_<ruta>.jsonl.pos  → byte hasta el que Firebase ya confirmó
+#   Cuando la cola queda vacía, el fichero se trunca a 0.
+#
+# El reenvío va en su propio hilo y su propia petición HTTP, así que no frena
+# la subida en directo. Las claves son timestamps: un paquete antiguo reenviado
+# nunca pasa a ser el "último" del dashboard (orderByKey + limitToLast(1)).
+#
+# Usado por receptor_telemetria.py (a través de SubidorLotes)
+# ===========================================================================================
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from subida_lotes import enviar_lote, TIMEOUT
+
+# === CONFIGURACIÓN POR DEFECTO ===
+MAX_LOTE_REENVIO = 200    # paquetes por PATCH de reenvío
+REINTENTO        = 2.0    # segundos de espera tras el primer fallo
+REINTENTO_MAX    = 30.0   # espera máxima entre reintentos (se dobla en cada fallo)
+VENTANA_RITMO    = 10.0   # segundos para calcular el ritmo de vaciado
+
+
+def archivo_para_ruta(ruta, carpeta='.'):
+    """Nombre del fichero de reenvío para una ruta Firebase (/cansat/telemetria → reenvio_cansat_telemetria.jsonl)."""
+    return os.path.join(carpeta, f"reenvio_{ruta.strip('/').replace('/', '_')}.jsonl")
+
+
+class ColaReenvio:
+    """
+    Spool en disco de paquetes no confirmados por Firebase + hilo de reenvío.
+    guardar() es seguro desde cualquier hilo.
+    """
+    def __init__(self, cliente, ruta, archivo=None, max_lote=MAX_LOTE_REENVIO,
+                 reintento=REINTENTO, reintento_max=REINTENTO_MAX, timeout=TIMEOUT):
+        self.cliente       = cliente
+        self.ruta          = ruta
+        self.archivo       = archivo or archivo_para_ruta(ruta)
+        self.max_lote      = max_lote
+        self.reintento     = reintento
+        self.reintento_max = reintento_max
+        self.timeout       = timeout
+
+        self._lock      = threading.Lock()
+        self._despertar = threading.Event()
+        self._parar     = threading.Event()
+        self._archivo_pos = self.archivo + '.pos'
+
+        # Estadísticas
+        self.guardados    = 0   # paquetes añadidos en esta sesión
+        self.reenviados   = 0   # paquetes confirmados por Firebase desde la cola
+        self.fallos       = 0   # PATCH de reenvío fallidos
+        self.ultimo_error = None
+        self._historial   = deque()   # (instante, paquetes) de cada reenvío correcto
+
+        self._f = open(self.archivo, 'ab')
+        self._offset = self._leer_pos()
+        self._reparar_cola()
+        self._tam = os.path.getsize(self.archivo)   # tamaño actual del fichero
+        self.pendientes = self._contar_pendientes()
+
+        self._hilo = threading.Thread(target=self._bucle, name="reenvio", daemon=True)
+
+    # ── Estado en disco ─────────────────────────────────────────────
+    def _leer_pos(self):
+        try:
+            with open(self._archivo_pos, 'r') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _escribir_pos(self):
+        tmp = self._archivo_pos + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(str(self._offset))
+        os.replace(tmp, self._archivo_pos)
+
+    def _reparar_cola(self):
+        """Corta una última línea a medias (corte de luz mientras se escribía)."""
+        tam = os.path.getsize(self.archivo)
+        if self._offset > tam:
+            self._offset = 0
+        if tam == 0:
+            return
+        with open(self.archivo, 'rb') as f:
+            f.seek(max(0, tam - 65536))
+            cola = f.read()
+        if not cola.endswith(b'\n'):
+            corte = tam - len(cola) + cola.rfind(b'\n') + 1
+            self._f.truncate(max(corte, 0))
+
+    def _contar_pendientes(self):
+        with open(self.archivo, 'rb') as f:
+            f.seek(self._offset)
+            return sum(1 for _ in f)
+
+    # ── API ─────────────────────────────────────────────────────────
+    def iniciar(self):
+        self._hilo.start()
+        return self
+
+    def guardar(self, lote):
+        """Añade al final de la cola un dict {clave: payload}."""
+        if not lote:
+            return
+        datos = b''.join(
+            json.dumps({'k': k, 'v': v}, separators=(',', ':')).encode('utf-8') + b'\n'
+            for k, v in lote.items())
+        with self._lock:
+            if self._f.closed:
+                return
+            self._f.write(datos)
+            self._f.flush()
+            self._tam += len(datos)
+            self.pendientes += len(lote)
+            self.guardados  += len(lote)
+        self._despertar.set()
+
+    def descartar(self):
+        """Vacía la cola sin reenviar (p. ej. tras limpiar la ruta en Firebase)."""
+        with self._lock:
+            self._f.truncate(0)
+            self._tam = 0
+            self._offset = 0
+            self.pendientes = 0
+            self._escribir_pos()
+
+    def tamano_bytes(self):
+        with self._lock:
+            return max(0, self._tam - self._offset)
+
+    def ritmo(self):
+        """Paquetes/s reenviados en los últimos VENTANA_RITMO segundos."""
+        ahora = time.monotonic()
+        while self._historial and ahora - self._historial[0][0] > VENTANA_RITMO:
+            self._historial.popleft()
+        if not self._historial:
+            return 0.0
+        return sum(n for _, n in self._historial) / VENTANA_RITMO
+
+    def detener(self, espera=5):
+        self._parar.set()
+        self._despertar.set()
+        self._hilo.join(espera)
+        with self._lock:
+            self._f.close()
+
+    def resumen(self):
+        return (f"{self.pendientes} pendientes ({self.tamano_bytes() / 1024:.1f} KB)  "
+                f"reenviados: {self.reenviados}  ritmo: {self.ritmo():.1f} paq/s  "
+                f"guardados: {self.guardados}")
+
+    # ── Reenvío ─────────────────────────────────────────────────────
+    def _leer_bloque(self):
+        """Lee hasta max_lote paquetes desde el offset. Devuelve (lote, n, nuevo_offset)."""
+        with self._lock:
+            inicio = self._offset
+            fin    = self._tam
+        lote, n, pos = {}, 0, inicio
+        with open(self.archivo, 'rb') as f:
+            f.seek(inicio)
+            while n < self.max_lote and pos < fin:
+                linea = f.readline()
+                if not linea.endswith(b'\n'):
+                    break
+                pos += len(linea)
+                n += 1
+                try:
+                    registro = json.loads(linea)
+                    lote[registro['k']] = registro['v']
+                except (ValueError, KeyError):
+                    pass   # línea corrupta: se salta
+        return lote, n, pos
+
+    def _confirmar(self, nuevo_offset, n):
+        with self._lock:
+            self._offset = nuevo_offset
+            self.pendientes = max(0, self.pendientes - n)
+            if self._offset >= self._tam:
+                # Cola vacía → compactar
+                self._f.truncate(0)
+                self._tam = 0
+                self._offset = 0
+            self._escribir_pos()
+
+    def _bucle(self):
+        espera = self.reintento
+        while not self._parar.is_set():
+            if self.pendientes == 0:
+                self._despertar.wait(1.0)
+                self._despertar.clear()
+                continue
+
+            lote, n, nuevo_offset = self._leer_bloque()
+            if n == 0:
+                self._despertar.wait(0.5)
+                self._despertar.clear()
+                continue
+
+            try:
+                ok = not lote or enviar_lote(self.cliente, self.ruta, lote, self.timeout)
+            except Exception as e:
+                ok = False
+                self.ultimo_error = e
+
+            if ok:
+                self._confirmar(nuevo_offset, n)
+                self.reenviados += n
+                self._historial.append((time.monotonic(), n))
+                espera = self.reintento
+            else:
+                # Sin conexión: esperar con retroceso exponencial
+                self.fallos += 1
+                self._parar.wait(espera)
+                espera = min(espera * 2, self.reintento_max)
@@ -0,0 +1,97 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# MÓDULO:   Control adaptativo del ritmo de subida a Firebase
+# OBJETIVO: Con una conexión lenta (datos móviles) la cola de subida crece sin
+#           límite y el dashboard se queda minutos por detrás. Este control
+#           vigila la cola y el retraso de las confirmaciones y, si hay presión,
+#           "aclara" la subida:
+#
+#   MODO NORMAL  → se sube todo
+#   MODO ACLARADO → solo sube
+#       - un fotograma clave cada INTERVALO_CLAVE segundos
+#       - todo cambio de fase (caida_libre → apertura...)
+#       - el ÚLTIMO estado, que SubidorLotes añade a cada lote que envía
+#         (así el dashboard, con limitToLast(1), nunca va más atrasado que
+#          un lote aunque haya cola)
+#
+# Entrada y salida con histéresis para no oscilar:
+#   entra si cola ≥ COLA_ALTA  o  retraso ≥ RETRASO_ALTO
+#   sale  si cola ≤ COLA_BAJA  y  retraso ≤ RETRASO_BAJO
+# donde retraso = media móvil de lo que espera un paquete desde que se encola
+# hasta que Firebase confirma su lote.
+#
+# El CSV local NO pasa por aquí: siempre se guarda todo.
+# Usado por receptor_telemetria.py (a través de SubidorLotes)
+# ===========================================================================================
+
+import time
+
+# === CONFIGURACIÓN POR DEFECTO ===
+COLA_ALTA       = 100    # paquetes en cola (2 lotes de 50) → empezar a aclarar
+COLA_BAJA       = 10
+RETRASO_ALTO    = 3.0    # segundos desde encolar hasta confirmación
+RETRASO_BAJO    = 1.0
+INTERVALO_CLAVE = 2.0    # segundos entre fotogramas clave en modo aclarado
+SUAVIZADO       = 0.3    # peso de la última medida en la media móvil del retraso
+
+
+class ControlSubida:
+    """Decide, paquete a paquete, si se encola para Firebase o solo se guarda como último estado."""
+
+    def __init__(self, cola_alta=COLA_ALTA, cola_baja=COLA_BAJA, retraso_alto=RETRASO_ALTO,
+                 retraso_bajo=RETRASO_BAJO, intervalo_clave=INTERVALO_CLAVE,
+                 campo_fase='fase'):
+        self.cola_alta       = cola_alta
+        self.cola_baja       = cola_baja
+        self.retraso_alto    = retraso_alto
+        self.retraso_bajo    = retraso_bajo
+        self.intervalo_clave = intervalo_clave
+        self.campo_fase      = campo_fase
+
+        self.activo   = False
+        self.retraso  = 0.0     # media móvil (s)
+        self._t_clave = None
+        self._fase    = None
+
+        # Estadísticas
+        self.activaciones = 0
+        self.claves       = 0   # fotogramas clave enviados en modo aclarado
+        self.t_activo     = 0.0
+        self._t_entrada   = None
+
+    def observar(self, retraso):
+        """Retraso (s) del paquete más antiguo de un lote recién confirmado o fallido."""
+        self.retraso += SUAVIZADO * (retraso - self.retraso)
+
+    def _actualizar(self, profundidad, ahora):
+        if not self.activo and (profundidad >= self.cola_alta or self.retraso >= self.retraso_alto):
+            self.activo = True
+            self.activaciones += 1
+            self._t_entrada = ahora
+            self._t_clave = None
+        elif self.activo and profundidad <= self.cola_baja and self.retraso <= self.retraso_bajo:
+            self.activo = False
+            self.t_activo += ahora - self._t_entrada
+
+    def admitir(self, payload, profundidad, ahora=None):
+        """True → encolar normalmente. False → solo como último estado."""
+        ahora = time.monotonic() if ahora is None else ahora
+        self._actualizar(profundidad, ahora)
+
+        fase = payload.get(self.campo_fase)
+        cambio_fase = fase != self._fase
+        self._fase = fase
+
+        if not self.activo:
+            return True
+        if cambio_fase or self._t_clave is None or ahora - self._t_clave >= self.intervalo_clave:
+            self._t_clave = ahora
+            self.claves += 1
+            return True
+        return False
+
+    def resumen(self):
+        t_activo = self.t_activo + (time.monotonic() - self._t_entrada if self.activo else 0.0)
+        return (f"aclarado {self.activaciones} veces ({t_activo:.0f} s)  "
+                f"fotogramas clave: {self.claves}  retraso medio {self.retraso:.1f} s"
+                + ("  [ACTIVO]" if self.activo else ""))
@@ -0,0 +1,256 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# MÓDULO:   Emulador local de Firebase Realtime Database (API REST)
+# OBJETIVO: Probar y medir la subida de telemetría sin tocar la base de datos real
+#           (cansat-66d98). Servidor HTTP en localhost con el subconjunto de la API
+#           REST que usan nuestras herramientas:
+#
+#   GET    {RUTA}.json                 → subárbol (null si no existe)
+#   GET    {RUTA}.json?shallow=true    → {clave: true | valor} del primer nivel
+#   PUT    {RUTA}.json   {...}         → sustituye el subárbol (null = borrar)
+#   PATCH  {RUTA}.json   {"a": .., "b/c": ..}  → multi-ruta (null = borrar esa clave)
+#   DELETE {RUTA}.json                 → borra el subárbol
+#
+# INYECCIÓN DE FALLOS (se puede cambiar en caliente, p. ej. para simular un corte):
+#   latencia    → segundos fijos de espera antes de responder
+#   jitter      → segundos aleatorios extra, U(0, jitter)
+#   tasa_error  → probabilidad (0–1) de responder `codigo_error` (503) sin aplicar nada
+#
+# USO:
+#   python emulador_firebase.py                     → http://127.0.0.1:9000
+#   python emulador_firebase.py 9000 0.05 0.02      → puerto, latencia (s), tasa de error
+#   y poner FIREBASE_URL = "http://127.0.0.1:9000" en el script a probar.
+#
+#   Desde Python (benchmark_firebase.py):
+#     emu = EmuladorFirebase(latencia=0.03).iniciar()
+#     cliente = ClienteFirebase(emu.url)
+#     ...
+#     emu.detener()
+# ===========================================================================================
+
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, unquote
+
+# === CONFIGURACIÓN POR DEFECTO ===
+HOST         = '127.0.0.1'
+PUERTO       = 9000
+CODIGO_ERROR = 503
+
+
+def _partes(ruta):
+    """'/cansat/telemetria/1712' → ['cansat', 'telemetria', '1712']"""
+    return [p for p in ruta.split('/') if p]
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, igual que Firebase
+    disable_nagle_algorithm = True  # cabecera y cuerpo van en escrituras separadas
+    emulador = None                 # lo asigna EmuladorFirebase
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, codigo, cuerpo):
+        datos = json.dumps(cuerpo, separators=(',', ':')).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _atender(self, metodo):
+        emu = self.emulador
+        partes_url = urlsplit(self.path)
+        ruta = unquote(partes_url.path)
+        params = parse_qs(partes_url.query)
+
+        longitud = int(self.headers.get('Content-Length') or 0)
+        crudo = self.rfile.read(longitud) if longitud else b''
+
+        with emu._lock:
+            emu.peticiones[metodo] += 1
+        emu._esperar()
+        if not ruta.endswith('.json'):
+            self._responder(400, {'error': 'La ruta debe terminar en .json'})
+            return
+        ruta = ruta[:-len('.json')]
+
+        if emu._toca_error():
+            self._responder(emu.codigo_error, {'error': 'Error inyectado por el emulador'})
+            return
+
+        try:
+            cuerpo = json.loads(crudo) if crudo else None
+        except ValueError:
+            self._responder(400, {'error': 'JSON no válido'})
+            return
+
+        if metodo == 'GET':
+            self._responder(200, emu.leer(ruta, shallow=params.get('shallow') == ['true']))
+        elif metodo == 'PUT':
+            emu.escribir(ruta, cuerpo)
+            self._responder(200, cuerpo)
+        elif metodo == 'PATCH':
+            if not isinstance(cuerpo, dict):
+                self._responder(400, {'error': 'PATCH necesita un objeto JSON'})
+                return
+            emu.actualizar(ruta, cuerpo)
+            self._responder(200, cuerpo)
+        elif metodo == 'DELETE':
+            emu.escribir(ruta, None)
+            self._responder(200, None)
+
+    def do_GET(self):
+        self._atender('GET')
+
+    def do_PUT(self):
+        self._atender('PUT')
+
+    def do_PATCH(self):
+        self._atender('PATCH')
+
+    def do_DELETE(self):
+        self._atender('DELETE')
+
+
+class EmuladorFirebase:
+    """
+    Base de datos en memoria (dicts anidados) servida por HTTP en un hilo.
+    `llegadas` guarda, si registrar=True, el instante time.perf_counter() en
+    que se escribió cada ruta hija (para medir latencias de extremo a extremo).
+    """
+    def __init__(self, puerto=0, latencia=0.0, jitter=0.0, tasa_error=0.0,
+                 codigo_error=CODIGO_ERROR, host=HOST, registrar=False):
+        self.latencia     = latencia
+        self.jitter       = jitter
+        self.tasa_error   = tasa_error
+        self.codigo_error = codigo_error
+        self.registrar    = registrar
+
+        self.datos    = {}
+        self.llegadas = {}
+        self._lock    = threading.Lock()
+
+        # Estadísticas
+        self.peticiones = Counter()   # peticiones HTTP recibidas, por método
+        self.errores_inyectados = 0
+
+        manejador = type('Manejador', (_Manejador,), {'emulador': self})
+        self._servidor = ThreadingHTTPServer((host, puerto), manejador)
+        self._servidor.daemon_threads = True
+        self._hilo = threading.Thread(target=self._servidor.serve_forever,
+                                      name="emulador_firebase", daemon=True)
+
+    @property
+    def url(self):
+        host, puerto = self._servidor.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def iniciar(self):
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    # ── Fallos inyectados ───────────────────────────────────────────
+    def _esperar(self):
+        espera = self.latencia + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if espera > 0:
+            time.sleep(espera)
+
+    def _toca_error(self):
+        if self.tasa_error and random.random() < self.tasa_error:
+            with self._lock:
+                self.errores_inyectados += 1
+            return True
+        return False
+
+    # ── Árbol de datos ──────────────────────────────────────────────
+    def leer(self, ruta, shallow=False):
+        with self._lock:
+            nodo = self.datos
+            for parte in _partes(ruta):
+                if not isinstance(nodo, dict) or parte not in nodo:
+                    return None
+                nodo = nodo[parte]
+            if nodo == {}:
+                return None
+            if shallow and isinstance(nodo, dict):
+                return {k: True if isinstance(v, dict) else v for k, v in nodo.items()}
+            return json.loads(json.dumps(nodo))   # copia: nadie toca el árbol desde fuera
+
+    def escribir(self, ruta, valor):
+        """PUT / DELETE: sustituye el subárbol de `ruta` (None lo borra)."""
+        with self._lock:
+            self._poner(_partes(ruta), valor)
+
+    def actualizar(self, ruta, hijos):
+        """PATCH multi-ruta: cada clave (puede llevar '/') se sustituye entera."""
+        base = _partes(ruta)
+        with self._lock:
+            for clave, valor in hijos.items():
+                self._poner(base + _partes(clave), valor)
+
+    def _poner(self, partes, valor):
+        if not partes:
+            self.datos = valor if isinstance(valor, dict) else {}
+            return
+        if valor is None:
+            self._borrar(partes)
+        else:
+            nodo = self.datos
+            for parte in partes[:-1]:
+                if not isinstance(nodo.get(parte), dict):
+                    nodo[parte] = {}
+                nodo = nodo[parte]
+            nodo[partes[-1]] = valor
+        if self.registrar and valor is not None:
+            self.llegadas['/' + '/'.join(partes)] = time.perf_counter()
+
+    def _borrar(self, partes):
+        """Borra y poda los padres que se quedan vacíos (como Firebase)."""
+        camino = [self.datos]
+        for parte in partes[:-1]:
+            siguiente = camino[-1].get(parte)
+            if not isinstance(siguiente, dict):
+                return
+            camino.append(siguiente)
+        camino[-1].pop(partes[-1], None)
+        for nodo, parte in zip(reversed(camino[:-1]), reversed(partes[:-1])):
+            if nodo[parte]:
+                break
+            del nodo[parte]
+
+    def contar(self, ruta):
+        """Nº de hijos directos de `ruta`."""
+        hijos = self.leer(ruta, shallow=True)
+        return len(hijos) if isinstance(hijos, dict) else 0
+
+    def resumen(self):
+        por_metodo = "  ".join(f"{m}: {n}" for m, n in sorted(self.peticiones.items()))
+        return f"{por_metodo}  errores inyectados: {self.errores_inyectados}"
+
+
+if __name__ == "__main__":
+    puerto     = int(sys.argv[1]) if len(sys.argv) > 1 else PUERTO
+    latencia   = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    tasa_error = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+
+    emu = EmuladorFirebase(puerto, latencia=latencia, tasa_error=tasa_error).iniciar()
+    print(f"🔥 Emulador Firebase en {emu.url}  (latencia {latencia * 1000:.0f} ms, "
+          f"errores {tasa_error:.0%})")
+    print("   Pon FIREBASE_URL = \"" + emu.url + "\" en el script a probar. Ctrl+C para salir.")
+    try:
+        while True:
+            time.sleep(5)
+    except KeyboardInterrupt:
+        emu.detener()
+        print(f"\n🛑 Emulador detenido. {emu.resumen()}")
@@ -0,0 +1,164 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# MÓDULO:   Fusión de varias antenas (APC220) en un único flujo de paquetes
+# OBJETIVO: Con dos o tres receptores en sitios distintos, el mismo paquete llega
+#           varias veces (o solo por una antena si las otras lo pierden). Aquí se
+#           juntan todas las copias y sale UN flujo sin duplicados y ordenado por
+#           num_paquete hacia el CSV y Firebase.
+#
+#   - Cada paquete espera VENTANA segundos desde su primera copia por si llegan
+#     otras (con una sola antena la ventana es 0 y no se añade retraso)
+#   - POLÍTICA "primera": se queda la primera copia que llegó
+#     POLÍTICA "mejor":   se queda la copia con más campos no vacíos
+#   - Un paquete se identifica por (num_paquete, timestamp): si el Arduino se
+#     reinicia y num_paquete vuelve a 0, no se confunde con los anteriores
+#   - Si un paquete llega cuando ya salieron otros posteriores, se emite igual
+#     (nunca se pierde un dato) y se cuenta como fuera de orden
+#
+# Sin cerrojos: los hilos lectores solo meten líneas en la cola compartida y la
+# fusión la hace un único hilo (el principal), dueño de todo este estado.
+#
+# Usado por receptor_telemetria.py
+# ===========================================================================================
+
+import heapq
+import time
+from collections import deque, Counter
+
+# === CONFIGURACIÓN POR DEFECTO ===
+VENTANA   = 0.3      # segundos esperando copias de otras antenas
+POLITICA  = "primera"
+RECORDAR  = 4096     # paquetes ya emitidos que se recuerdan para descartar copias tardías
+
+
+def calidad_linea(linea):
+    """Nº de campos no vacíos de la línea cruda (más = copia más completa)."""
+    return sum(1 for campo in linea.split(',') if campo.strip())
+
+
+class FusionAntenas:
+    """
+    Buffer de reordenación y deduplicación. entrar() y vencidos() devuelven
+    la lista de (t_rx, puerto, payload) listos para procesar, en orden.
+    """
+    def __init__(self, ventana=VENTANA, politica=POLITICA, recordar=RECORDAR):
+        if politica not in ("primera", "mejor"):
+            raise ValueError(f"Política de fusión desconocida: {politica}")
+        self.ventana  = ventana
+        self.politica = politica
+
+        self._pendientes = {}          # id → [limite, t_rx, puerto, payload, calidad]
+        self._orden      = []          # heap de (num_paquete, id)
+        self._emitidos   = set()       # ids ya emitidos (últimos `recordar`)
+        self._historial  = deque()
+        self._recordar   = recordar
+        self._ultimo_num = None
+
+        # Estadísticas por puerto (solo las toca el hilo que llama a entrar())
+        self.validas     = Counter()   # copias válidas recibidas
+        self.invalidas   = Counter()   # líneas que no se pudieron parsear
+        self.primeras    = Counter()   # copias elegidas (la que sale hacia CSV/Firebase)
+        self.duplicadas  = Counter()   # copias descartadas por repetidas
+        self.unicas      = Counter()   # paquetes que SOLO llegaron por ese puerto
+        self.fuera_orden = 0
+        self._puertos_de = {}          # id → set de puertos que lo han recibido
+
+    @staticmethod
+    def _id(payload):
+        return (int(payload.get('num_paquete', 0)), payload.get('timestamp'))
+
+    def invalida(self, puerto):
+        self.invalidas[puerto] += 1
+
+    def entrar(self, t_rx, puerto, payload, linea=None, ahora=None):
+        """Añade una copia recibida por `puerto`. Devuelve los paquetes listos."""
+        ahora = time.perf_counter() if ahora is None else ahora
+        self.validas[puerto] += 1
+        ident = self._id(payload)
+
+        if ident in self._emitidos:
+            self.duplicadas[puerto] += 1
+            self._anotar_puerto(ident, puerto)
+            return self.vencidos(ahora)
+
+        pendiente = self._pendientes.get(ident)
+        if pendiente is not None:
+            self.duplicadas[puerto] += 1
+            self._anotar_puerto(ident, puerto)
+            if self.politica == "mejor" and linea is not None:
+                calidad = calidad_linea(linea)
+                if calidad > pendiente[4]:
+                    pendiente[1:] = [t_rx, puerto, payload, calidad]
+            return self.vencidos(ahora)
+
+        calidad = calidad_linea(linea) if (self.politica == "mejor" and linea is not None) else 0
+        self._pendientes[ident] = [ahora + self.ventana, t_rx, puerto, payload, calidad]
+        self._puertos_de[ident] = {puerto}
+        heapq.heappush(self._orden, (ident[0], ident))
+        return self.vencidos(ahora)
+
+    def _anotar_puerto(self, ident, puerto):
+        puertos = self._puertos_de.get(ident)
+        if puertos is not None:
+            puertos.add(puerto)
+
+    def vencidos(self, ahora=None, todos=False):
+        """Saca, en orden de num_paquete, los paquetes cuya ventana ya terminó."""
+        ahora = time.perf_counter() if ahora is None else ahora
+        listos = []
+        while self._orden:
+            _, ident = self._orden[0]
+            limite, t_rx, puerto, payload, _ = self._pendientes[ident]
+            if not todos and limite > ahora:
+                break
+            heapq.heappop(self._orden)
+            del self._pendientes[ident]
+            listos.append((t_rx, puerto, payload))
+            self._emitir(ident, puerto)
+        return listos
+
+    def vaciar(self):
+        """Todo lo pendiente, sin esperar (al cerrar)."""
+        return self.vencidos(todos=True)
+
+    def _emitir(self, ident, puerto):
+        self.primeras[puerto] += 1
+        if self._ultimo_num is not None and ident[0] < self._ultimo_num:
+            self.fuera_orden += 1
+        self._ultimo_num = ident[0]
+
+        self._emitidos.add(ident)
+        self._historial.append(ident)
+        if len(self._historial) > self._recordar:
+            viejo = self._historial.popleft()
+            self._emitidos.discard(viejo)
+            puertos = self._puertos_de.pop(viejo, ())
+            if len(puertos) == 1:
+                self.unicas[next(iter(puertos))] += 1
+
+    @property
+    def pendientes(self):
+        return len(self._pendientes)
+
+    def por_puerto(self):
+        """{puerto: {validas, invalidas, elegidas, duplicadas, unicas}}"""
+        # `unicas` se termina de contar aquí para los paquetes aún recordados
+        unicas = Counter(self.unicas)
+        for puertos in self._puertos_de.values():
+            if len(puertos) == 1:
+                unicas[next(iter(puertos))] += 1
+        puertos = set(self.validas) | set(self.invalidas)
+        return {p: {'validas':    self.validas[p],
+                    'invalidas':  self.invalidas[p],
+                    'elegidas':   self.primeras[p],
+                    'duplicadas': self.duplicadas[p],
+                    'unicas':     unicas[p]}
+                for p in sorted(puertos)}
+
+    def resumen(self):
+        lineas = []
+        for puerto, e in self.por_puerto().items():
+            lineas.append(f"{puerto}: {e['validas']} válidas  elegidas: {e['elegidas']}  "
+                          f"duplicadas: {e['duplicadas']}  solo por esta antena: {e['unicas']}  "
+                          f"inválidas: {e['invalidas']}")
+        return lineas
@@ -0,0 +1,234 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# MÓDULO:   Índice de filas y punto de control del playback
+# OBJETIVO: Poder cortar un playback y seguir donde se quedó (sin volver a limpiar
+#           Firebase ni subirlo todo otra vez) y empezar desde un instante o una
+#           altitud concretos sin leer el CSV entero hasta allí.
+#
+# ÍNDICE  (<csv>.indice.json, se crea en la primera lectura, en un hilo aparte):
+#   cada CADA_INDICE filas → [fila, byte de inicio, timestamp, alt mín., alt máx.]
+#   del bloque que empieza ahí, más el total de filas y la huella del fichero.
+#   Para ir a una fila se salta al byte del bloque y se leen las que falten.
+#
+# PUNTO DE CONTROL (PUNTO_CONTROL, JSON pequeño escrito de forma atómica):
+#   { archivo, huella (SHA-1 del CSV), ruta Firebase, fila (última confirmada
+#     por Firebase, sin huecos), timestamp, velocidad, guardado }
+#   Solo vale para el mismo fichero (misma huella) y la misma ruta.
+#
+# Usado por caelum_playback.py
+# ===========================================================================================
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+# === CONFIGURACIÓN POR DEFECTO ===
+CADA_INDICE   = 1000                          # filas por bloque del índice
+PUNTO_CONTROL = "playback_punto_control.json"
+BLOQUE_HUELLA = 1 << 20                       # bytes por lectura al calcular la huella
+VERSION       = 1
+
+
+def huella_fichero(ruta):
+    """SHA-1 del contenido del fichero (identifica el CSV aunque cambie de nombre)."""
+    h = hashlib.sha1()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(BLOQUE_HUELLA), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _escribir_json(ruta, datos):
+    """Escritura atómica: un corte a mitad nunca deja el JSON a medias."""
+    tmp = ruta + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False)
+    os.replace(tmp, ruta)
+
+
+def _numero(campos, i):
+    try:
+        return float(campos[i])
+    except (IndexError, ValueError, TypeError):
+        return None
+
+
+# ============================================================================
+#  ÍNDICE DE FILAS
+# ============================================================================
+class IndiceFilas:
+    """
+    Índice ligero de un CSV de vuelo. construir() lo lee una vez en binario
+    (o lo carga de <csv>.indice.json si la huella coincide); iniciar() hace lo
+    mismo en un hilo aparte. `total` vale None hasta que termina. Sin huella,
+    construir() la calcula primero (así, con iniciar(), no frena el arranque).
+    """
+    def __init__(self, archivo, huella=None, cada=CADA_INDICE):
+        self.archivo = archivo
+        self.huella  = huella
+        self.cada    = cada
+        self.ruta    = archivo + ".indice.json"
+        self.total   = None
+        self.bloques = []        # [fila, byte, timestamp, alt_min, alt_max]
+        self.cargado = False     # True si venía de disco
+        self._hilo   = threading.Thread(target=self.construir, name="indice_filas", daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+        return self
+
+    def esperar(self):
+        if self._hilo.is_alive():
+            self._hilo.join()
+        elif self.total is None:
+            self.construir()
+        return self
+
+    def texto(self):
+        return "?" if self.total is None else str(self.total)
+
+    def construir(self):
+        if self.huella is None:
+            self.huella = huella_fichero(self.archivo)
+        if self._cargar():
+            return self
+        bloques, fila = [], 0
+        with open(self.archivo, 'rb') as f:
+            cabecera = f.readline()
+            columnas = [c.strip().lower() for c in cabecera.decode('utf-8').split(',')]
+            i_ts  = columnas.index('timestamp') if 'timestamp' in columnas else None
+            i_alt = columnas.index('alt') if 'alt' in columnas else None
+            byte  = len(cabecera)
+            for linea in f:
+                if linea.strip():
+                    campos = linea.split(b',')
+                    alt = None if i_alt is None else _numero(campos, i_alt)
+                    if fila % self.cada == 0:
+                        ts = None if i_ts is None else _numero(campos, i_ts)
+                        bloques.append([fila, byte, ts, alt, alt])
+                    elif alt is not None:
+                        bloque = bloques[-1]
+                        bloque[3] = alt if bloque[3] is None else min(bloque[3], alt)
+                        bloque[4] = alt if bloque[4] is None else max(bloque[4], alt)
+                    fila += 1
+                byte += len(linea)
+        self.bloques, self.total = bloques, fila
+        try:
+            _escribir_json(self.ruta, {'version': VERSION, 'huella': self.huella, 'cada': self.cada,
+                                       'filas': fila, 'bloques': bloques})
+        except OSError:
+            pass   # sin permiso de escritura: el índice sirve igual para esta vez
+        return self
+
+    def _cargar(self):
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if (datos.get('version') != VERSION or datos.get('huella') != self.huella
+                or datos.get('cada') != self.cada):
+            return False
+        self.bloques, self.total, self.cargado = datos['bloques'], datos['filas'], True
+        return True
+
+    # ── Búsquedas: devuelven (byte del bloque, fila del bloque) desde donde leer ──
+    def bloque_de_fila(self, fila):
+        """Último bloque que empieza en `fila` o antes."""
+        elegido = self.bloques[0] if self.bloques else [0, None]
+        for bloque in self.bloques:
+            if bloque[0] > fila:
+                break
+            elegido = bloque
+        return elegido[1], elegido[0]
+
+    def bloque_de_timestamp(self, ts):
+        """Último bloque cuyo primer timestamp es ≤ ts (el vuelo va en orden)."""
+        elegido = self.bloques[0] if self.bloques else [0, None]
+        for bloque in self.bloques:
+            if bloque[2] is not None and bloque[2] > ts:
+                break
+            elegido = bloque
+        return elegido[1], elegido[0]
+
+    def bloque_de_apogeo(self):
+        """Bloque con la altitud máxima: la bajada empieza en él."""
+        con_alt = [b for b in self.bloques if b[4] is not None]
+        if not con_alt:
+            return (self.bloques[0][1], 0) if self.bloques else (None, 0)
+        bloque = max(con_alt, key=lambda b: b[4])
+        return bloque[1], bloque[0]
+
+
+# ============================================================================
+#  PUNTO DE CONTROL
+# ============================================================================
+class PuntoControl:
+    """
+    Última fila confirmada por Firebase sin huecos delante. al_confirmar() va
+    como callback de SubidorLotes (marca = nº de fila); un lote fallido congela
+    el punto para que al reanudar se repita desde ahí.
+    """
+    def __init__(self, archivo, huella, ruta, velocidad, fila=-1, destino=PUNTO_CONTROL):
+        self.archivo   = archivo
+        self.huella    = huella
+        self.ruta      = ruta
+        self.velocidad = velocidad
+        self.fila      = fila
+        self.timestamp = None
+        self.destino   = destino
+        self.subidor   = None   # para saber si algún lote anterior falló
+        self._timestamps = {}   # fila → timestamp de las filas en vuelo
+        self._lock     = threading.Lock()
+        self._guardada = fila
+
+    @classmethod
+    def cargar(cls, destino=PUNTO_CONTROL):
+        """Lee el punto de control o devuelve None si no hay (o está roto)."""
+        try:
+            with open(destino, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            punto = cls(datos['archivo'], datos['huella'], datos['ruta'],
+                        datos.get('velocidad'), datos['fila'], destino)
+        except (OSError, ValueError, KeyError):
+            return None
+        punto.timestamp = datos.get('timestamp')
+        return punto
+
+    def anotar(self, fila, ts):
+        with self._lock:
+            self._timestamps[fila] = ts
+
+    def al_confirmar(self, marcas):
+        with self._lock:
+            if self.subidor is None or not self.subidor.errores:
+                for m in marcas:
+                    if m is not None and m > self.fila:
+                        self.fila = m
+                self.timestamp = self._timestamps.get(self.fila, self.timestamp)
+            for m in marcas:
+                self._timestamps.pop(m, None)
+
+    def guardar(self, forzar=False):
+        """
+        Escribe el JSON si la fila confirmada ha avanzado (o si se fuerza).
+        Sin huella todavía (la calcula el hilo del índice) solo se escribe si se fuerza.
+        """
+        with self._lock:
+            if (self.fila == self._guardada or self.huella is None) and not forzar:
+                return False
+            datos = {'archivo': self.archivo, 'huella': self.huella, 'ruta': self.ruta,
+                     'fila': self.fila, 'timestamp': self.timestamp,
+                     'velocidad': self.velocidad,
+                     'guardado': time.strftime('%Y-%m-%dT%H:%M:%S')}
+            self._guardada = self.fila
+        _escribir_json(self.destino, datos)
+        return True
+
+    def borrar(self):
+        try:
+            os.remove(self.destino)
+        except OSError:
+            pass
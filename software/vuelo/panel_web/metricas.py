@@ -0,0 +1,238 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# MÓDULO:   Métricas de latencia de la estación de tierra
+# OBJETIVO: Saber durante el descenso si el cuello de botella es la radio, el disco
+#           o la subida a Firebase. Cada paquete lleva el instante en que se leyó
+#           del puerto serie (t_rx) y en cada etapa se mide cuánto ha tardado:
+#
+#   rx_parseo    → lectura serie  → parseo terminado  (espera en la cola de líneas)
+#   rx_csv       → lectura serie  → fila escrita en el buffer del CSV
+#   rx_firebase  → lectura serie  → lote confirmado por Firebase (200)
+#   intervalo_rx → tiempo entre dos paquetes recibidos (ritmo de la radio)
+#
+# Cada histograma guarda:
+#   - cubetas acumuladas desde el arranque (formato histogram de Prometheus)
+#   - los últimos N_VENTANA valores para percentiles recientes (p50, p90, p99)
+#
+# EXPOSICIÓN:
+#   http://127.0.0.1:<puerto>/metrics   → texto Prometheus (ServidorMetricas)
+#   metricas_receptor.json              → resumen al cerrar (Metricas.guardar_json)
+#
+# Usado por receptor_telemetria.py
+# ===========================================================================================
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# === CONFIGURACIÓN POR DEFECTO ===
+# Límites de las cubetas en segundos: de 1 ms (parseo) a 30 s (Firebase con cortes)
+LIMITES   = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+             1.0, 2.5, 5.0, 10.0, 30.0)
+N_VENTANA = 1000          # valores recientes para los percentiles
+CUANTILES = (0.5, 0.9, 0.99)
+PREFIJO   = "caelum"
+
+
+class HistogramaLatencia:
+    """Histograma de cubetas fijas + ventana deslizante. observar() es seguro entre hilos."""
+
+    def __init__(self, limites=LIMITES, ventana=N_VENTANA):
+        self.limites  = tuple(limites)
+        self.cubetas  = [0] * (len(self.limites) + 1)   # la última es +Inf
+        self.total    = 0
+        self.suma     = 0.0
+        self.maximo   = 0.0
+        self._ventana = deque(maxlen=ventana)
+        self._lock    = threading.Lock()
+
+    def observar(self, segundos):
+        with self._lock:
+            self.cubetas[bisect_left(self.limites, segundos)] += 1
+            self.total += 1
+            self.suma  += segundos
+            if segundos > self.maximo:
+                self.maximo = segundos
+            self._ventana.append(segundos)
+
+    def observar_varios(self, valores):
+        for v in valores:
+            self.observar(v)
+
+    def percentiles(self, cuantiles=CUANTILES):
+        """Percentiles de la ventana reciente: {0.5: s, 0.9: s, 0.99: s}."""
+        with self._lock:
+            datos = sorted(self._ventana)
+        if not datos:
+            return {q: 0.0 for q in cuantiles}
+        return {q: datos[min(len(datos) - 1, int(q * len(datos)))] for q in cuantiles}
+
+    def acumuladas(self):
+        """[(límite, nº de valores ≤ límite)] incluyendo +Inf, como pide Prometheus."""
+        with self._lock:
+            cubetas = list(self.cubetas)
+        salida, acumulado = [], 0
+        for limite, n in zip(self.limites + (float('inf'),), cubetas):
+            acumulado += n
+            salida.append((limite, acumulado))
+        return salida
+
+    def resumen(self):
+        p = self.percentiles()
+        return {
+            'n':        self.total,
+            'media_ms': round(1000 * self.suma / self.total, 3) if self.total else 0.0,
+            'p50_ms':   round(1000 * p[0.5], 3),
+            'p90_ms':   round(1000 * p[0.9], 3),
+            'p99_ms':   round(1000 * p[0.99], 3),
+            'max_ms':   round(1000 * self.maximo, 3),
+        }
+
+
+def _numero(v):
+    if v == float('inf'):
+        return '+Inf'
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Metricas:
+    """
+    Registro de histogramas de latencia por etapa y de valores instantáneos
+    (profundidad de colas, contadores) que se leen con una función al exportar.
+    """
+    def __init__(self, etapas=('rx_parseo', 'rx_csv', 'rx_firebase', 'intervalo_rx')):
+        self.latencias  = {etapa: HistogramaLatencia() for etapa in etapas}
+        self._valores   = []   # (nombre, tipo, ayuda, funcion)
+        self._t_inicio  = time.time()
+        self._ultimo_rx = None
+
+    def observar(self, etapa, segundos):
+        self.latencias[etapa].observar(segundos)
+
+    def recibido(self, t_rx):
+        """Marca la llegada de un paquete por radio (para intervalo_rx).
+        Los paquetes de una misma lectura comparten t_rx y cuentan una vez."""
+        if t_rx == self._ultimo_rx:
+            return
+        if self._ultimo_rx is not None:
+            self.latencias['intervalo_rx'].observar(t_rx - self._ultimo_rx)
+        self._ultimo_rx = t_rx
+
+    def registrar(self, nombre, ayuda, funcion, tipo='gauge'):
+        """Añade un valor que se calcula al exportar (tipo 'gauge' o 'counter')."""
+        self._valores.append((nombre, tipo, ayuda, funcion))
+
+    # ── Exportación ─────────────────────────────────────────────────
+    def texto_prometheus(self):
+        lineas = []
+        nombre = f"{PREFIJO}_latencia_segundos"
+        lineas.append(f"# HELP {nombre} Latencia desde la lectura serie hasta cada etapa.")
+        lineas.append(f"# TYPE {nombre} histogram")
+        for etapa, h in self.latencias.items():
+            for limite, n in h.acumuladas():
+                lineas.append(f'{nombre}_bucket{{etapa="{etapa}",le="{_numero(limite)}"}} {n}')
+            lineas.append(f'{nombre}_sum{{etapa="{etapa}"}} {h.suma!r}')
+            lineas.append(f'{nombre}_count{{etapa="{etapa}"}} {h.total}')
+
+        nombre = f"{PREFIJO}_latencia_reciente_segundos"
+        lineas.append(f"# HELP {nombre} Percentiles de los últimos {N_VENTANA} paquetes.")
+        lineas.append(f"# TYPE {nombre} summary")
+        for etapa, h in self.latencias.items():
+            for q, v in h.percentiles().items():
+                lineas.append(f'{nombre}{{etapa="{etapa}",quantile="{q}"}} {v!r}')
+            lineas.append(f'{nombre}_sum{{etapa="{etapa}"}} {h.suma!r}')
+            lineas.append(f'{nombre}_count{{etapa="{etapa}"}} {h.total}')
+
+        for nombre, tipo, ayuda, funcion in self._valores:
+            try:
+                valor = funcion()
+            except Exception:
+                continue
+            nombre = f"{PREFIJO}_{nombre}"
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            lineas.append(f"{nombre} {_numero(valor)}")
+        return "\n".join(lineas) + "\n"
+
+    def resumen(self):
+        valores = {}
+        for nombre, _, _, funcion in self._valores:
+            try:
+                valores[nombre] = funcion()
+            except Exception:
+                valores[nombre] = None
+        return {
+            'inicio':    time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self._t_inicio)),
+            'duracion_s': round(time.time() - self._t_inicio, 1),
+            'latencias': {etapa: h.resumen() for etapa, h in self.latencias.items()},
+            'valores':   valores,
+        }
+
+    def guardar_json(self, ruta):
+        tmp = ruta + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.resumen(), f, indent=2, ensure_ascii=False)
+        os.replace(tmp, ruta)
+
+    def linea(self):
+        """Resumen de una línea para la consola: p50/p99 de cada etapa."""
+        partes = []
+        for etapa, h in self.latencias.items():
+            if h.total:
+                p = h.percentiles()
+                partes.append(f"{etapa} p50 {1000 * p[0.5]:.0f} ms / p99 {1000 * p[0.99]:.0f} ms")
+        return "  ".join(partes) or "sin datos"
+
+
+# ============================================================================
+#  ENDPOINT /metrics
+# ============================================================================
+class _Manejador(BaseHTTPRequestHandler):
+    metricas = None   # lo asigna ServidorMetricas
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] == '/metrics':
+            datos, tipo = self.metricas.texto_prometheus().encode('utf-8'), \
+                          'text/plain; version=0.0.4; charset=utf-8'
+        elif self.path.split('?')[0] == '/metrics.json':
+            datos, tipo = json.dumps(self.metricas.resumen(), ensure_ascii=False).encode('utf-8'), \
+                          'application/json; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+
+class ServidorMetricas:
+    """Servidor HTTP local (solo 127.0.0.1) que expone /metrics y /metrics.json."""
+
+    def __init__(self, metricas, puerto, host='127.0.0.1'):
+        manejador = type('Manejador', (_Manejador,), {'metricas': metricas})
+        self._servidor = ThreadingHTTPServer((host, puerto), manejador)
+        self._servidor.daemon_threads = True
+        self._hilo = threading.Thread(target=self._servidor.serve_forever,
+                                      name="metricas", daemon=True)
+
+    @property
+    def url(self):
+        host, puerto = self._servidor.server_address[:2]
+        return f"http://{host}:{puerto}/metrics"
+
+    def iniciar(self):
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
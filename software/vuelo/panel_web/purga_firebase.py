@@ -0,0 +1,78 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# MÓDULO:   Purga rápida de rutas Firebase
+# OBJETIVO: Borrar miles de entradas de /cansat/<ruta> en segundos en vez de
+#           minutos (antes: un DELETE secuencial por clave).
+#
+#   1. GET {RUTA}.json?shallow=true          → lista de claves
+#   2. Trocear en bloques de TAM_BLOQUE claves
+#   3. Cada bloque = UN PATCH {RUTA}.json con {"clave": null, ...}
+#      (null en un PATCH multi-ruta borra esa clave)
+#   4. Los bloques se envían en paralelo con HILOS peticiones simultáneas,
+#      reutilizando las conexiones del ClienteFirebase (cliente_firebase.py)
+#
+# Usado por receptor_telemetria.py, caelum_playback.py y 🐍_limpiar_firebase.py
+# ===========================================================================================
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# === CONFIGURACIÓN POR DEFECTO ===
+TAM_BLOQUE = 500   # claves por PATCH (el límite de tamaño de Firebase queda lejos)
+HILOS      = 4     # peticiones simultáneas
+TIMEOUT    = 10    # segundos por petición
+
+
+def _borrar_bloque(cliente, ruta, claves, timeout):
+    """Borra un bloque de claves con un único PATCH a null. Devuelve True si OK."""
+    r = cliente.patch(ruta, {clave: None for clave in claves}, timeout=timeout)
+    return r.status_code == 200
+
+
+def purgar(cliente, ruta, tam_bloque=TAM_BLOQUE, hilos=HILOS, timeout=TIMEOUT, mostrar=True):
+    """
+    Borra todas las entradas de `ruta`. Lanza excepción si no se puede leer la
+    lista de claves. Devuelve un resumen:
+      {'claves', 'borradas', 'fallidas', 'peticiones', 'segundos', 'ritmo'}
+    """
+    t0 = time.perf_counter()
+    r = cliente.get(ruta, params={'shallow': 'true'}, timeout=timeout)
+    claves = list(r.json() or {})
+    total  = len(claves)
+    resumen = {'claves': total, 'borradas': 0, 'fallidas': 0,
+               'peticiones': 0, 'segundos': 0.0, 'ritmo': 0.0}
+
+    if total == 0:
+        if mostrar:
+            print(f"🗑️  {ruta} ya estaba vacío")
+        return resumen
+
+    bloques = [claves[i:i + tam_bloque] for i in range(0, total, tam_bloque)]
+    if mostrar:
+        print(f"🗑️  Borrando {total} entradas en {ruta} "
+              f"({len(bloques)} bloques, {hilos} en paralelo)...")
+
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        futuros = {pool.submit(_borrar_bloque, cliente, ruta, b, timeout): len(b)
+                   for b in bloques}
+        for futuro in as_completed(futuros):
+            n = futuros[futuro]
+            resumen['peticiones'] += 1
+            try:
+                ok = futuro.result()
+            except Exception:
+                ok = False
+            resumen['borradas' if ok else 'fallidas'] += n
+            if mostrar and resumen['peticiones'] < len(bloques):
+                dt = time.perf_counter() - t0
+                print(f"   {resumen['borradas']}/{total} borradas... "
+                      f"({resumen['borradas'] / dt:.0f} claves/s)")
+
+    resumen['segundos'] = time.perf_counter() - t0
+    resumen['ritmo']    = resumen['borradas'] / resumen['segundos'] if resumen['segundos'] else 0.0
+    if mostrar:
+        print(f"🗑️  Limpieza completada: {resumen['borradas']}/{total} entradas borradas "
+              f"en {resumen['segundos']:.1f} s ({resumen['ritmo']:.0f} claves/s)")
+        if resumen['fallidas']:
+            print(f"⚠️  {resumen['fallidas']} entradas no se pudieron borrar")
+    return resumen
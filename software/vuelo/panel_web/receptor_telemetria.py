@@ -16,9 +16,46 @@
 #
 # NOTA: Los campos se envían a Firebase con los MISMOS nombres que el CSV.
 #       El dashboard los lee directamente sin renombrar.
+#
+# PIPELINE (hilos independientes unidos por colas acotadas):
+#   lector serie → cola_lineas → parseo → cola_csv → escritor CSV
+#                                       → cola_fb  → subida Firebase por lotes
+#   El lector nunca espera a Firebase: si la subida va lenta, la cola de
+#   Firebase se llena y se descartan paquetes de subida, nunca del CSV.
+#   La subida agrupa los paquetes pendientes en un PATCH multi-ruta
+#   (ver subida_lotes.py): máx. MAX_LOTE paquetes o MAX_LATENCIA segundos.
+#   Lo que Firebase no confirma va a una cola en disco (cola_reenvio.py) que
+#   se reenvía en orden, en segundo plano, cuando vuelve la conexión.
+#   El lector serie no usa readline(): lee de golpe lo que haya en el buffer
+#   del puerto y lo parte en tramas (../../comun/lector_tramas.py).
+#
+# MÉTRICAS (metricas.py): cada paquete lleva el instante de lectura serie y se
+#   mide la latencia hasta el parseo, la escritura CSV y la confirmación de
+#   Firebase. En vivo: http://127.0.0.1:METRICAS_PUERTO/metrics (Prometheus);
+#   al cerrar: resumen en ARCHIVO_METRICAS.
+#
+# VARIAS ANTENAS: con más de un puerto en PUERTOS_SERIAL, cada APC220 tiene su
+#   hilo lector y las copias del mismo paquete se fusionan por num_paquete
+#   (fusion_antenas.py): al CSV y a Firebase llega un solo flujo ordenado.
+#
+# PÉRDIDAS: la continuidad de num_paquete se sigue en vivo (huecos, duplicados,
+#   reordenados y % de pérdida por fase, ../../comun/perdidas_paquetes.py) y al
+#   cerrar se guarda junto al CSV: datos_radio_perdidas.json
+#
+# SUBIDA ADAPTATIVA (control_subida.py): si la cola de Firebase o el retraso de
+#   las confirmaciones crecen, solo se suben fotogramas clave + el último estado,
+#   para que el dashboard no se quede atrás. El CSV siempre guarda todo.
+#
+# FORMATO_RADIO = "binario": el Arduino envía tramas binarias de 70 bytes con
+#   CRC (../../comun/trama_binaria.py) en vez de líneas CSV de ~155 bytes. Cada
+#   trama se decodifica al mismo diccionario y el resto del pipeline no cambia.
+#
+# DIRECTO (servidor_directo.py): con DIRECTO_PUERTO cada paquete se emite también
+#   por la red local (Server-Sent Events) al dashboard en modo DIRECTO, sin pasar
+#   por Firebase: funciona sin internet y con latencia de milisegundos.
 # ============================================================================
 """
-import os, subprocess, sys, time, csv
+import os, subprocess, sys, time, threading, queue
 
 # Instalación automática de librerías
 for p in ["requests", "pyserial"]:
@@ -27,7 +64,24 @@ for p in ["requests", "pyserial"]:
     except ImportError:
         subprocess.check_call([sys.executable, "-m", "pip", "install", p])
 
-import serial, requests
+import serial
+
+from subida_lotes import SubidorLotes
+from sumidero_csv import SumideroCSV
+from cola_reenvio import ColaReenvio, archivo_para_ruta
+from purga_firebase import purgar
+from cliente_firebase import ClienteFirebase
+from metricas import Metricas, ServidorMetricas
+from fusion_antenas import FusionAntenas
+from control_subida import ControlSubida
+from servidor_directo import ServidorDirecto
+
+# Módulos compartidos con las herramientas post-vuelo (software/comun)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'comun'))
+from parser_telemetria import ParserTelemetria
+from lector_tramas import LectorTramas
+from perdidas_paquetes import ContadorPerdidas, archivo_perdidas
+from trama_binaria import LectorTramasBinarias, decodificar
 
 # ============================================================================
 #  CONFIGURACIÓN — ajustar antes de cada sesión
@@ -35,11 +89,63 @@ import serial, requests
 MODO          = "CONCURSO"   # "CONCURSO" o "PRUEBAS"
 PUERTO_SERIAL = 'COM3'       # Verificar en Administrador de dispositivos
 BAUDRATE      = 9600         # APC220 configurado a 9600
+FORMATO_RADIO = "csv"        # "csv" (líneas de texto) o "binario" (trama_binaria.py)
+
+# Varias antenas a la vez: p. ej. ['COM3', 'COM5', 'COM7']. Las copias de un
+# mismo paquete se esperan VENTANA_FUSION segundos y se queda una:
+# "primera" (la que antes llegó) o "mejor" (la más completa)
+PUERTOS_SERIAL   = [PUERTO_SERIAL]
+VENTANA_FUSION   = 0.3
+POLITICA_FUSION  = "primera"
 
 FIREBASE_URL = "https://cansat-66d98-default-rtdb.europe-west1.firebasedatabase.app"
 RUTA         = "/cansat/telemetria" if MODO == "CONCURSO" else "/cansat/pruebas"
 ARCHIVO_CSV  = "datos_radio.csv"
 
+# Vaciado del CSV local (ver sumidero_csv.py): cada N filas, cada T ms
+# y fsync al cambiar de fase
+CSV_CADA_FILAS = 20
+CSV_CADA_MS    = 500
+CSV_FSYNC_FASE = True
+
+# Copia columnar del CSV (../../comun/archivo_columnar.py, necesita NumPy):
+# datos_radio_columnas/ con un segmento .npz cada 5000 filas, que analizar_vuelo.py
+# y generar_kml.py cargan sin parsear texto
+GUARDAR_COLUMNAS = False
+
+# Tamaño máximo de cada cola del pipeline (paquetes)
+TAM_COLA = 2000
+
+# Lotes de subida a Firebase: se cierra el lote al llegar a MAX_LOTE paquetes
+# o cuando el primero lleva MAX_LATENCIA segundos esperando
+MAX_LOTE     = 50
+MAX_LATENCIA = 0.25
+
+# Reintentos HTTP de cada petición (cliente_firebase.py). Pocos: lo que falle
+# pasa a la cola de reenvío en vez de frenar la subida en directo
+FB_REINTENTOS = 1
+
+# Subida adaptativa: con cola ≥ ACLARAR_COLA paquetes o retraso de confirmación
+# ≥ ACLARAR_RETRASO s solo se sube un fotograma clave cada INTERVALO_CLAVE s
+# (más cada cambio de fase y el último estado). None = subir siempre todo
+ACLARAR_COLA     = 100
+ACLARAR_RETRASO  = 3.0
+INTERVALO_CLAVE  = 2.0
+
+# Cola de reenvío en disco para paquetes no confirmados por Firebase
+ARCHIVO_REENVIO = archivo_para_ruta(RUTA)   # reenvio_cansat_telemetria.jsonl
+
+# Métricas de latencia: endpoint Prometheus local (None = sin servidor)
+# y resumen JSON que se escribe al cerrar
+METRICAS_PUERTO  = 9108
+ARCHIVO_METRICAS = "metricas_receptor.json"
+
+# Emisión en directo por la red local para el dashboard (modo DIRECTO), sin
+# internet ni Firebase. None = desactivado; p. ej. 8765. DIRECTO_HOST = "127.0.0.1"
+# la limita a este PC
+DIRECTO_PUERTO = None
+DIRECTO_HOST   = "0.0.0.0"
+
 # Fases en las que se envía a Firebase — durante 'espera' no se envía
 # para no saturar Firebase antes del lanzamiento
 FASES_ACTIVAS = {'caida_libre', 'apertura', 'descenso', 'tierra'}
@@ -64,62 +170,128 @@ CAMPOS_FLOAT = {
 # ============================================================================
 #  PARSEO — por nombre de campo, no por índice
 # ============================================================================
+# Tablas de índices y conversores calculadas una sola vez (parser_telemetria.py)
+PARSER = ParserTelemetria(CABECERA, CAMPOS_FLOAT, min_campos=25)
+
 def parsear_linea(linea):
     """
     Convierte una línea CSV recibida por el APC220 en un diccionario
     usando la cabecera oficial. Robusto ante campos extra o faltantes.
-    Devuelve None si la línea no es válida.
+    Devuelve None si la línea no es válida (menos de 25 campos o cabecera).
     """
-    partes = linea.strip().split(',')
+    return PARSER.parsear(linea)
 
-    # Descartar líneas con menos de 23 campos (mínimo aceptable)
-    if len(partes) < 25:
-        return None
+# Con FORMATO_RADIO = "binario" cada elemento es una trama (bytes) ya
+# validada por CRC en LectorTramasBinarias
+LECTOR, PARSEAR = ((LectorTramasBinarias, decodificar) if FORMATO_RADIO == "binario"
+                   else (LectorTramas, parsear_linea))
 
-    # Ignorar la cabecera si el Arduino la reenvía
-    if partes[0].strip().lower() in ('timestamp', 'num_paquete'):
-        return None
+# ============================================================================
+#  PIPELINE — etapas con cola acotada y un hilo consumidor cada una
+# ============================================================================
+_FIN = object()   # marca de fin que se mete en la cola para parar el hilo
 
-    payload = {}
-    for i, campo in enumerate(CABECERA):
-        if i >= len(partes):
-            payload[campo] = 0.0 if campo in CAMPOS_FLOAT else ''
-            continue
-        valor = partes[i].strip()
-        if campo in CAMPOS_FLOAT:
+class Etapa:
+    """
+    Etapa del pipeline: una cola acotada y un hilo que aplica `funcion`
+    a cada elemento. `funcion` devuelve False (o lanza) si el elemento falló.
+    Si se da `al_esperar`, se llama cada `intervalo` segundos sin elementos
+    (p. ej. para vaciar buffers por tiempo).
+    """
+    def __init__(self, nombre, funcion, tam_cola=TAM_COLA, al_esperar=None, intervalo=0.1):
+        self.nombre      = nombre
+        self.funcion     = funcion
+        self.al_esperar  = al_esperar
+        self.intervalo   = intervalo
+        self.cola        = queue.Queue(maxsize=tam_cola)
+        self.procesados  = 0
+        self.errores     = 0
+        self.descartados = 0
+        self.ultimo_error = None
+        self._hilo = threading.Thread(target=self._bucle, name=nombre, daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+        return self
+
+    def ofrecer(self, elemento, bloquear=False):
+        """Mete un elemento en la cola. Sin bloquear, si está llena se descarta."""
+        try:
+            self.cola.put(elemento, block=bloquear)
+            return True
+        except queue.Full:
+            self.descartados += 1
+            return False
+
+    def profundidad(self):
+        return self.cola.qsize()
+
+    def _bucle(self):
+        while True:
             try:
-                payload[campo] = float(valor)
-            except ValueError:
-                payload[campo] = 0.0
-        else:
-            payload[campo] = valor
-
-    return payload
+                elemento = self.cola.get(timeout=self.intervalo if self.al_esperar else None)
+            except queue.Empty:
+                self.al_esperar()
+                continue
+            if elemento is _FIN:
+                break
+            try:
+                if self.funcion(elemento) is False:
+                    self.errores += 1
+            except Exception as e:
+                self.errores += 1
+                self.ultimo_error = e
+            self.procesados += 1
+
+    def detener(self, espera=None):
+        """Vacía lo pendiente y para el hilo (espera máx. `espera` segundos)."""
+        limite = None if espera is None else time.monotonic() + espera
+        try:
+            self.cola.put(_FIN, timeout=espera)
+        except queue.Full:
+            pass
+        self._hilo.join(None if limite is None else max(0, limite - time.monotonic()))
+        return not self._hilo.is_alive()
+
+
+def hilo_lector(puerto, tramas, destino, parar, errores):
+    """
+    Lee del puerto serie todo lo disponible (LECTOR) y pasa cada línea o
+    trama completa a `destino` como (t_rx, puerto, línea) sin bloquear nunca: la
+    única espera es la del propio puerto. Si la cola está llena la línea se
+    descarta (destino.descartados). Hay un hilo por antena; `errores[puerto]`
+    solo lo toca su hilo.
+    """
+    while not parar.is_set():
+        try:
+            lineas = tramas.leer()
+        except serial.SerialException as e:
+            errores[puerto] += 1
+            print(f"⚠️  Error leyendo {puerto}: {e}")
+            time.sleep(1)
+            continue
+        if not lineas:
+            continue
+        t_rx = time.perf_counter()
+        for linea in lineas:
+            if isinstance(linea, str):
+                linea = linea.strip()
+            if linea:
+                destino.ofrecer((t_rx, puerto, linea))
 
-# ============================================================================
-#  CSV LOCAL — escribe con la cabecera correcta
-# ============================================================================
-def escribir_csv(payload):
-    """Guarda la fila en el CSV local. Crea el archivo con cabecera si no existe."""
-    existe = os.path.exists(ARCHIVO_CSV) and os.path.getsize(ARCHIVO_CSV) > 0
-    with open(ARCHIVO_CSV, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=CABECERA, extrasaction='ignore')
-        if not existe:
-            writer.writeheader()
-        writer.writerow(payload)
 
-# ============================================================================
-#  FIREBASE — PUT con timestamp como clave
-# ============================================================================
-def enviar_firebase(payload):
+def limpiar_firebase(cliente):
     """
-    Envía el payload a Firebase usando PUT con el timestamp como clave.
-    El dashboard usa limitToLast(1) → siempre muestra el dato más reciente.
+    Borra la ruta de Firebase al iniciar (PATCH a null por bloques en paralelo,
+    ver purga_firebase.py). Devuelve True si la ruta quedó limpia.
     """
-    ts  = int(payload.get('timestamp', int(time.time())))
-    url = f"{FIREBASE_URL}{RUTA}/{ts}.json"
-    r   = requests.put(url, json=payload, timeout=8)
-    return r.status_code == 200
+    try:
+        resumen = purgar(cliente, RUTA, timeout=8)
+        print()
+        return resumen['fallidas'] == 0
+    except Exception as e:
+        print(f"⚠️  No se pudo limpiar Firebase: {e}\n")
+        return False
 
 # ============================================================================
 #  MAIN
@@ -129,105 +301,275 @@ def ejecutar():
     print(f"   🛰️  CANSAT CAELUM — ESTACIÓN DE TIERRA v2")
     print(f"{'═'*55}")
     print(f"   Modo:    {MODO}")
-    print(f"   Puerto:  {PUERTO_SERIAL} @ {BAUDRATE} baud")
+    print(f"   Puerto:  {', '.join(PUERTOS_SERIAL)} @ {BAUDRATE} baud ({FORMATO_RADIO})")
     print(f"   Firebase: {RUTA}")
     print(f"   CSV:     {ARCHIVO_CSV}")
     print(f"{'═'*55}\n")
 
-    # Limpiar Firebase al iniciar (por lotes para evitar límite de tamaño)
-    try:
-        r = requests.get(f"{FIREBASE_URL}{RUTA}.json?shallow=true", timeout=8)
-        claves = r.json()
-        if not claves:
-            print(f"🗑️  Firebase {RUTA} ya estaba vacío\n")
+    # Cola de reenvío: si se limpió Firebase, lo pendiente de la sesión
+    # anterior ya no tiene sentido; si no, se reenvía
+    cliente = ClienteFirebase(FIREBASE_URL, reintentos=FB_REINTENTOS)
+    reenvio = ColaReenvio(cliente, RUTA, ARCHIVO_REENVIO)
+    if limpiar_firebase(cliente):
+        reenvio.descartar()
+    elif reenvio.pendientes:
+        print(f"📦 {reenvio.pendientes} paquetes pendientes de la sesión anterior en {ARCHIVO_REENVIO}\n")
+
+    # Se abre cada antena por separado: si alguna falla se sigue con el resto
+    puertos = {}
+    for puerto in PUERTOS_SERIAL:
+        try:
+            puertos[puerto] = serial.Serial(puerto, BAUDRATE, timeout=1)
+        except serial.SerialException:
+            print(f"❌ No se pudo abrir {puerto}.")
+    if not puertos:
+        print("   Verifica que el APC220 esté conectado y el puerto sea correcto.")
+        print("   Puertos disponibles: revisa el Administrador de dispositivos.")
+        reenvio.detener()
+        cliente.cerrar()
+        return
+
+    metricas = Metricas()
+
+    columnar = None
+    if GUARDAR_COLUMNAS:
+        try:
+            from archivo_columnar import EscritorColumnar, archivo_columnar
+            columnar = EscritorColumnar(archivo_columnar(ARCHIVO_CSV), CABECERA)
+        except ImportError as e:
+            print(f"⚠️  Sin archivo columnar ({e}): solo se guarda el CSV")
+
+    def escribir_csv(elemento):
+        t_rx, payload = elemento
+        sumidero.escribir(payload)
+        if columnar is not None:
+            columnar.escribir(payload)
+        metricas.observar('rx_csv', time.perf_counter() - t_rx)
+
+    def confirmado_firebase(marcas):
+        ahora = time.perf_counter()
+        metricas.latencias['rx_firebase'].observar_varios(ahora - t for t in marcas)
+
+    # La cola de líneas la consume el hilo principal (parseo).
+    # El CSV nunca descarta (bloquea al parseo, no al lector);
+    # Firebase descarta si la subida no da abasto.
+    sumidero  = SumideroCSV(ARCHIVO_CSV, CABECERA, cada_filas=CSV_CADA_FILAS,
+                            cada_ms=CSV_CADA_MS, fsync_fase=CSV_FSYNC_FASE)
+    lineas    = Etapa("lineas", PARSEAR)
+    etapa_csv = Etapa("csv", escribir_csv, al_esperar=sumidero.revisar).iniciar()
+    reenvio.iniciar()
+    control = None
+    if ACLARAR_COLA is not None:
+        control = ControlSubida(cola_alta=ACLARAR_COLA, cola_baja=ACLARAR_COLA // 10,
+                                retraso_alto=ACLARAR_RETRASO, retraso_bajo=ACLARAR_RETRASO / 3,
+                                intervalo_clave=INTERVALO_CLAVE)
+    etapa_fb  = SubidorLotes(cliente, RUTA, max_lote=MAX_LOTE, max_latencia=MAX_LATENCIA,
+                             tam_cola=TAM_COLA, reenvio=reenvio,
+                             al_confirmar=confirmado_firebase, control=control).iniciar()
+
+    parar   = threading.Event()
+    estado  = {'muestras': 0}
+    errores = {puerto: 0 for puerto in puertos}
+    tramas  = {puerto: LECTOR(ser) for puerto, ser in puertos.items()}
+    # Con una sola antena no hay copias que esperar
+    fusion  = FusionAntenas(VENTANA_FUSION if len(puertos) > 1 else 0.0, POLITICA_FUSION)
+    perdidas = ContadorPerdidas()
+
+    metricas.registrar('muestras_total', "Paquetes válidos recibidos.",
+                       lambda: estado['muestras'], tipo='counter')
+    metricas.registrar('tramas_malformadas_total', "Líneas o tramas corruptas descartadas.",
+                       lambda: sum(t.malformadas for t in tramas.values()), tipo='counter')
+    metricas.registrar('lineas_invalidas_total', "Líneas que no se pudieron parsear.",
+                       lambda: sum(fusion.invalidas.values()), tipo='counter')
+    metricas.registrar('lineas_descartadas_total', "Líneas descartadas por cola de parseo llena.",
+                       lambda: lineas.descartados, tipo='counter')
+    metricas.registrar('cola_lineas', "Líneas esperando al parseo.", lineas.profundidad)
+    metricas.registrar('cola_csv', "Filas esperando al CSV.", etapa_csv.profundidad)
+    metricas.registrar('cola_firebase', "Paquetes esperando a subir.", etapa_fb.profundidad)
+    metricas.registrar('firebase_enviados_total', "Paquetes confirmados por Firebase.",
+                       lambda: etapa_fb.enviados, tipo='counter')
+    metricas.registrar('firebase_errores_total', "Paquetes en lotes fallidos.",
+                       lambda: etapa_fb.errores, tipo='counter')
+    metricas.registrar('paquetes_perdidos_total', "Huecos en num_paquete (sin contar los que llegaron tarde).",
+                       lambda: perdidas.total.perdidos, tipo='counter')
+    metricas.registrar('perdida_reciente', "Fracción perdida de los últimos paquetes esperados.",
+                       lambda: perdidas.total.tasa.valor)
+    metricas.registrar('firebase_desfase_segundos', "Cuánto va por detrás el último dato confirmado.",
+                       etapa_fb.desfase)
+    if control is not None:
+        metricas.registrar('firebase_aclarado', "1 si la subida está aclarada por presión.",
+                           lambda: int(control.activo))
+        metricas.registrar('firebase_aclarados_total', "Paquetes no subidos por el control adaptativo.",
+                           lambda: etapa_fb.aclarados, tipo='counter')
+    metricas.registrar('reenvio_pendientes', "Paquetes en la cola de reenvío en disco.",
+                       lambda: reenvio.pendientes)
+
+    servidor_metricas = None
+    if METRICAS_PUERTO:
+        try:
+            servidor_metricas = ServidorMetricas(metricas, METRICAS_PUERTO).iniciar()
+            print(f"📈 Métricas en {servidor_metricas.url}")
+        except OSError as e:
+            print(f"⚠️  No se pudo abrir el puerto de métricas {METRICAS_PUERTO}: {e}")
+
+    directo = None
+    if DIRECTO_PUERTO:
+        try:
+            directo = ServidorDirecto(DIRECTO_PUERTO, DIRECTO_HOST).iniciar()
+            print(f"🛰️  Directo en {directo.url}")
+        except OSError as e:
+            print(f"⚠️  No se pudo abrir el puerto de directo {DIRECTO_PUERTO}: {e}")
+    if directo is not None:
+        metricas.registrar('directo_clientes', "Navegadores conectados al directo.",
+                           lambda: directo.resumen_dict()['clientes'])
+        metricas.registrar('directo_descartados_total', "Eventos descartados a clientes lentos.",
+                           lambda: directo.resumen_dict()['descartados'], tipo='counter')
+
+    lectores = [threading.Thread(target=hilo_lector, name=f"lector_{puerto}",
+                                 args=(puerto, tramas[puerto], lineas, parar, errores),
+                                 daemon=True)
+                for puerto in puertos]
+    for lector in lectores:
+        lector.start()
+    print(f"📡 Escuchando en {', '.join(puertos)}... (Ctrl+C para detener)\n")
+
+    def procesar(t_rx, puerto, payload):
+        """Un paquete ya deduplicado: CSV siempre, Firebase si el vuelo está activo."""
+        metricas.recibido(t_rx)
+        fase = payload.get('fase', '').strip().lower()
+        perdidas.registrar(payload.get('num_paquete', 0), fase)
+
+        # Siempre guardar en CSV local — registro completo
+        etapa_csv.ofrecer((t_rx, payload), bloquear=True)
+
+        # Directo por la red local: todas las fases (no gasta cuota de Firebase)
+        if directo is not None:
+            directo.publicar(payload)
+
+        # Solo enviar a Firebase cuando el vuelo está activo
+        # Durante 'espera' no saturamos Firebase con datos que no interesan
+        if fase in FASES_ACTIVAS:
+            fb_ico = "📤" if etapa_fb.ofrecer(payload, marca=t_rx) else "⚠️"
         else:
-            print(f"🗑️  Borrando {len(claves)} entradas en {RUTA}...")
-            for i, clave in enumerate(claves):
-                requests.delete(f"{FIREBASE_URL}{RUTA}/{clave}.json", timeout=8)
-                if i % 20 == 0 and i > 0:
-                    print(f"   {i}/{len(claves)} borradas...")
-            print(f"🗑️  Limpieza completada\n")
-    except Exception as e:
-        print(f"⚠️  No se pudo limpiar Firebase: {e}\n")
+            fb_ico = "⏳"  # esperando lanzamiento — no se envía a Firebase
+
+        estado['muestras'] += 1
+        muestras = estado['muestras']
+
+        # Log en pantalla
+        alt   = payload.get('alt', 0)
+        fase  = payload.get('fase', '—')
+        co2   = payload.get('co2', 0)
+        pm25  = payload.get('pm2_5', 0)
+        t_hs  = payload.get('temp_hs', 0)
+        t_scd = payload.get('temp_scd', 0)
+        sats  = int(payload.get('sats', 0))
+        delta = abs(t_hs - t_scd)
+
+        print(f"{fb_ico} [{muestras:>4}]  Alt={alt:>6.1f}m  {fase:<12}  "
+              f"CO₂={co2:>4.0f}  PM2.5={pm25:>5.1f}  "
+              f"T_HS={t_hs:.1f}°C  ΔT={delta:.1f}°C  Sats={sats}  "
+              f"Q={lineas.profundidad()}/{etapa_csv.profundidad()}/{etapa_fb.profundidad()}"
+              + (f"  📦{reenvio.pendientes}" if reenvio.pendientes else "")
+              + (f"  ❌{perdidas.total.tasa.valor:.0%}" if perdidas.total.perdidos else "")
+              + (f"  📉{etapa_fb.desfase():.0f}s" if control is not None and control.activo else "")
+              + (f"  📡{puerto}" if len(puertos) > 1 else ""))
 
     try:
-        ser = serial.Serial(PUERTO_SERIAL, BAUDRATE, timeout=1)
-        print(f"📡 Escuchando en {PUERTO_SERIAL}... (Ctrl+C para detener)\n")
-
-        muestras = 0
-        errores  = 0
-
         while True:
             try:
-                linea = ser.readline().decode('utf-8', errors='ignore').strip()
-            except serial.SerialException as e:
-                print(f"⚠️  Error leyendo puerto serie: {e}")
-                time.sleep(1)
+                t_rx, puerto, linea = lineas.cola.get(timeout=0.1 if fusion.pendientes else 0.5)
+            except queue.Empty:
+                for paquete in fusion.vencidos():
+                    procesar(*paquete)
                 continue
 
-            if not linea:
-                continue
-
-            payload = parsear_linea(linea)
+            payload = PARSEAR(linea)
             if payload is None:
-                if linea:
-                    print(f"   [SKIP] {linea[:60]}...")
+                fusion.invalida(puerto)
+                print(f"   [SKIP] {linea[:60]}...")
                 continue
+            metricas.observar('rx_parseo', time.perf_counter() - t_rx)
 
-            fase = payload.get('fase', '').strip().lower()
-
-            # Siempre guardar en CSV local — registro completo
-            try:
-                escribir_csv(payload)
-            except Exception as e:
-                print(f"⚠️  CSV: {e}")
-
-            # Solo enviar a Firebase cuando el vuelo está activo
-            # Durante 'espera' no saturamos Firebase con datos que no interesan
-            ok_fb = False
-            if fase in FASES_ACTIVAS:
-                try:
-                    ok_fb = enviar_firebase(payload)
-                except Exception as e:
-                    print(f"⚠️  Firebase: {e}")
-
-            muestras += 1
-
-            # Log en pantalla
-            alt   = payload.get('alt', 0)
-            fase  = payload.get('fase', '—')
-            co2   = payload.get('co2', 0)
-            pm25  = payload.get('pm2_5', 0)
-            t_hs  = payload.get('temp_hs', 0)
-            t_scd = payload.get('temp_scd', 0)
-            sats  = int(payload.get('sats', 0))
-            delta = abs(t_hs - t_scd)
-
-            if fase not in FASES_ACTIVAS:
-                fb_ico = "⏳"  # esperando lanzamiento — no se envía a Firebase
-            else:
-                fb_ico = "✅" if ok_fb else "⚠️"
-                if not ok_fb:
-                    errores += 1
-
-            print(f"{fb_ico} [{muestras:>4}]  Alt={alt:>6.1f}m  {fase:<12}  "
-                  f"CO₂={co2:>4.0f}  PM2.5={pm25:>5.1f}  "
-                  f"T_HS={t_hs:.1f}°C  ΔT={delta:.1f}°C  Sats={sats}")
-
-    except serial.SerialException:
-        print(f"\n❌ No se pudo abrir {PUERTO_SERIAL}.")
-        print("   Verifica que el APC220 esté conectado y el puerto sea correcto.")
-        print("   Puertos disponibles: revisa el Administrador de dispositivos.")
+            # La política "mejor" compara campos de la línea CSV; una trama binaria
+            # siempre trae todos, así que ahí se queda la primera copia
+            texto = linea if isinstance(linea, str) else None
+            for paquete in fusion.entrar(t_rx, puerto, payload, texto):
+                procesar(*paquete)
 
     except KeyboardInterrupt:
         print(f"\n\n🛑 Estación de tierra detenida.")
-        print(f"   Muestras recibidas: {muestras}")
-        print(f"   Errores Firebase:   {errores}")
-        if muestras > 0:
-            print(f"   CSV guardado en:    {ARCHIVO_CSV}")
 
     except Exception as e:
         print(f"\n❌ Error inesperado: {e}")
 
+    finally:
+        parar.set()
+        for lector in lectores:
+            lector.join(2)
+        for ser in puertos.values():
+            ser.close()
+        # Lo que quedaba esperando copias de otras antenas también se guarda
+        for paquete in fusion.vaciar():
+            procesar(*paquete)
+        # El CSV se vacía entero; a Firebase se le da un margen y se abandona
+        etapa_csv.detener()
+        sumidero.cerrar()
+        if columnar is not None:
+            columnar.cerrar()
+        fb_ok = etapa_fb.detener(espera=10)
+        if not fb_ok:
+            etapa_fb.volcar_pendientes()
+        reenvio.detener()
+        cliente.cerrar()
+        if servidor_metricas is not None:
+            servidor_metricas.detener()
+        if directo is not None:
+            directo.detener()
+        muestras = estado['muestras']
+
+        print(f"   Muestras recibidas: {muestras}")
+        print(f"   Líneas leídas:      {sum(t.tramas for t in tramas.values())}  "
+              f"(malformadas: {sum(t.malformadas for t in tramas.values())}, "
+              f"descartadas por cola llena: {lineas.descartados})")
+        if len(puertos) > 1:
+            for puerto, linea in zip(fusion.por_puerto(), fusion.resumen()):
+                print(f"   📡 {linea}  corruptas: {tramas[puerto].malformadas}  "
+                      f"errores serie: {errores[puerto]}")
+            if fusion.fuera_orden:
+                print(f"   Paquetes emitidos fuera de orden: {fusion.fuera_orden}")
+        print(f"   Pérdidas:           {perdidas.linea()}")
+        if perdidas.total.perdidos:
+            print("\n".join(perdidas.tabla()))
+        print(f"   CSV:                {sumidero.resumen()}  errores: {etapa_csv.errores}")
+        if columnar is not None:
+            print(f"   Columnar:           {columnar.resumen()}  → {columnar.ruta}")
+        print(f"   Firebase:           {etapa_fb.resumen()}")
+        if control is not None and control.activaciones:
+            print(f"   Subida adaptativa:  {control.resumen()}")
+        if not fb_ok:
+            print(f"   ⚠️  Firebase no terminó a tiempo: lo pendiente quedó en la cola de reenvío")
+        print(f"   Cola de reenvío:    {reenvio.resumen()}")
+        print(f"   HTTP Firebase:      {cliente.resumen()}")
+        if directo is not None:
+            print(f"   Directo:            {directo.resumen()}")
+        if reenvio.pendientes:
+            print(f"   📦 Se reenviarán al volver a arrancar sin limpiar: {ARCHIVO_REENVIO}")
+        if etapa_fb.ultimo_error is not None:
+            print(f"   Último error Firebase: {etapa_fb.ultimo_error}")
+        print(f"   Latencias:          {metricas.linea()}")
+        try:
+            metricas.guardar_json(ARCHIVO_METRICAS)
+            print(f"   Métricas en:        {ARCHIVO_METRICAS}")
+        except OSError as e:
+            print(f"   ⚠️  No se pudo guardar {ARCHIVO_METRICAS}: {e}")
+        if muestras > 0:
+            print(f"   CSV guardado en:    {ARCHIVO_CSV}")
+            try:
+                perdidas.guardar_json(archivo_perdidas(ARCHIVO_CSV))
+                print(f"   Pérdidas en:        {archivo_perdidas(ARCHIVO_CSV)}")
+            except OSError as e:
+                print(f"   ⚠️  No se pudo guardar {archivo_perdidas(ARCHIVO_CSV)}: {e}")
+
 if __name__ == "__main__":
     ejecutar()
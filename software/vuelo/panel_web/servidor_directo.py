@@ -0,0 +1,240 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# MÓDULO:   Emisión en directo por la red local (Server-Sent Events)
+# OBJETIVO: En el campo de lanzamiento no suele haber internet y, aunque lo haya,
+#           el viaje receptor → Firebase → dashboard añade cientos de ms. Este
+#           servidor entrega cada paquete ya parseado directamente a los navegadores
+#           de la misma red, en cuanto sale de la fusión de antenas.
+#
+#   GET /directo                → flujo text/event-stream, un evento JSON por paquete
+#       ?ultimos=N              → antes del directo, los N últimos paquetes (relleno)
+#       ?desde=ID  o cabecera   → los posteriores a ese id (EventSource lo manda solo
+#       Last-Event-ID             al reconectar: no se pierde nada del corte)
+#   GET /historial?ultimos=N    → los N últimos paquetes como lista JSON
+#   GET /estado                 → clientes, publicados, descartados
+#
+# - Un bucle asyncio en su propio hilo atiende a todos los clientes. El receptor
+#   solo llama a publicar(), que serializa el paquete y lo pasa al bucle sin esperar.
+# - Cada cliente tiene su cola de TAM_COLA_CLIENTE eventos. Si un cliente va lento
+#   (wifi mala), se descartan SUS eventos más antiguos: nunca frena al receptor ni
+#   a los demás clientes, y siempre le llega el último estado.
+# - Sin dependencias: SSE es HTTP normal y el navegador lo consume con EventSource
+#   (reconexión automática incluida). El dashboard solo necesita recibir.
+#
+# Usado por receptor_telemetria.py (DIRECTO_PUERTO) y el dashboard (modo DIRECTO)
+# ===========================================================================================
+
+import asyncio
+import json
+import socket
+import threading
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+
+# === CONFIGURACIÓN POR DEFECTO ===
+PUERTO           = 8765
+HOST             = "0.0.0.0"   # toda la red local; "127.0.0.1" = solo este PC
+HISTORIAL        = 2000        # paquetes que se guardan para el relleno (~3 min a 10 Hz)
+TAM_COLA_CLIENTE = 256         # eventos pendientes por cliente antes de descartar
+LATIDO           = 15.0        # segundos sin datos → comentario SSE para mantener la conexión
+TIMEOUT_PETICION = 5.0
+
+
+class _Cliente:
+    """Cola acotada de un navegador conectado. Llena → se tira el evento más antiguo."""
+
+    def __init__(self, tam_cola):
+        self.cola        = asyncio.Queue(maxsize=tam_cola)
+        self.enviados    = 0
+        self.descartados = 0
+
+    def poner(self, evento):
+        if self.cola.full():
+            self.cola.get_nowait()
+            self.descartados += 1
+        self.cola.put_nowait(evento)
+
+
+class ServidorDirecto:
+    """Servidor SSE en un hilo propio. publicar() es seguro desde cualquier hilo."""
+
+    def __init__(self, puerto=PUERTO, host=HOST, historial=HISTORIAL,
+                 tam_cola=TAM_COLA_CLIENTE, latido=LATIDO):
+        self.host     = host
+        self.puerto   = puerto
+        self.tam_cola = tam_cola
+        self.latido   = latido
+
+        self._loop      = asyncio.new_event_loop()
+        self._servidor  = None
+        self._error     = None
+        self._listo     = threading.Event()
+        self._hilo      = threading.Thread(target=self._correr, name="directo", daemon=True)
+        self._historial = deque(maxlen=historial)   # (id, json, evento SSE en bytes)
+        self._clientes  = set()
+        self._id        = 0
+
+        # Estadísticas (solo las toca el hilo del bucle, salvo publicados)
+        self.publicados  = 0
+        self.conexiones  = 0
+        self.descartados = 0   # de clientes ya desconectados + los actuales en resumen()
+
+    # ── Ciclo de vida ───────────────────────────────────────────────
+    def iniciar(self):
+        self._hilo.start()
+        self._listo.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def _correr(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._servidor = self._loop.run_until_complete(
+                asyncio.start_server(self._atender, self.host, self.puerto))
+            self.puerto = self._servidor.sockets[0].getsockname()[1]
+        except OSError as e:
+            self._error = e
+            self._listo.set()
+            self._loop.close()
+            return
+        self._listo.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._servidor.close()
+            tareas = asyncio.all_tasks(self._loop)
+            for tarea in tareas:
+                tarea.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tareas, return_exceptions=True))
+            self._loop.run_until_complete(self._servidor.wait_closed())
+            self._loop.close()
+
+    def detener(self):
+        if self._hilo.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._hilo.join(5)
+
+    @property
+    def url(self):
+        host = socket.gethostname() if self.host == "0.0.0.0" else self.host
+        return f"http://{host}:{self.puerto}/directo"
+
+    # ── Publicación ─────────────────────────────────────────────────
+    def publicar(self, payload):
+        """Encola un paquete para todos los clientes. No espera nunca."""
+        datos = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+        try:
+            self._loop.call_soon_threadsafe(self._difundir, datos)
+        except RuntimeError:   # bucle ya cerrado (al apagar)
+            return
+        self.publicados += 1
+
+    def _difundir(self, datos):
+        self._id += 1
+        evento = f"id: {self._id}\ndata: {datos}\n\n".encode('utf-8')
+        self._historial.append((self._id, datos, evento))
+        for cliente in self._clientes:
+            cliente.poner(evento)
+
+    def _relleno(self, desde=None, ultimos=None):
+        """Entradas del historial posteriores a `desde` o las `ultimos` más recientes."""
+        if desde is not None:
+            if desde > self._id:   # id de una sesión anterior del receptor: todo
+                desde = 0
+            return [h for h in self._historial if h[0] > desde]
+        if ultimos is not None:
+            return list(self._historial)[-ultimos:] if ultimos > 0 else []
+        return []
+
+    # ── HTTP ────────────────────────────────────────────────────────
+    async def _atender(self, reader, writer):
+        sock = writer.get_extra_info('socket')
+        if sock is not None:   # cada evento sale en cuanto se escribe
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            cabecera = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), TIMEOUT_PETICION)
+            lineas = cabecera.decode('latin-1').split('\r\n')
+            metodo, ruta, _ = lineas[0].split(' ', 2)
+            cabeceras = {k.strip().lower(): v.strip()
+                         for k, _, v in (l.partition(':') for l in lineas[1:] if l)}
+            partes = urlsplit(ruta)
+            params = {k: v[-1] for k, v in parse_qs(partes.query).items()}
+
+            if metodo != 'GET':
+                await self._responder(writer, 405, b'')
+            elif partes.path == '/directo':
+                await self._directo(writer, params, cabeceras)
+            elif partes.path == '/historial':
+                entradas = self._relleno(ultimos=_entero(params.get('ultimos'), len(self._historial)))
+                cuerpo = ('[' + ','.join(h[1] for h in entradas) + ']').encode('utf-8')
+                await self._responder(writer, 200, cuerpo, 'application/json; charset=utf-8')
+            elif partes.path == '/estado':
+                cuerpo = json.dumps(self.resumen_dict()).encode('utf-8')
+                await self._responder(writer, 200, cuerpo, 'application/json; charset=utf-8')
+            else:
+                await self._responder(writer, 404, b'')
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ValueError, ConnectionError, asyncio.CancelledError):
+            pass   # cliente que se va o receptor que se apaga
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _responder(writer, codigo, cuerpo, tipo='text/plain; charset=utf-8'):
+        estado = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed'}[codigo]
+        writer.write(f"HTTP/1.1 {codigo} {estado}\r\nContent-Type: {tipo}\r\n"
+                     f"Content-Length: {len(cuerpo)}\r\nAccess-Control-Allow-Origin: *\r\n"
+                     f"Connection: close\r\n\r\n".encode('latin-1') + cuerpo)
+        await writer.drain()
+
+    async def _directo(self, writer, params, cabeceras):
+        desde = _entero(cabeceras.get('last-event-id') or params.get('desde'))
+        ultimos = _entero(params.get('ultimos'))
+
+        # Relleno y alta del cliente en el mismo paso del bucle: ningún evento
+        # puede colarse entre los dos (ni perderse ni repetirse)
+        relleno = self._relleno(desde, ultimos)
+        cliente = _Cliente(self.tam_cola)
+        self._clientes.add(cliente)
+        self.conexiones += 1
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                         b"Cache-Control: no-cache\r\nAccess-Control-Allow-Origin: *\r\n"
+                         b"Connection: keep-alive\r\n\r\nretry: 1000\n\n"
+                         + b''.join(h[2] for h in relleno))
+            await writer.drain()
+            cliente.enviados += len(relleno)
+            while True:
+                try:
+                    evento = await asyncio.wait_for(cliente.cola.get(), self.latido)
+                except asyncio.TimeoutError:
+                    evento = b": latido\n\n"
+                else:
+                    cliente.enviados += 1
+                writer.write(evento)
+                await writer.drain()
+        finally:
+            self._clientes.discard(cliente)
+            self.descartados += cliente.descartados
+
+    # ── Resultados ──────────────────────────────────────────────────
+    def resumen_dict(self):
+        clientes = list(self._clientes)
+        return {'clientes':    len(clientes),
+                'conexiones':  self.conexiones,
+                'publicados':  self.publicados,
+                'descartados': self.descartados + sum(c.descartados for c in clientes),
+                'historial':   len(self._historial)}
+
+    def resumen(self):
+        r = self.resumen_dict()
+        return (f"{r['publicados']} paquetes publicados  clientes: {r['clientes']} "
+                f"({r['conexiones']} conexiones)  descartados por clientes lentos: {r['descartados']}")
+
+
+def _entero(valor, defecto=None):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return defecto
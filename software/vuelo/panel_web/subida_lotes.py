@@ -0,0 +1,328 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# MÓDULO:   Subida a Firebase por lotes (PATCH multi-ruta)
+# OBJETIVO: Agrupar los paquetes pendientes y enviarlos en UNA sola petición
+#           PATCH sobre la ruta padre, en vez de un PUT por paquete.
+#
+#   PATCH {FIREBASE_URL}{RUTA}.json   (a través de ClienteFirebase, cliente_firebase.py)
+#   { "1712": {...paquete...}, "1713": {...}, "1714": {...} }
+#
+# Cada clave hija se sustituye entera, igual que con PUT {RUTA}/{ts}.json, así
+# que el dashboard (orderByKey + limitToLast(1)) sigue viendo el último dato.
+#
+# Un lote se cierra cuando:
+#   - llega a MAX_LOTE paquetes, o
+#   - han pasado MAX_LATENCIA segundos desde el primer paquete del lote.
+# Con poco tráfico cada lote lleva 1 paquete (latencia ≤ MAX_LATENCIA); con
+# atasco los lotes se llenan y el nº de peticiones cae hasta MAX_LOTE veces.
+#
+# Si se le da una ColaReenvio (cola_reenvio.py), los lotes que fallan y los
+# paquetes que no caben en la cola se guardan en disco para reenviarlos luego.
+#
+# Cada paquete puede llevar una `marca` (p. ej. el instante en que se recibió);
+# al confirmarse un lote se llama a al_confirmar(marcas) con las de ese lote.
+#
+# Con un ControlSubida (control_subida.py), si la subida no da abasto solo se
+# encolan fotogramas clave y el último estado recibido viaja en cada lote.
+#
+# Con en_vuelo > 1 hay hasta esa cantidad de PATCH en curso a la vez (tubería).
+# El orden se mantiene así:
+#   - un lote solo sale junto a los anteriores si TODAS sus claves son mayores
+#     que las ya enviadas; si no (timestamps que vuelven atrás o se repiten),
+#     espera a que terminen. Como el dashboard ordena por clave, llegue antes el
+#     lote que llegue, el "último dato" nunca retrocede a uno más antiguo.
+#   - las confirmaciones (estadísticas, al_confirmar, reenvío) se procesan en
+#     el orden de envío de los lotes.
+#
+# Usado por receptor_telemetria.py y caelum_playback.py
+# ===========================================================================================
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# === CONFIGURACIÓN POR DEFECTO ===
+MAX_LOTE     = 50     # paquetes máximos por petición
+MAX_LATENCIA = 0.25   # segundos máximos que espera un paquete a que se cierre su lote
+TAM_COLA     = 2000   # paquetes pendientes máximos
+TIMEOUT      = 8      # segundos por petición HTTP
+EN_VUELO     = 1      # peticiones simultáneas (1 = una tras otra)
+
+_FIN = object()   # marca de fin que se mete en la cola para parar el hilo
+
+
+def clave_paquete(payload, por_defecto=None):
+    """Clave Firebase del paquete: su timestamp entero (como hacía el PUT)."""
+    ts = payload.get('timestamp')
+    if ts is None:
+        ts = time.time() if por_defecto is None else por_defecto
+    return str(int(ts))
+
+
+def orden_clave(clave):
+    """Orden de claves de Firebase: primero las enteras (por valor), luego el resto."""
+    try:
+        return (0, int(clave))
+    except ValueError:
+        return (1, clave)
+
+
+def enviar_lote(cliente, ruta, lote, timeout=TIMEOUT):
+    """
+    Envía un dict {clave: payload} como un único PATCH multi-ruta.
+    Devuelve True si Firebase respondió 200.
+    """
+    return cliente.patch(ruta, lote, timeout=timeout).status_code == 200
+
+
+class SubidorLotes:
+    """
+    Hilo de subida a Firebase con cola acotada y lotes limitados por tamaño
+    y por latencia. Si dos paquetes del mismo lote tienen la misma clave se
+    envía solo el más reciente (coalescencia).
+    """
+    def __init__(self, cliente, ruta, max_lote=MAX_LOTE, max_latencia=MAX_LATENCIA,
+                 tam_cola=TAM_COLA, timeout=TIMEOUT, reenvio=None, al_confirmar=None,
+                 control=None, en_vuelo=EN_VUELO):
+        self.cliente      = cliente
+        self.ruta         = ruta
+        self.max_lote     = max_lote
+        self.max_latencia = max_latencia
+        self.timeout      = timeout
+        self.reenvio      = reenvio
+        self.al_confirmar = al_confirmar
+        self.control      = control
+        self.cola         = queue.Queue(maxsize=tam_cola)
+        self.en_vuelo     = en_vuelo
+
+        # Tubería (en_vuelo > 1): lotes en curso en orden de envío y su mayor clave
+        self._pool        = None
+        self._hueco       = threading.Semaphore(en_vuelo)
+        self._orden       = threading.Condition()
+        self._en_curso    = deque()
+        self._clave_max   = None
+
+        # Último estado aclarado (modo aclarado): lo deja ofrecer() y lo recoge el hilo
+        self._ultimo      = None
+        self._lock_ultimo = threading.Lock()
+        self._t_primero   = None   # instante de encolado del primer paquete
+        self._t_ofrecido  = None   # ídem del paquete más reciente
+        self._t_confirmado = None  # ídem del más reciente que Firebase confirmó
+
+        # Estadísticas
+        self.peticiones   = 0   # PATCH enviados
+        self.procesados   = 0   # paquetes que han salido de la cola
+        self.errores      = 0   # paquetes en lotes fallidos
+        self.descartados  = 0   # paquetes que no cupieron en la cola
+        self.a_reenvio    = 0   # paquetes (fallidos o descartados) guardados en disco
+        self.coalescidos  = 0   # paquetes sustituidos por otro con la misma clave
+        self.aclarados    = 0   # paquetes no encolados por el control adaptativo
+        self.esperas_orden = 0  # lotes que esperaron a los anteriores por sus claves
+        self.ultimo_error = None
+        self._t_ultima_confirmacion = None
+
+        self._hilo = threading.Thread(target=self._bucle, name="subida_lotes", daemon=True)
+
+    def iniciar(self):
+        if self.en_vuelo > 1:
+            self._pool = ThreadPoolExecutor(max_workers=self.en_vuelo, thread_name_prefix="subida_lotes")
+        self._hilo.start()
+        return self
+
+    def ofrecer(self, payload, clave=None, bloquear=False, marca=None):
+        """Encola un paquete. Sin bloquear, si la cola está llena se descarta."""
+        if clave is None:
+            clave = clave_paquete(payload)
+        ahora = time.monotonic()
+        if self._t_primero is None:
+            self._t_primero = ahora
+        self._t_ofrecido = ahora
+        elemento = (clave, payload, marca, ahora)
+        if self.control is not None and not self.control.admitir(payload, self.cola.qsize(), ahora):
+            with self._lock_ultimo:
+                self._ultimo = elemento
+            self.aclarados += 1
+            return True
+        try:
+            self.cola.put(elemento, block=bloquear)
+            return True
+        except queue.Full:
+            self.descartados += 1
+            if self.reenvio is not None:
+                self.reenvio.guardar({clave: payload})
+                self.a_reenvio += 1
+            return False
+
+    def profundidad(self):
+        return self.cola.qsize()
+
+    @property
+    def enviados(self):
+        return self.procesados - self.errores
+
+    def desfase(self):
+        """Segundos que el último dato confirmado va por detrás del último ofrecido."""
+        if self._t_ofrecido is None:
+            return 0.0
+        referencia = self._t_primero if self._t_confirmado is None else self._t_confirmado
+        return max(0.0, self._t_ofrecido - referencia)
+
+    def ritmo(self):
+        """Paquetes confirmados por segundo desde el primero ofrecido."""
+        if self._t_ultima_confirmacion is None:
+            return 0.0
+        return self.enviados / max(self._t_ultima_confirmacion - self._t_primero, 1e-9)
+
+    def _tomar_ultimo(self):
+        with self._lock_ultimo:
+            elemento, self._ultimo = self._ultimo, None
+        return elemento
+
+    def _juntar_lote(self, primero):
+        """Completa un lote a partir de `primero` respetando tamaño y latencia."""
+        lote = {primero[0]: primero[1]}
+        marcas = [primero[2]]
+        t_nuevo = primero[3]
+        n = 1
+        limite = time.monotonic() + self.max_latencia
+        fin = False
+        while n < self.max_lote:
+            restante = limite - time.monotonic()
+            try:
+                # Si hay atasco get_nowait llena el lote sin esperar
+                elemento = self.cola.get(timeout=restante) if restante > 0 else self.cola.get_nowait()
+            except queue.Empty:
+                break
+            if elemento is _FIN:
+                fin = True
+                break
+            clave, payload, marca, t_nuevo = elemento
+            if clave in lote:
+                self.coalescidos += 1
+            lote[clave] = payload
+            marcas.append(marca)
+            n += 1
+        return lote, marcas, n, fin, t_nuevo
+
+    def _bucle(self):
+        fin = False
+        # Con control adaptativo no se puede esperar indefinidamente: el último
+        # estado aclarado tiene que salir aunque la cola esté vacía
+        espera = self.max_latencia if self.control is not None else None
+        while not fin:
+            try:
+                primero = self.cola.get(timeout=espera)
+            except queue.Empty:
+                primero = self._tomar_ultimo()
+                if primero is None:
+                    continue
+            if primero is _FIN:
+                break
+            lote, marcas, n, fin, t_nuevo = self._juntar_lote(primero)
+            ultimo = self._tomar_ultimo()
+            if ultimo is not None:
+                # El último estado va siempre con el lote: el dashboard queda al día
+                if ultimo[0] in lote:
+                    self.coalescidos += 1
+                lote[ultimo[0]] = ultimo[1]
+                marcas.append(ultimo[2])
+                n += 1
+                t_nuevo = ultimo[3]
+            self._despachar([None, lote, marcas, n, primero[3], t_nuevo])
+        if self._pool is not None:
+            with self._orden:
+                self._orden.wait_for(lambda: not self._en_curso)
+            self._pool.shutdown()
+
+    def _enviar(self, lote):
+        try:
+            return enviar_lote(self.cliente, self.ruta, lote, self.timeout)
+        except Exception as e:
+            self.ultimo_error = e
+            return False
+
+    def _despachar(self, entrada):
+        """Envía un lote [ok, lote, marcas, n, t_primero, t_nuevo]: en el acto o a la tubería."""
+        if self._pool is None:
+            entrada[0] = self._enviar(entrada[1])
+            self._registrar(entrada)
+            return
+        claves = [orden_clave(c) for c in entrada[1]]
+        with self._orden:
+            if self._en_curso and min(claves) <= self._clave_max:
+                self.esperas_orden += 1
+                self._orden.wait_for(lambda: not self._en_curso)
+        self._hueco.acquire()   # como mucho en_vuelo peticiones en curso
+        with self._orden:
+            self._en_curso.append(entrada)
+            self._clave_max = max(claves)   # la mayor en curso: las anteriores son menores
+        self._pool.submit(self._subir_en_vuelo, entrada)
+
+    def _subir_en_vuelo(self, entrada):
+        try:
+            entrada[0] = self._enviar(entrada[1])
+        finally:
+            self._hueco.release()
+            with self._orden:
+                # Se registran en orden de envío: solo los que ya no tienen ninguno pendiente delante
+                while self._en_curso and self._en_curso[0][0] is not None:
+                    self._registrar(self._en_curso.popleft())
+                self._orden.notify_all()
+
+    def _registrar(self, entrada):
+        ok, lote, marcas, n, t_primero, t_nuevo = entrada
+        self.peticiones += 1
+        self.procesados += n
+        if self.control is not None:
+            self.control.observar(time.monotonic() - t_primero)
+        if ok:
+            self._t_confirmado = max(self._t_confirmado or t_nuevo, t_nuevo)
+            self._t_ultima_confirmacion = time.monotonic()
+        if ok and self.al_confirmar is not None:
+            self.al_confirmar(marcas)
+        if not ok:
+            self.errores += n
+            if self.reenvio is not None:
+                self.reenvio.guardar(lote)
+                self.a_reenvio += len(lote)
+
+    def detener(self, espera=None):
+        """Envía lo pendiente y para el hilo (espera máx. `espera` segundos)."""
+        limite = None if espera is None else time.monotonic() + espera
+        try:
+            self.cola.put(_FIN, timeout=espera)
+        except queue.Full:
+            pass
+        self._hilo.join(None if limite is None else max(0, limite - time.monotonic()))
+        return not self._hilo.is_alive()
+
+    def volcar_pendientes(self):
+        """Pasa a la cola de reenvío lo que quede sin subir (al cerrar). Devuelve cuántos."""
+        if self.reenvio is None:
+            return 0
+        lote = {}
+        ultimo = self._tomar_ultimo()
+        if ultimo is not None:
+            lote[ultimo[0]] = ultimo[1]
+        while True:
+            try:
+                elemento = self.cola.get_nowait()
+            except queue.Empty:
+                break
+            if elemento is not _FIN:
+                lote[elemento[0]] = elemento[1]
+        self.reenvio.guardar(lote)
+        self.a_reenvio += len(lote)
+        return len(lote)
+
+    def resumen(self):
+        media = self.procesados / self.peticiones if self.peticiones else 0
+        return (f"{self.enviados} paquetes en {self.peticiones} peticiones "
+                f"({media:.1f} paq/petición)  errores: {self.errores}  "
+                f"descartados: {self.descartados}  coalescidos: {self.coalescidos}"
+                + (f"  a reenvío: {self.a_reenvio}" if self.reenvio is not None else "")
+                + (f"  aclarados: {self.aclarados}" if self.control is not None else "")
+                + (f"  en vuelo: ≤{self.en_vuelo} (esperas por orden: {self.esperas_orden})"
+                   if self.en_vuelo > 1 else ""))
@@ -0,0 +1,125 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# MÓDULO:   Sumidero CSV persistente con buffer
+# OBJETIVO: Guardar los paquetes en datos_radio.csv abriendo el fichero UNA vez
+#           y escribiendo la cabecera UNA vez, en vez de abrir/cerrar por fila.
+#
+# POLÍTICA DE VACIADO (flush):
+#   - cada_filas → flush cada N filas
+#   - cada_ms    → flush si la fila más antigua sin vaciar tiene más de T ms
+#   - fsync_fase → flush + fsync al cambiar de fase (caida_libre, apertura...)
+#                  para que el cambio de fase quede en disco aunque se corte la luz
+#
+# Estadísticas: filas/s y latencia de los flush (media y máxima).
+# Usado por receptor_telemetria.py
+# ===========================================================================================
+
+import csv
+import os
+import time
+
+# === CONFIGURACIÓN POR DEFECTO ===
+CADA_FILAS = 20      # flush cada N filas
+CADA_MS    = 500     # flush si hay filas pendientes desde hace más de T ms
+FSYNC_FASE = True    # fsync al cambiar de fase
+TAM_BUFFER = 64 * 1024
+
+
+class SumideroCSV:
+    """
+    Fichero CSV abierto durante toda la sesión. Las filas se acumulan en el
+    buffer del fichero y se vuelcan según la política configurada.
+    Usar con `with SumideroCSV(...) as s:` o llamar a cerrar() al terminar.
+    """
+    def __init__(self, ruta, cabecera, cada_filas=CADA_FILAS, cada_ms=CADA_MS,
+                 fsync_fase=FSYNC_FASE, campo_fase='fase'):
+        self.ruta       = ruta
+        self.cabecera   = cabecera
+        self.cada_filas = cada_filas
+        self.cada_ms    = cada_ms
+        self.fsync_fase = fsync_fase
+        self.campo_fase = campo_fase
+
+        existe = os.path.exists(ruta) and os.path.getsize(ruta) > 0
+        self._f = open(ruta, 'a', newline='', encoding='utf-8', buffering=TAM_BUFFER)
+        self._writer = csv.DictWriter(self._f, fieldnames=cabecera, extrasaction='ignore')
+        if not existe:
+            self._writer.writeheader()
+
+        self._pendientes   = 0       # filas escritas desde el último flush
+        self._t_pendiente  = None    # instante de la primera fila sin vaciar
+        self._fase         = None
+
+        # Estadísticas
+        self.filas         = 0
+        self.vaciados      = 0
+        self.fsyncs        = 0
+        self.t_flush_total = 0.0
+        self.t_flush_max   = 0.0
+        self._t_inicio     = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    @property
+    def cerrado(self):
+        return self._f.closed
+
+    def escribir(self, payload):
+        """Añade una fila y vacía el buffer si la política lo pide."""
+        self._writer.writerow(payload)
+        self.filas += 1
+        self._pendientes += 1
+        if self._t_pendiente is None:
+            self._t_pendiente = time.monotonic()
+
+        fase = payload.get(self.campo_fase)
+        if self.fsync_fase and fase != self._fase and self._fase is not None:
+            self.vaciar(fsync=True)
+        elif self._pendientes >= self.cada_filas:
+            self.vaciar()
+        else:
+            self.revisar()
+        self._fase = fase
+
+    def revisar(self):
+        """Vacía si hay filas pendientes más antiguas que cada_ms. Llamar periódicamente."""
+        if self._t_pendiente is not None and \
+           (time.monotonic() - self._t_pendiente) * 1000 >= self.cada_ms:
+            self.vaciar()
+
+    def vaciar(self, fsync=False):
+        """Vuelca el buffer al sistema operativo (y a disco si fsync=True)."""
+        if self._pendientes == 0 and not fsync:
+            return
+        t0 = time.perf_counter()
+        self._f.flush()
+        if fsync:
+            os.fsync(self._f.fileno())
+            self.fsyncs += 1
+        dt = time.perf_counter() - t0
+        self.vaciados      += 1
+        self.t_flush_total += dt
+        self.t_flush_max    = max(self.t_flush_max, dt)
+        self._pendientes    = 0
+        self._t_pendiente   = None
+
+    def cerrar(self):
+        """Vacía todo a disco y cierra el fichero. Se puede llamar varias veces."""
+        if self._f.closed:
+            return
+        self.vaciar(fsync=True)
+        self._f.close()
+
+    def filas_por_segundo(self):
+        dt = time.monotonic() - self._t_inicio
+        return self.filas / dt if dt > 0 else 0.0
+
+    def resumen(self):
+        media_ms = 1000 * self.t_flush_total / self.vaciados if self.vaciados else 0.0
+        return (f"{self.filas} filas ({self.filas_por_segundo():.1f} filas/s)  "
+                f"flush: {self.vaciados} (fsync {self.fsyncs})  "
+                f"media {media_ms:.2f} ms  máx {1000 * self.t_flush_max:.2f} ms")
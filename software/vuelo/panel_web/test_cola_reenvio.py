@@ -0,0 +1,164 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# PROGRAMA: Pruebas de la cola de reenvío (cola_reenvio.py) con el emulador de Firebase
+# OBJETIVO: Comprobar contra emulador_firebase.py, con un corte que se enciende y se
+#           apaga (tasa_error = 1 → 0), que:
+#
+#   - los lotes que Firebase no confirma acaban en el JSONL, en el orden de llegada
+#   - al volver la conexión se reenvían en ese mismo orden
+#   - el .pos solo avanza después de que Firebase confirme cada lote
+#   - si se para la cola a mitad del reenvío y se vuelve a abrir, sigue donde se
+#     quedó sin repetir ningún paquete
+#
+# USO:
+#   python -m pytest test_cola_reenvio.py
+#   python test_cola_reenvio.py
+# ===========================================================================================
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+from cliente_firebase import ClienteFirebase
+from cola_reenvio import ColaReenvio
+from emulador_firebase import EmuladorFirebase
+from subida_lotes import SubidorLotes
+
+RUTA    = "/cansat/telemetria"
+T0      = 1712000000   # timestamp del primer paquete (las claves son timestamps)
+LIMITE  = 10.0         # segundos máximos de espera de cada condición
+
+
+def paquete(i):
+    return {'num_paquete': i, 'timestamp': T0 + i, 'alt': 100.0 + i, 'fase': 'descenso'}
+
+
+def esperar(condicion, limite=LIMITE):
+    fin = time.monotonic() + limite
+    while not condicion() and time.monotonic() < fin:
+        time.sleep(0.01)
+    return condicion()
+
+
+class PruebasColaReenvio(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp(prefix="cola_reenvio_")
+        self.archivo = os.path.join(self.carpeta, "reenvio.jsonl")
+        self.emu = EmuladorFirebase().iniciar()
+        self.cliente = ClienteFirebase(self.emu.url, reintentos=0, timeout=2)
+        self.colas = []
+
+        # Cada PATCH que Firebase aplica: sus claves y el .pos en ese momento
+        self.llegadas = []
+        actualizar = self.emu.actualizar
+        def registrar(ruta, hijos):
+            self.llegadas.append((list(hijos), self.leer_pos()))
+            actualizar(ruta, hijos)
+        self.emu.actualizar = registrar
+
+    def tearDown(self):
+        for cola in self.colas:
+            cola.detener()
+        self.cliente.cerrar()
+        self.emu.detener()
+        shutil.rmtree(self.carpeta, ignore_errors=True)
+
+    # ── Ayudas ──
+    def abrir_cola(self, **opciones):
+        opciones = {'max_lote': 10, 'reintento': 0.05, 'reintento_max': 0.1, **opciones}
+        cola = ColaReenvio(self.cliente, RUTA, self.archivo, **opciones)
+        self.colas.append(cola)
+        return cola
+
+    def leer_pos(self):
+        try:
+            with open(self.archivo + '.pos') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def lineas_spool(self):
+        with open(self.archivo, 'rb') as f:
+            return f.read().splitlines(keepends=True)
+
+    def claves_recibidas(self):
+        return [k for claves, _ in self.llegadas for k in claves]
+
+    # ── Pruebas ──
+    def test_corte_y_recuperacion(self):
+        n = 60
+        claves = [str(T0 + i) for i in range(n)]
+        self.emu.tasa_error = 1.0   # Firebase caído
+        cola = self.abrir_cola().iniciar()
+        subidor = SubidorLotes(self.cliente, RUTA, max_lote=8, max_latencia=0.01,
+                               reenvio=cola).iniciar()
+        for i in range(n):
+            subidor.ofrecer(paquete(i), clave=claves[i], bloquear=True)
+        self.assertTrue(subidor.detener(LIMITE))
+
+        # Todo lo no confirmado está en el JSONL, en orden, y el .pos no se ha movido
+        self.assertEqual(subidor.a_reenvio, n)
+        self.assertTrue(esperar(lambda: cola.fallos >= 2))
+        lineas = self.lineas_spool()
+        self.assertEqual([json.loads(l)['k'] for l in lineas], claves)
+        self.assertEqual(json.loads(lineas[0])['v'], paquete(0))
+        self.assertEqual(cola.pendientes, n)
+        self.assertEqual(self.leer_pos(), 0)
+        self.assertEqual(self.emu.contar(RUTA), 0)
+        self.assertEqual(self.llegadas, [])
+
+        # Vuelve la conexión: se vacía la cola en el orden original
+        self.emu.tasa_error = 0.0
+        self.assertTrue(esperar(lambda: cola.pendientes == 0))
+        self.assertEqual(self.claves_recibidas(), claves)
+        self.assertEqual(self.emu.contar(RUTA), n)
+        self.assertEqual(self.emu.leer(f"{RUTA}/{claves[-1]}"), paquete(n - 1))
+
+        # Cuando Firebase aplica cada lote, el .pos sigue al principio de ese lote:
+        # solo avanza después de la confirmación
+        largos = [len(l) for l in lineas]
+        hechas = 0
+        for claves_lote, pos in self.llegadas:
+            self.assertEqual(pos, sum(largos[:hechas]))
+            hechas += len(claves_lote)
+
+        # Cola vacía: fichero compactado y .pos a 0
+        self.assertTrue(esperar(lambda: os.path.getsize(self.archivo) == 0))
+        self.assertEqual(self.leer_pos(), 0)
+        self.assertEqual(cola.reenviados, n)
+
+    def test_reinicio_a_mitad_sin_duplicados(self):
+        n = 100
+        claves = [str(T0 + i) for i in range(n)]
+        primera = self.abrir_cola()
+        primera.guardar({claves[i]: paquete(i) for i in range(n)})
+
+        # Reenvío lento y parada a mitad
+        self.emu.latencia = 0.05
+        primera.iniciar()
+        self.assertTrue(esperar(lambda: len(self.llegadas) >= 3))
+        primera.detener()
+        self.colas.remove(primera)
+        enviados = len(self.claves_recibidas())
+        self.assertLess(enviados, n)
+        self.assertEqual(primera.reenviados, enviados)   # todo lo que llegó quedó confirmado
+
+        # Se vuelve a abrir el mismo fichero: sigue justo detrás de lo confirmado
+        segunda = self.abrir_cola()
+        self.assertEqual(segunda.pendientes, n - enviados)
+        self.emu.latencia = 0.0
+        segunda.iniciar()
+        self.assertTrue(esperar(lambda: segunda.pendientes == 0))
+
+        recibidas = self.claves_recibidas()
+        self.assertEqual(recibidas, claves)   # sin duplicados ni huecos, en orden
+        self.assertEqual(self.emu.contar(RUTA), n)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2, argv=[sys.argv[0]] + sys.argv[1:])
@@ -0,0 +1,109 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# PROGRAMA: Pruebas de la fusión de antenas (fusion_antenas.py)
+# OBJETIVO: Con relojes simulados (argumento `ahora`), comprobar que FusionAntenas:
+#
+#   - deja pasar cada paquete una sola vez aunque llegue por varias antenas,
+#     y ordenado por num_paquete dentro de la ventana
+#   - con "primera" se queda la primera copia y con "mejor" la más completa
+#   - descarta copias que llegan después de emitido el paquete
+#   - emite igual (contado como fuera de orden) un paquete que llega tarde
+#   - no confunde los paquetes tras un reinicio del Arduino (num_paquete a 0)
+#   - cuenta por antena las copias elegidas, duplicadas y las que solo llegaron por ella
+#
+# USO:
+#   python -m pytest test_fusion_antenas.py
+#   python test_fusion_antenas.py
+# ===========================================================================================
+
+import sys
+import unittest
+
+from fusion_antenas import FusionAntenas
+
+T0 = 1712000000
+
+
+def paquete(num, ts=None, **extra):
+    return {'num_paquete': float(num), 'timestamp': float(T0 + num if ts is None else ts), **extra}
+
+
+def nums(salida):
+    return [int(p['num_paquete']) for _, _, p in salida]
+
+
+class PruebasFusion(unittest.TestCase):
+
+    def test_dos_antenas_sin_duplicados_y_en_orden(self):
+        f = FusionAntenas(ventana=0.3)
+        salida = []
+        # COM3 recibe 1..10 menos el 4; COM5 recibe 2..10 con 10 ms de retraso
+        llegadas = [(0.1 * i, 'COM3', i) for i in range(1, 11) if i != 4]
+        llegadas += [(0.1 * i + 0.01, 'COM5', i) for i in range(2, 11)]
+        for t, puerto, i in sorted(llegadas):
+            salida += f.entrar(t, puerto, paquete(i), ahora=t)
+        salida += f.vaciar()
+
+        self.assertEqual(nums(salida), list(range(1, 11)))
+        self.assertEqual(f.fuera_orden, 0)
+        self.assertEqual(f.pendientes, 0)
+        por = f.por_puerto()
+        self.assertEqual(por['COM3']['elegidas'], 9)
+        self.assertEqual(por['COM5']['elegidas'], 1)      # el 4 solo llegó por COM5
+        self.assertEqual(por['COM5']['duplicadas'], 8)
+        self.assertEqual((por['COM3']['unicas'], por['COM5']['unicas']), (1, 1))
+
+    def test_reordena_dentro_de_la_ventana(self):
+        f = FusionAntenas(ventana=0.5)
+        salida = []
+        for t, i in ((0.0, 3), (0.1, 1), (0.2, 2)):
+            salida += f.entrar(t, 'COM3', paquete(i), ahora=t)
+        self.assertEqual(salida, [])                      # aún dentro de la ventana
+        salida += f.vencidos(ahora=1.0)
+        self.assertEqual(nums(salida), [1, 2, 3])
+        self.assertEqual(f.fuera_orden, 0)
+
+    def test_politicas(self):
+        incompleta = '5,CAELUM,1712000005,,,,'
+        completa   = '5,CAELUM,1712000005,40.4,-3.7,120'
+        for politica, elegida in (("primera", 'COM3'), ("mejor", 'COM5')):
+            f = FusionAntenas(ventana=0.3, politica=politica)
+            f.entrar(0.0, 'COM3', paquete(5, lat=0.0), linea=incompleta, ahora=0.0)
+            f.entrar(0.1, 'COM5', paquete(5, lat=40.4), linea=completa, ahora=0.1)
+            [(_, puerto, payload)] = f.vaciar()
+            self.assertEqual(puerto, elegida, politica)
+            self.assertEqual(payload['lat'], 0.0 if politica == "primera" else 40.4)
+        with self.assertRaises(ValueError):
+            FusionAntenas(politica="otra")
+
+    def test_copia_tardia_y_paquete_tardio(self):
+        f = FusionAntenas(ventana=0.2)
+        salida = []
+        for i in (1, 2, 4):
+            salida += f.entrar(0.0, 'COM3', paquete(i), ahora=0.0)
+        salida += f.vencidos(ahora=1.0)
+        # Copia del 2 fuera de ventana: se descarta. El 3 llega tarde: sale igual
+        salida += f.entrar(1.1, 'COM5', paquete(2), ahora=1.1)
+        salida += f.entrar(1.2, 'COM5', paquete(3), ahora=1.2)
+        salida += f.vaciar()
+        self.assertEqual(nums(salida), [1, 2, 4, 3])
+        self.assertEqual(f.fuera_orden, 1)
+        self.assertEqual(f.duplicadas['COM5'], 1)
+
+    def test_reinicio_del_arduino(self):
+        f = FusionAntenas(ventana=0.0)
+        salida = []
+        salida += f.entrar(0.0, 'COM3', paquete(1, ts=T0), ahora=0.0)
+        salida += f.entrar(0.1, 'COM3', paquete(1, ts=T0 + 500), ahora=0.1)   # mismo num, otro vuelo
+        salida += f.entrar(0.2, 'COM5', paquete(1, ts=T0 + 500), ahora=0.2)   # copia del nuevo
+        self.assertEqual([p['timestamp'] for _, _, p in salida], [T0, T0 + 500])
+        self.assertEqual(f.duplicadas['COM5'], 1)
+
+    def test_ventana_cero_no_retrasa(self):
+        f = FusionAntenas(ventana=0.0)
+        self.assertEqual(nums(f.entrar(0.0, 'COM3', paquete(7), ahora=0.0)), [7])
+        self.assertEqual(f.pendientes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2, argv=[sys.argv[0]] + sys.argv[1:])
@@ -0,0 +1,151 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# PROGRAMA: Pruebas del punto de control y del índice del playback (indice_playback.py)
+# OBJETIVO: Comprobar que:
+#
+#   - PuntoControl avanza con las confirmaciones y se congela en cuanto un lote
+#     falla (llamado a mano y como al_confirmar de SubidorLotes contra el
+#     emulador), para que --resume repita desde el primer lote no confirmado
+#   - guardar() no escribe sin huella salvo forzado, y cargar() lee lo guardado
+#   - IndiceFilas calcula la huella si no se le da, reutiliza <csv>.indice.json
+#     y sus búsquedas devuelven el byte de inicio de una fila real
+#
+# USO:
+#   python -m pytest test_indice_playback.py
+#   python test_indice_playback.py
+# ===========================================================================================
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from cliente_firebase import ClienteFirebase
+from emulador_firebase import EmuladorFirebase
+from indice_playback import IndiceFilas, PuntoControl, huella_fichero
+from subida_lotes import SubidorLotes
+
+RUTA   = "/cansat/replay"
+T0     = 1712000000
+LIMITE = 10.0
+
+
+class PruebasPuntoControl(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp(prefix="punto_control_")
+        self.destino = os.path.join(self.carpeta, "punto.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.carpeta, ignore_errors=True)
+
+    def nuevo(self, huella="abc"):
+        return PuntoControl("vuelo.csv", huella, RUTA, 10.0, destino=self.destino)
+
+    def test_avanza_y_se_congela_tras_un_error(self):
+        punto = self.nuevo()
+        punto.subidor = SimpleNamespace(errores=0)
+        for fila in range(10):
+            punto.anotar(fila, T0 + fila)
+        punto.al_confirmar([0, 1, 2])
+        punto.al_confirmar([3, 4])
+        self.assertEqual((punto.fila, punto.timestamp), (4, T0 + 4))
+
+        punto.subidor.errores = 2            # el lote [5, 6] falló
+        punto.al_confirmar([7, 8, 9])        # los siguientes se confirman, pero hay hueco
+        self.assertEqual((punto.fila, punto.timestamp), (4, T0 + 4))
+        self.assertEqual(punto._timestamps, {5: T0 + 5, 6: T0 + 6})
+
+    def test_con_subidor_y_emulador(self):
+        emu = EmuladorFirebase().iniciar()
+        cliente = ClienteFirebase(emu.url, reintentos=0, timeout=2)
+        try:
+            # El tercer PATCH falla
+            patch, llamadas = cliente.patch, []
+            def fallar_tercero(ruta, lote, **opciones):
+                llamadas.append(list(lote))
+                if len(llamadas) == 3:
+                    raise ConnectionError("corte en la prueba")
+                return patch(ruta, lote, **opciones)
+            cliente.patch = fallar_tercero
+
+            punto = self.nuevo()
+            subidor = SubidorLotes(cliente, RUTA, max_lote=5, max_latencia=0.01,
+                                   al_confirmar=punto.al_confirmar)
+            punto.subidor = subidor
+            subidor.iniciar()
+            for fila in range(30):
+                punto.anotar(fila, T0 + fila)
+                subidor.ofrecer({'timestamp': T0 + fila}, bloquear=True, marca=fila)
+            self.assertTrue(subidor.detener(LIMITE))
+        finally:
+            cliente.cerrar()
+            emu.detener()
+
+        fallido = [int(k) - T0 for k in llamadas[2]]
+        self.assertGreater(subidor.errores, 0)
+        self.assertEqual(punto.fila, fallido[0] - 1)       # justo antes del lote fallido
+        self.assertEqual(punto.timestamp, T0 + fallido[0] - 1)
+
+    def test_guardar_y_cargar(self):
+        punto = self.nuevo(huella=None)
+        punto.al_confirmar([0, 1])            # sin subidor: avanza
+        self.assertFalse(punto.guardar())     # aún sin huella
+        self.assertFalse(os.path.exists(self.destino))
+        punto.huella = "abc"
+        self.assertTrue(punto.guardar())
+        self.assertFalse(punto.guardar())     # no ha avanzado
+        leido = PuntoControl.cargar(self.destino)
+        self.assertEqual((leido.archivo, leido.huella, leido.ruta, leido.fila),
+                         ("vuelo.csv", "abc", RUTA, 1))
+        punto.borrar()
+        self.assertIsNone(PuntoControl.cargar(self.destino))
+
+
+class PruebasIndiceFilas(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp(prefix="indice_filas_")
+        self.csv = os.path.join(self.carpeta, "vuelo.csv")
+        alts = [10 * i for i in range(50)] + [500 - 10 * i for i in range(50)]   # sube y baja
+        with open(self.csv, 'w', encoding='utf-8', newline='') as f:
+            f.write("timestamp,alt,fase\r\n")
+            for i, alt in enumerate(alts):
+                f.write(f"{T0 + i},{alt},{'ascenso' if i < 50 else 'descenso'}\r\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.carpeta, ignore_errors=True)
+
+    def linea_en(self, byte):
+        with open(self.csv, 'rb') as f:
+            f.seek(byte)
+            return f.readline().decode().strip()
+
+    def test_construir_y_buscar(self):
+        indice = IndiceFilas(self.csv, cada=10).construir()
+        self.assertEqual(indice.huella, huella_fichero(self.csv))
+        self.assertEqual(indice.total, 100)
+        self.assertEqual(len(indice.bloques), 10)
+
+        byte, fila = indice.bloque_de_fila(37)
+        self.assertEqual(fila, 30)
+        self.assertEqual(self.linea_en(byte), f"{T0 + 30},300,ascenso")
+        byte, fila = indice.bloque_de_timestamp(T0 + 64)
+        self.assertEqual((fila, self.linea_en(byte)), (60, f"{T0 + 60},400,descenso"))
+        byte, fila = indice.bloque_de_apogeo()
+        self.assertEqual((fila, self.linea_en(byte)), (50, f"{T0 + 50},500,descenso"))
+
+    def test_reutiliza_el_indice_en_disco(self):
+        IndiceFilas(self.csv, cada=10).construir()
+        otro = IndiceFilas(self.csv, cada=10).iniciar().esperar()
+        self.assertTrue(otro.cargado)
+        self.assertEqual(otro.total, 100)
+        # Con otra huella (CSV cambiado) no se usa
+        cambiado = IndiceFilas(self.csv, huella="otra", cada=10).construir()
+        self.assertFalse(cambiado.cargado)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2, argv=[sys.argv[0]] + sys.argv[1:])
@@ -0,0 +1,100 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# PROGRAMA: Pruebas de la purga por bloques (purga_firebase.py) con el emulador de Firebase
+# OBJETIVO: Comprobar contra emulador_firebase.py que purgar():
+#
+#   - trocea las claves en PATCH a null de como mucho tam_bloque claves, sin
+#     repetir ni saltarse ninguna, y deja la ruta vacía (las demás, intactas)
+#   - no pasa de `hilos` peticiones a la vez
+#   - cuenta como fallidas las claves de los bloques que Firebase rechaza
+#
+# USO:
+#   python -m pytest test_purga_firebase.py
+#   python test_purga_firebase.py
+# ===========================================================================================
+
+import sys
+import threading
+import unittest
+
+from cliente_firebase import ClienteFirebase
+from emulador_firebase import EmuladorFirebase
+from purga_firebase import purgar
+
+RUTA  = "/cansat/simulacion"
+OTRA  = "/cansat/telemetria"
+T0    = 1712000000
+
+
+class PruebasPurga(unittest.TestCase):
+
+    def setUp(self):
+        self.emu = EmuladorFirebase().iniciar()
+        self.cliente = ClienteFirebase(self.emu.url, reintentos=0, timeout=5)
+
+        # Cada PATCH: sus claves y valores; y cuántos había en curso a la vez
+        self.bloques = []
+        self.rechazar = set()    # nº de PATCH (desde 0) que responden con error
+        self.en_curso = self.max_en_curso = 0
+        self._lock = threading.Lock()
+        patch = self.cliente.patch
+        def contar(ruta, datos, **opciones):
+            with self._lock:
+                n = len(self.bloques)
+                self.bloques.append(dict(datos))
+                self.en_curso += 1
+                self.max_en_curso = max(self.max_en_curso, self.en_curso)
+            try:
+                if n in self.rechazar:
+                    raise ConnectionError("rechazado en la prueba")
+                return patch(ruta, datos, **opciones)
+            finally:
+                with self._lock:
+                    self.en_curso -= 1
+        self.cliente.patch = contar
+
+    def tearDown(self):
+        self.cliente.cerrar()
+        self.emu.detener()
+
+    def sembrar(self, ruta, n):
+        self.emu.escribir(ruta, {str(T0 + i): {'alt': float(i)} for i in range(n)})
+
+    # ── Pruebas ──
+    def test_bloques_y_ruta_vacia(self):
+        n = 1234
+        self.sembrar(RUTA, n)
+        self.sembrar(OTRA, 10)
+        self.emu.latencia = 0.02
+        resumen = purgar(self.cliente, RUTA, tam_bloque=100, hilos=4, mostrar=False)
+
+        self.assertEqual(len(self.bloques), 13)
+        self.assertTrue(all(len(b) <= 100 for b in self.bloques))
+        self.assertTrue(all(v is None for b in self.bloques for v in b.values()))
+        claves = [k for b in self.bloques for k in b]
+        self.assertEqual(len(claves), n)                          # ninguna repetida
+        self.assertEqual(set(claves), {str(T0 + i) for i in range(n)})
+        self.assertGreater(self.max_en_curso, 1)
+        self.assertLessEqual(self.max_en_curso, 4)
+
+        self.assertEqual(self.emu.contar(RUTA), 0)
+        self.assertEqual(self.emu.contar(OTRA), 10)
+        self.assertEqual({k: resumen[k] for k in ('claves', 'borradas', 'fallidas', 'peticiones')},
+                         {'claves': n, 'borradas': n, 'fallidas': 0, 'peticiones': 13})
+
+    def test_ruta_vacia(self):
+        resumen = purgar(self.cliente, RUTA, mostrar=False)
+        self.assertEqual((resumen['claves'], resumen['peticiones']), (0, 0))
+        self.assertEqual(self.bloques, [])
+
+    def test_bloques_fallidos(self):
+        self.sembrar(RUTA, 250)
+        self.rechazar = {1}
+        resumen = purgar(self.cliente, RUTA, tam_bloque=100, hilos=1, mostrar=False)
+        self.assertEqual((resumen['borradas'], resumen['fallidas'], resumen['peticiones']),
+                         (150, 100, 3))
+        self.assertEqual(set(self.emu.leer(RUTA, shallow=True)), set(self.bloques[1]))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2, argv=[sys.argv[0]] + sys.argv[1:])
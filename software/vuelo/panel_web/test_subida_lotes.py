@@ -0,0 +1,139 @@
+# ===========================================================================================
+# PROYECTO: CANSAT CAELUM (IES DIEGO VELÁZQUEZ)
+# PROGRAMA: Pruebas de la subida por lotes (subida_lotes.py) con el emulador de Firebase
+# OBJETIVO: Comprobar contra emulador_firebase.py que SubidorLotes:
+#
+#   - agrupa los paquetes en PATCH de como mucho max_lote claves, en orden
+#   - con dos paquetes de la misma clave en un lote sube solo el más reciente
+#   - llama a al_confirmar con las marcas de cada lote, en orden de envío
+#   - con en_vuelo > 1 hay varios PATCH a la vez (nunca más de en_vuelo) y, si
+#     los timestamps vuelven atrás, la versión nueva de una clave no la pisa
+#     un lote anterior que llegue tarde
+#
+# USO:
+#   python -m pytest test_subida_lotes.py
+#   python test_subida_lotes.py
+# ===========================================================================================
+
+import sys
+import threading
+import time
+import unittest
+
+from cliente_firebase import ClienteFirebase
+from emulador_firebase import EmuladorFirebase
+from subida_lotes import SubidorLotes
+
+RUTA    = "/cansat/telemetria"
+T0      = 1712000000
+LIMITE  = 10.0
+
+
+def paquete(i, **extra):
+    return {'num_paquete': i, 'timestamp': T0 + i, 'alt': 100.0 + i, **extra}
+
+
+class PruebasSubidaLotes(unittest.TestCase):
+
+    def setUp(self):
+        self.emu = EmuladorFirebase().iniciar()
+        self.cliente = ClienteFirebase(self.emu.url, reintentos=0, timeout=2)
+
+        # Claves de cada PATCH que Firebase aplica, en el orden del lote,
+        # y cuántas peticiones había en curso a la vez
+        self.lotes = []
+        self.en_curso = self.max_en_curso = 0
+        self._lock = threading.Lock()
+        patch = self.cliente.patch
+        def contar(ruta, lote, **opciones):
+            with self._lock:
+                self.en_curso += 1
+                self.max_en_curso = max(self.max_en_curso, self.en_curso)
+            try:
+                return patch(ruta, lote, **opciones)
+            finally:
+                with self._lock:
+                    self.en_curso -= 1
+        self.cliente.patch = contar
+        actualizar = self.emu.actualizar
+        def registrar(ruta, hijos):
+            with self._lock:
+                self.lotes.append(list(hijos))
+            actualizar(ruta, hijos)
+        self.emu.actualizar = registrar
+
+    def tearDown(self):
+        self.cliente.cerrar()
+        self.emu.detener()
+
+    def claves_recibidas(self):
+        return [k for lote in self.lotes for k in lote]
+
+    # ── Pruebas ──
+    def test_lotes_en_orden_y_acotados(self):
+        n = 200
+        marcas = []
+        subidor = SubidorLotes(self.cliente, RUTA, max_lote=16, max_latencia=0.05,
+                               al_confirmar=marcas.extend).iniciar()
+        for i in range(n):
+            subidor.ofrecer(paquete(i), bloquear=True, marca=i)
+        self.assertTrue(subidor.detener(LIMITE))
+
+        self.assertEqual(self.claves_recibidas(), [str(T0 + i) for i in range(n)])
+        self.assertTrue(all(len(lote) <= 16 for lote in self.lotes))
+        self.assertLess(subidor.peticiones, n)            # varios paquetes por PATCH
+        self.assertEqual(subidor.peticiones, len(self.lotes))
+        self.assertEqual((subidor.enviados, subidor.errores), (n, 0))
+        self.assertEqual(marcas, list(range(n)))          # confirmaciones en orden
+        self.assertEqual(self.emu.contar(RUTA), n)
+        self.assertEqual(self.emu.leer(f"{RUTA}/{T0 + 7}"), paquete(7))
+
+    def test_misma_clave_en_un_lote_sube_la_ultima(self):
+        subidor = SubidorLotes(self.cliente, RUTA, max_lote=10, max_latencia=1.0).iniciar()
+        subidor.ofrecer(paquete(1, fase='espera'))
+        subidor.ofrecer(paquete(2))
+        subidor.ofrecer(paquete(1, fase='caida_libre'))   # mismo timestamp → misma clave
+        self.assertTrue(subidor.detener(LIMITE))
+
+        self.assertEqual(len(self.lotes), 1)
+        self.assertEqual(sorted(self.lotes[0]), [str(T0 + 1), str(T0 + 2)])
+        self.assertEqual(subidor.coalescidos, 1)
+        self.assertEqual(self.emu.leer(f"{RUTA}/{T0 + 1}")['fase'], 'caida_libre')
+
+    def test_lote_fallido_no_confirma(self):
+        marcas = []
+        self.emu.tasa_error = 1.0
+        subidor = SubidorLotes(self.cliente, RUTA, max_lote=5, max_latencia=0.01,
+                               al_confirmar=marcas.extend).iniciar()
+        for i in range(12):
+            subidor.ofrecer(paquete(i), bloquear=True, marca=i)
+        self.assertTrue(subidor.detener(LIMITE))
+        self.assertEqual((subidor.errores, subidor.enviados), (12, 0))
+        self.assertEqual(marcas, [])
+        self.assertEqual(self.emu.contar(RUTA), 0)
+
+    def test_en_vuelo_sin_pisar_datos_nuevos(self):
+        # Respuestas con latencia variable: sin orden, un lote viejo podría llegar el último
+        self.emu.latencia, self.emu.jitter = 0.02, 0.03
+        marcas = []
+        subidor = SubidorLotes(self.cliente, RUTA, max_lote=5, max_latencia=0.005, en_vuelo=4,
+                               al_confirmar=marcas.extend).iniciar()
+        orden = list(range(80)) + list(range(40, 60)) + list(range(80, 120))   # el 40..59 se repite
+        for n, i in enumerate(orden):
+            version = 2 if n >= 80 and i < 80 else 1
+            subidor.ofrecer(paquete(i, version=version), bloquear=True, marca=n)
+            time.sleep(0.001)
+        self.assertTrue(subidor.detener(LIMITE))
+
+        self.assertGreater(self.max_en_curso, 1)
+        self.assertLessEqual(self.max_en_curso, 4)
+        self.assertGreaterEqual(subidor.esperas_orden, 1)
+        self.assertEqual(marcas, list(range(len(orden))))   # confirmaciones en orden de envío
+        self.assertEqual(sorted(self.claves_recibidas()), sorted(str(T0 + i) for i in orden))
+        for i in range(120):
+            esperada = 2 if 40 <= i < 60 else 1
+            self.assertEqual(self.emu.leer(f"{RUTA}/{T0 + i}")['version'], esperada, i)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2, argv=[sys.argv[0]] + sys.argv[1:])
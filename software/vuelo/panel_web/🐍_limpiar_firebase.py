@@ -17,7 +17,10 @@
 # NOTA: Los campos se envían a Firebase con los mismos nombres que en el CSV.
 #       El dashboard los lee directamente sin renombrar.
 #
-# ENTORNO: Google Colab o PC local
+# ENTORNO: Google Colab o PC local. Para la limpieza por bloques en paralelo y la sesión
+#          HTTP compartida, subir también purga_firebase.py y cliente_firebase.py; si se
+#          sube este fichero solo, se usa un DELETE de toda la ruta y un PUT por muestra
+#          (como en la versión anterior)
 # ===========================================================================================
 
 import requests
@@ -25,6 +28,12 @@ import time
 import csv
 import os
 
+try:
+    from purga_firebase import purgar
+    from cliente_firebase import ClienteFirebase
+except ImportError:   # subido solo, sin los módulos de panel_web
+    purgar = ClienteFirebase = None
+
 # === CONFIGURACIÓN ===
 FIREBASE_URL = "https://cansat-66d98-default-rtdb.europe-west1.firebasedatabase.app"
 VELOCIDAD    = 1.0   # segundos entre envíos (1.0 = tiempo real)
@@ -48,9 +57,12 @@ def detectar_fichero():
     else:
         return None, None
 
-def limpiar_firebase(ruta):
-    """Borra datos anteriores para que las gráficas empiecen de cero."""
+def limpiar_firebase(cliente, ruta):
+    """Borra datos anteriores: PATCH a null por bloques en paralelo (purga_firebase.py) o, sin él, un DELETE."""
     try:
+        if cliente is not None:
+            purgar(cliente, ruta)
+            return
         r = requests.delete(f"{FIREBASE_URL}{ruta}.json", timeout=10)
         if r.status_code == 200:
             print(f"🗑️  Datos anteriores borrados en {ruta}")
@@ -94,7 +106,8 @@ def ejecutar_mision():
     print(f"   Vel.:    {VELOCIDAD}s por muestra")
     print(f"{'═'*55}\n")
 
-    limpiar_firebase(ruta)
+    cliente = ClienteFirebase(FIREBASE_URL, timeout=10) if ClienteFirebase else None
+    limpiar_firebase(cliente, ruta)
 
     with open(archivo, 'r', encoding='utf-8') as f:
         lector = csv.DictReader(f)
@@ -110,8 +123,10 @@ def ejecutar_mision():
             # PUT con timestamp como clave → sobrescribe el último dato (el dashboard
             # usa limitToLast(1), así que siempre muestra el dato más reciente)
             ts  = int(payload.get('timestamp', i))
-            url = f"{FIREBASE_URL}{ruta}/{ts}.json"
-            r   = requests.put(url, json=payload, timeout=10)
+            if cliente is not None:
+                r = cliente.put(f"{ruta}/{ts}", payload)
+            else:
+                r = requests.put(f"{FIREBASE_URL}{ruta}/{ts}.json", json=payload, timeout=10)
 
             alt  = payload.get('alt',  0)
             fase = payload.get('fase', '—')